@@ -1,15 +1,29 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import requests
+import html
 import json
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-import io
-import base64
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from backend_client import BackendClient
+import batch_format
+from ingest import (
+    CHUNK_SIZE, LabeledCsvWriter, SentimentTally, data_dir_files, find_text_column, iter_text_chunks, read_columns,
+    read_preview, resolve_data_file, source_fingerprint
+)
+from term_frequency import TermCounter, make_pool
+from figure_cache import FigureCache
+from rerun_profile import STAGES, RerunProfile, span, timed_iter
+
+# pandas, plotly and wordcloud are imported inside the functions that draw with them, so the
+# landing page and tabs without results paint without paying for those imports
+
+# The script re-executes on every rerun, so this marks the start of the current one
+RERUN_STARTED = time.perf_counter()
 
 # Page configuration
 st.set_page_config(
@@ -103,6 +117,708 @@ st.markdown("""
 if 'page' not in st.session_state:
     st.session_state.page = 'landing'
 
+@st.cache_resource
+def get_backend_client():
+    """One pooled backend client (and circuit breaker) shared by every session and rerun"""
+    return BackendClient()
+
+# Bound on cached figures and word cloud images shared by all sessions
+FIGURE_CACHE_MAX_ENTRIES = 64
+
+@st.cache_resource
+def get_figure_cache():
+    """Process-wide render cache so unchanged figures are not rebuilt on every rerun"""
+    return FigureCache(max_entries=FIGURE_CACHE_MAX_ENTRIES)
+
+# Client-side cache of backend responses, kept per browser session
+API_CACHE_MAX_ENTRIES = 32
+
+def perf_profile():
+    """This rerun's RerunProfile while the performance panel is on, else None"""
+    return st.session_state.get('perf_profile')
+
+def perf_span(stage, label):
+    """Time a block of this rerun for the performance panel (a no-op while it is off)"""
+    return span(perf_profile(), stage, label)
+
+class ApiError(Exception):
+    """Backend answered with a non-200 status code"""
+    
+    def __init__(self, status_code):
+        super().__init__(f"API Error: {status_code}")
+        self.status_code = status_code
+
+# Upper bound on simultaneous backend calls when comparing several keywords
+MAX_CONCURRENT_REQUESTS = 8
+
+def fetch_json(client, endpoint, payload, refresh=False, profile=None):
+    """
+    POST payload to a backend endpoint and return the parsed JSON, raising ApiError on a
+    non-200 answer. Touches no Streamlit state, so it is safe to run on worker threads
+    (profile, if given, records the request and the JSON parse)
+    """
+    with span(profile, 'network', f"POST {endpoint}") as timing:
+        response = client.post(
+            endpoint,
+            payload,
+            headers={'Cache-Control': 'no-cache'} if refresh else None
+        )
+        timing['detail'] = response.headers.get('Server-Timing')
+    if response.status_code != 200:
+        raise ApiError(response.status_code)
+    with span(profile, 'parse', f"JSON {endpoint}"):
+        return response.json()
+
+def _api_cache():
+    return st.session_state.setdefault('api_cache', OrderedDict())
+
+def _api_cache_key(endpoint, payload):
+    return (endpoint, json.dumps(payload, sort_keys=True))
+
+def _api_cache_store(key, data):
+    cache = _api_cache()
+    cache[key] = data
+    cache.move_to_end(key)
+    while len(cache) > API_CACHE_MAX_ENTRIES:
+        cache.popitem(last=False)
+
+def cached_post(endpoint, payload, refresh=False):
+    """
+    POST payload to a backend endpoint, reusing this session's stored response for the
+    same (endpoint, payload) unless refresh is set. Least recently used entries are evicted
+    """
+    cache = _api_cache()
+    key = _api_cache_key(endpoint, payload)
+    
+    if not refresh and key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    
+    data = fetch_json(get_backend_client(), endpoint, payload, refresh, perf_profile())
+    _api_cache_store(key, data)
+    return data
+
+def cached_post_many(endpoint, payloads, refresh=False, max_workers=MAX_CONCURRENT_REQUESTS):
+    """
+    Send several payloads to one endpoint concurrently (at most max_workers in flight) and
+    yield (index, data, error) as each finishes. Cached responses are yielded first; only
+    the misses go to the thread pool, and the cache is updated on the calling thread
+    """
+    cache = _api_cache()
+    pending = {}
+    for index, payload in enumerate(payloads):
+        key = _api_cache_key(endpoint, payload)
+        if not refresh and key in cache:
+            cache.move_to_end(key)
+            yield index, cache[key], None
+        else:
+            pending[index] = key
+    
+    if not pending:
+        return
+    
+    client = get_backend_client()
+    profile = perf_profile()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+        futures = {
+            pool.submit(fetch_json, client, endpoint, payloads[index], refresh, profile): index
+            for index in pending
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                data = future.result()
+            except (ApiError, requests.exceptions.RequestException) as e:
+                yield index, None, e
+            else:
+                _api_cache_store(pending[index], data)
+                yield index, data, None
+
+def post_sentiment_batch(texts):
+    """
+    Score one batch of texts through the /sentiment/batch endpoint
+    Large batches come back as Arrow (see batch_format.py) with 'labels' as a pandas Categorical
+    """
+    with perf_span('network', "POST /sentiment/batch") as timing:
+        response = get_backend_client().post(
+            "/sentiment/batch", {"texts": texts}, headers={'Accept': batch_format.accept_header()}
+        )
+        timing['detail'] = response.headers.get('Server-Timing')
+    response.raise_for_status()
+    encoding = 'Arrow' if batch_format.is_arrow(response.headers.get('Content-Type')) else 'JSON'
+    with perf_span('parse', f"{encoding} /sentiment/batch"):
+        return batch_format.decode_response(response)
+
+def build_sentiment_pie(values):
+    """Donut chart of positive/negative/neutral counts"""
+    import plotly.graph_objects as go
+    labels = ['Positive', 'Negative', 'Neutral']
+    colors = ['#2ecc71', '#e74c3c', '#95a5a6']
+    
+    fig_pie = go.Figure(data=[go.Pie(
+        labels=labels, 
+        values=values,
+        marker_colors=colors,
+        hole=0.4
+    )])
+    fig_pie.update_layout(title="Sentiment Distribution")
+    return fig_pie
+
+def build_sentiment_bar(values):
+    """Bar chart of positive/negative/neutral counts"""
+    import plotly.express as px
+    labels = ['Positive', 'Negative', 'Neutral']
+    
+    fig_bar = px.bar(
+        x=labels,
+        y=values,
+        color=labels,
+        color_discrete_map={
+            'Positive': '#2ecc71',
+            'Negative': '#e74c3c',
+            'Neutral': '#95a5a6'
+        },
+        title="Sentiment Comparison"
+    )
+    fig_bar.update_layout(showlegend=False)
+    return fig_bar
+
+def display_sentiment_results(data, chart_key=None):
+    """
+    Render the metrics row, charts and sample tweets for a /sentiment style response
+    chart_key makes the chart IDs unique when the results are redrawn within one run
+    """
+    
+    # Metrics row
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total Analyzed", data.get('total_tweets', 0))
+    with col2:
+        st.metric("Positive", data.get('positive', 0), f"{data.get('positive_pct', 0):.1f}%")
+    with col3:
+        st.metric("Negative", data.get('negative', 0), f"{data.get('negative_pct', 0):.1f}%")
+    with col4:
+        st.metric("Neutral", data.get('neutral', 0), f"{data.get('neutral_pct', 0):.1f}%")
+    
+    if data.get('duplicates'):
+        st.caption(
+            f"🔁 {data['duplicates']:,} near-duplicate posts ({data.get('duplicate_ratio', 0):.1%}) "
+            "were scored once with the post they repeat"
+        )
+    
+    # Charts
+    col1, col2 = st.columns(2)
+    
+    values = [data.get('positive', 0), data.get('negative', 0), data.get('neutral', 0)]
+    figures = get_figure_cache()
+    
+    with col1:
+        # Pie chart
+        with perf_span('figure', "sentiment pie"):
+            fig_pie = figures.get_or_build('sentiment_pie', values, lambda: build_sentiment_pie(values))
+        with perf_span('render', "sentiment pie"):
+            st.plotly_chart(fig_pie, use_container_width=True, key=chart_key and f"{chart_key}_pie")
+    
+    with col2:
+        # Bar chart
+        with perf_span('figure', "sentiment bar"):
+            fig_bar = figures.get_or_build('sentiment_bar', values, lambda: build_sentiment_bar(values))
+        with perf_span('render', "sentiment bar"):
+            st.plotly_chart(fig_bar, use_container_width=True, key=chart_key and f"{chart_key}_bar")
+    
+    # Sample tweets
+    if 'sample_tweets' in data:
+        st.markdown("### 📝 Sample Tweets Analysis")
+        for i, tweet in enumerate(data['sample_tweets'][:5]):
+            sentiment = tweet['sentiment']
+            emoji = "😊" if sentiment == 'positive' else "😢" if sentiment == 'negative' else "😐"
+            color = "#d4edda" if sentiment == 'positive' else "#f8d7da" if sentiment == 'negative' else "#e2e3e5"
+            
+            # Post texts come from uploads, CSV files and the live stream: show markup as text
+            st.markdown(f"""
+            <div style="background-color: {color}; padding: 10px; margin: 5px 0; border-radius: 8px;">
+                <strong>{emoji} {sentiment.capitalize()}</strong><br>
+                {html.escape(tweet['text'])}
+            </div>
+            """, unsafe_allow_html=True)
+
+def build_confidence_gauge(prediction, confidence):
+    """Gauge of the fake news model's confidence, colored by verdict"""
+    import plotly.graph_objects as go
+    fig_gauge = go.Figure(go.Indicator(
+        mode = "gauge+number",
+        value = confidence * 100,
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        title = {'text': "Confidence"},
+        gauge = {
+            'axis': {'range': [None, 100]},
+            'bar': {'color': "#2ecc71" if prediction.lower() == 'real' else "#e74c3c"},
+            'steps': [
+                {'range': [0, 50], 'color': "lightgray"},
+                {'range': [50, 100], 'color': "gray"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': 90
+            }
+        }
+    ))
+    fig_gauge.update_layout(height=200)
+    return fig_gauge
+
+def display_fake_news_result(result):
+    """Render the verdict banner, confidence gauge and detailed analysis for a /fakenews response"""
+    
+    prediction = result.get('prediction', 'real')
+    confidence = result.get('confidence', 0.5)
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        if prediction.lower() == 'real':
+            st.markdown(f'''
+            <div class="fake-news-real">
+                ✅ REAL NEWS DETECTED
+            </div>
+            ''', unsafe_allow_html=True)
+        else:
+            st.markdown(f'''
+            <div class="fake-news-fake">
+                ❌ FAKE NEWS DETECTED
+            </div>
+            ''', unsafe_allow_html=True)
+    
+    with col2:
+        # Confidence gauge
+        with perf_span('figure', "confidence gauge"):
+            fig_gauge = get_figure_cache().get_or_build(
+                'confidence_gauge',
+                [prediction.lower(), confidence],
+                lambda: build_confidence_gauge(prediction, confidence)
+            )
+        with perf_span('render', "confidence gauge"):
+            st.plotly_chart(fig_gauge, use_container_width=True)
+    
+    # Verdict reused from a previously checked claim
+    matched = result.get('matched_claim')
+    if matched:
+        checked = datetime.fromtimestamp(matched.get('checked_at', 0)).strftime('%Y-%m-%d %H:%M')
+        st.info(
+            f"🔗 Matches a claim checked on {checked} "
+            f"(similarity {matched.get('similarity', 0):.2f}): \"{matched.get('text', '')}\""
+        )
+    
+    # Additional analysis
+    if 'analysis' in result:
+        st.markdown("### 📊 Detailed Analysis")
+        analysis = result['analysis']
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Credibility Score", f"{analysis.get('credibility', 0.5):.2f}")
+        with col2:
+            st.metric("Language Quality", f"{analysis.get('language_quality', 0.5):.2f}")
+        with col3:
+            st.metric("Source Reliability", f"{analysis.get('source_reliability', 0.5):.2f}")
+
+def build_comparison_figure(results):
+    """Grouped bar chart of sentiment percentages for each analyzed keyword"""
+    import pandas as pd
+    import plotly.express as px
+    rows = []
+    for keyword, data in results.items():
+        for label in ['Positive', 'Negative', 'Neutral']:
+            rows.append({
+                'Keyword': keyword,
+                'Sentiment': label,
+                'Percent': data.get(f'{label.lower()}_pct', 0)
+            })
+    
+    fig = px.bar(
+        pd.DataFrame(rows, columns=['Keyword', 'Sentiment', 'Percent']),
+        x='Keyword',
+        y='Percent',
+        color='Sentiment',
+        barmode='group',
+        color_discrete_map={
+            'Positive': '#2ecc71',
+            'Negative': '#e74c3c',
+            'Neutral': '#95a5a6'
+        },
+        title="Sentiment Comparison by Keyword"
+    )
+    fig.update_layout(yaxis_title="% of tweets")
+    return fig
+
+def display_keyword_comparison(results):
+    """Render the comparison chart and summary table for several keywords"""
+    import pandas as pd
+    with perf_span('figure', "keyword comparison"):
+        fig = get_figure_cache().get_or_build(
+            'keyword_comparison',
+            {k: [d.get('positive_pct', 0), d.get('negative_pct', 0), d.get('neutral_pct', 0)] for k, d in results.items()},
+            lambda: build_comparison_figure(results)
+        )
+    with perf_span('render', "keyword comparison"):
+        st.plotly_chart(fig, use_container_width=True, key="keyword_comparison")
+    
+    summary = pd.DataFrame([
+        {
+            'Keyword': keyword,
+            'Total Analyzed': data.get('total_tweets', 0),
+            'Positive %': data.get('positive_pct', 0),
+            'Negative %': data.get('negative_pct', 0),
+            'Neutral %': data.get('neutral_pct', 0)
+        }
+        for keyword, data in results.items()
+    ])
+    with perf_span('render', "comparison table"):
+        st.dataframe(summary, hide_index=True)
+
+# Trend windows offered under single-keyword results, in hours
+TREND_WINDOWS = {"Last hour": 1, "Last 24 hours": 24, "Last 7 days": 168, "Last 30 days": 720}
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_sentiment_trend(keyword, hours):
+    """GET /sentiment/trend, kept for 30 seconds so reruns don't refetch it"""
+    response = get_backend_client().get("/sentiment/trend", params={"keyword": keyword, "hours": hours})
+    if response.status_code != 200:
+        raise ApiError(response.status_code)
+    return response.json()
+
+def build_trend_figure(trend):
+    """Line chart of positive/negative/neutral posts per time bucket"""
+    import pandas as pd
+    import plotly.express as px
+    rows = []
+    for bucket in trend['buckets']:
+        for label in ['Positive', 'Negative', 'Neutral']:
+            rows.append({
+                'Time': datetime.fromtimestamp(bucket['start']),
+                'Sentiment': label,
+                'Posts': bucket[label.lower()]
+            })
+    
+    fig = px.line(
+        pd.DataFrame(rows, columns=['Time', 'Sentiment', 'Posts']),
+        x='Time',
+        y='Posts',
+        color='Sentiment',
+        color_discrete_map={
+            'Positive': '#2ecc71',
+            'Negative': '#e74c3c',
+            'Neutral': '#95a5a6'
+        },
+        title=f"Sentiment over time (per {trend['granularity']})"
+    )
+    return fig
+
+def display_sentiment_trend(keyword):
+    """Trend chart and window totals for a keyword, from the backend's aggregation store"""
+    st.markdown("### 📈 Sentiment Trend")
+    window = st.selectbox("Time window:", list(TREND_WINDOWS), index=2, key="trend_window")
+    try:
+        with perf_span('network', "GET /sentiment/trend (30 s cache)"):
+            trend = fetch_sentiment_trend(keyword, TREND_WINDOWS[window])
+    except ApiError as e:
+        st.info(f"Trend unavailable (API Error: {e.status_code})")
+        return
+    except requests.exceptions.RequestException:
+        st.info("Trend unavailable (API unreachable)")
+        return
+    
+    summary = trend['summary']
+    if not summary['total_tweets']:
+        st.info(f"No posts recorded for '{keyword}' in this window yet. Posts are counted from the moment a keyword is first analyzed.")
+        return
+    st.caption(
+        f"{summary['total_tweets']:,} posts: {summary['positive_pct']:.1f}% positive, "
+        f"{summary['negative_pct']:.1f}% negative, {summary['neutral_pct']:.1f}% neutral"
+    )
+    with perf_span('figure', "sentiment trend"):
+        fig = get_figure_cache().get_or_build(
+            'sentiment_trend',
+            [trend['granularity'], trend['buckets']],
+            lambda: build_trend_figure(trend)
+        )
+    with perf_span('render', "sentiment trend"):
+        st.plotly_chart(fig, use_container_width=True)
+
+# Live stream: the dashboard redraws at most once per tick, however many posts arrive
+LIVE_TICK_SECONDS = 1.0
+
+def read_live_stream(client, params, posts, stop):
+    """
+    Reader thread for /sentiment/stream: puts each scored post on the posts queue
+    Ends with None (stream finished) or the exception that broke the connection
+    """
+    try:
+        response = client.get("/sentiment/stream", params=params, stream=True)
+        with response:
+            if response.status_code != 200:
+                raise ApiError(response.status_code)
+            for line in response.iter_lines():
+                if stop.is_set():
+                    return
+                if not line:
+                    continue
+                message = json.loads(line)
+                if message.get('type') == 'post':
+                    posts.put(message)
+        posts.put(None)
+    except Exception as e:
+        posts.put(e)
+
+def summarize_live_window(window):
+    """/sentiment style aggregate of the posts in the rolling window, newest samples first"""
+    data = {'total_tweets': len(window)}
+    for sentiment in ['positive', 'negative', 'neutral']:
+        count = sum(1 for post in window if post['sentiment'] == sentiment)
+        data[sentiment] = count
+        data[f'{sentiment}_pct'] = round(count / len(window) * 100, 1) if window else 0.0
+    data['sample_tweets'] = [
+        {'text': post['text'], 'sentiment': post['sentiment']} for post in list(window)[-5:][::-1]
+    ]
+    return data
+
+def run_live_sentiment(view, status, keyword, window_size, rate, replay):
+    """
+    Follow /sentiment/stream and redraw the metrics and charts in the view placeholder
+    Posts are collected by a reader thread; the script drains them once per tick, so the
+    redraw rate is fixed no matter how fast posts arrive. Runs until the stream ends or a
+    rerun (e.g. the Stop button) interrupts the script.
+    """
+    params = {'rate': rate, 'replay': int(replay)}
+    if keyword:
+        params['keyword'] = keyword
+    posts = queue.Queue()
+    stop = threading.Event()
+    reader = threading.Thread(
+        target=read_live_stream, args=(get_backend_client(), params, posts, stop), daemon=True
+    )
+    reader.start()
+    
+    window = deque(maxlen=window_size)
+    received = 0
+    ticks = 0
+    started = time.monotonic()
+    try:
+        while True:
+            time.sleep(LIVE_TICK_SECONDS)
+            finished = None
+            arrived = 0
+            while True:
+                try:
+                    message = posts.get_nowait()
+                except queue.Empty:
+                    break
+                if message is None or isinstance(message, Exception):
+                    finished = message or 'ended'
+                    break
+                window.append(message)
+                arrived += 1
+            received += arrived
+            
+            if arrived:
+                ticks += 1
+                data = summarize_live_window(window)
+                with view.container():
+                    display_sentiment_results(data, chart_key=f"live_{ticks}")
+                st.session_state.sentiment_result = {
+                    'title': f"the live stream (last {len(window):,} of {received:,} posts)",
+                    'data': data
+                }
+            
+            elapsed = time.monotonic() - started
+            if isinstance(finished, ApiError):
+                status.error(f"❌ API Error: {finished.status_code}")
+            elif isinstance(finished, Exception):
+                status.error(f"❌ Connection Error: {finished}")
+            else:
+                status.caption(
+                    f"🔴 Live: {received:,} posts in {elapsed:.0f}s ({received / elapsed:.1f}/s), "
+                    f"window of {len(window):,}" + (" - stream ended" if finished else "")
+                )
+            if finished:
+                st.session_state.live_running = False
+                return
+    finally:
+        stop.set()
+
+def render_wordcloud_png(frequencies, max_words, colormap):
+    """Lay out a word cloud and encode it straight to PNG bytes, without going through pyplot"""
+    import io
+    from PIL import Image
+    from wordcloud import WordCloud
+    wordcloud = WordCloud(
+        width=800, 
+        height=400, 
+        max_words=max_words,
+        colormap=colormap,
+        background_color='white',
+        relative_scaling=0.5
+    ).generate_from_frequencies(frequencies)
+    
+    buffer = io.BytesIO()
+    Image.fromarray(wordcloud.to_array()).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def build_top_words_figure(top_words_df):
+    """Horizontal bar chart of the most frequent words"""
+    import plotly.express as px
+    fig_words = px.bar(
+        top_words_df, 
+        x='Frequency', 
+        y='Word',
+        orientation='h',
+        title='Top 10 Most Frequent Words'
+    )
+    fig_words.update_layout(height=400)
+    return fig_words
+
+def server_csv_picker(key):
+    """
+    Picker for CSV files in CSV_DATA_DIR, for exports too large to upload; returns the chosen
+    file's path, or None when nothing is picked or no data directory is configured
+    """
+    files = data_dir_files()
+    if not files:
+        return None
+    name = st.selectbox(
+        "Or a CSV file from the server's data directory:",
+        [''] + files,
+        help="Large exports are streamed from disk in chunks instead of being uploaded",
+        key=key
+    )
+    if not name:
+        return None
+    try:
+        return resolve_data_file(name)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return None
+
+# Vocabulary cap for the word cloud counter (keeps memory bounded on huge corpora)
+TERM_COUNTER_MAX_TERMS = 50000
+
+@st.cache_resource
+def get_term_pool():
+    """Shared process pool for word counting (None when WORDCLOUD_WORKERS=1)"""
+    return make_pool()
+
+def get_term_counts(csv_source, text_column, progress=None):
+    """
+    Word counts for a CSV source, counted chunk by chunk the first time the source is seen.
+    The counter is kept in session state, so changing display options only re-renders
+    """
+    key = (source_fingerprint(csv_source), text_column)
+    stored = st.session_state.get('term_counts')
+    if stored and stored['key'] == key:
+        return stored['counter']
+    
+    counter = TermCounter(max_terms=TERM_COUNTER_MAX_TERMS)
+    chunks = iter_text_chunks(csv_source, text_column, CHUNK_SIZE)
+    for _ in counter.update_chunks(chunks, get_term_pool()):
+        if progress is not None:
+            progress.caption(f"Counted words in {counter.texts_seen:,} rows...")
+    if progress is not None:
+        progress.empty()
+    
+    st.session_state.term_counts = {'key': key, 'counter': counter}
+    return counter
+
+# Performance panel: reruns kept in the rolling history
+PERF_HISTORY_SIZE = 30
+PERF_STAGE_COLORS = {
+    'network': '#1f77b4',
+    'parse': '#ff7f0e',
+    'compute': '#2ca02c',
+    'figure': '#9467bd',
+    'render': '#d62728',
+    'other': '#c7c7c7'
+}
+
+def build_perf_waterfall(spans, total):
+    """Horizontal bars of each timed span against the rerun timeline, in milliseconds"""
+    import plotly.graph_objects as go
+    rows = spans + [{'stage': 'other', 'label': 'whole rerun', 'start': 0.0, 'end': total, 'busy': total,
+                     'count': 1, 'detail': None}]
+    fig = go.Figure()
+    for stage in STAGES + ['other']:
+        stage_rows = [row for row in rows if row['stage'] == stage]
+        if not stage_rows:
+            continue
+        fig.add_trace(go.Bar(
+            name=stage,
+            orientation='h',
+            y=[f"{row['stage']}: {row['label']}" for row in stage_rows],
+            base=[row['start'] * 1000 for row in stage_rows],
+            x=[(row['end'] - row['start']) * 1000 for row in stage_rows],
+            marker_color=PERF_STAGE_COLORS[stage],
+            customdata=[
+                [row['busy'] * 1000, row['count'], row['detail'] or '']
+                for row in stage_rows
+            ],
+            hovertemplate="%{y}<br>start %{base:.1f} ms, busy %{customdata[0]:.1f} ms"
+                          " in %{customdata[1]} call(s)<br>%{customdata[2]}<extra></extra>"
+        ))
+    order = [f"{row['stage']}: {row['label']}" for row in sorted(rows, key=lambda row: row['start'])]
+    fig.update_layout(
+        title="This rerun",
+        barmode='overlay',
+        height=120 + 22 * len(rows),
+        margin=dict(l=10, r=10, t=40, b=10),
+        xaxis_title="ms since rerun start",
+        yaxis=dict(categoryorder='array', categoryarray=order[::-1]),
+        legend=dict(orientation='h')
+    )
+    return fig
+
+def build_perf_history(history):
+    """Stacked bars of per-stage time for the last reruns, in milliseconds"""
+    import pandas as pd
+    import plotly.express as px
+    rows = [
+        {'Rerun': entry['rerun'], 'Stage': stage, 'ms': entry[stage] * 1000}
+        for entry in history
+        for stage in STAGES + ['other']
+    ]
+    fig = px.bar(
+        pd.DataFrame(rows, columns=['Rerun', 'Stage', 'ms']),
+        x='Rerun',
+        y='ms',
+        color='Stage',
+        color_discrete_map=PERF_STAGE_COLORS,
+        title=f"Last {len(history)} reruns"
+    )
+    fig.update_layout(height=300, margin=dict(l=10, r=10, t=40, b=10), legend=dict(orientation='h'))
+    return fig
+
+def show_perf_panel(panel, profile):
+    """Fill the sidebar performance panel with this rerun's waterfall and the rolling history"""
+    summary = profile.summary()
+    history = st.session_state.setdefault('perf_history', deque(maxlen=PERF_HISTORY_SIZE))
+    rerun = st.session_state.get('perf_rerun', 0) + 1
+    st.session_state.perf_rerun = rerun
+    history.append({'rerun': rerun, **summary})
+    
+    with panel:
+        previous = sorted(entry['total'] for entry in list(history)[:-1])
+        median = previous[len(previous) // 2] if previous else None
+        st.metric(
+            "This rerun",
+            f"{summary['total'] * 1000:.0f} ms",
+            f"{(summary['total'] - median) * 1000:+.0f} ms vs median" if median is not None else None,
+            delta_color="inverse"
+        )
+        st.caption(" · ".join(f"{stage} {summary[stage] * 1000:.0f} ms" for stage in STAGES + ['other']))
+        st.plotly_chart(build_perf_waterfall(profile.spans(), summary['total']),
+                        use_container_width=True, key="perf_waterfall")
+        st.plotly_chart(build_perf_history(history), use_container_width=True, key="perf_history")
+        st.caption("'other' is time outside timed blocks: imports, widgets and Streamlit's own rerun work. "
+                   "Drawing this panel is not included.")
+
 # Navigation
 def show_landing_page():
     """Display the landing/welcome page with project information"""
@@ -229,7 +945,7 @@ def show_landing_page():
     with st.expander("🔧 API Configuration", expanded=False):
         st.markdown("""
         **Backend Requirements:**
-        - Flask API running on `http://127.0.0.1:5000`
+        - Flask API running on `http://127.0.0.1:5000` (override with the `BACKEND_URL` environment variable)
         - Endpoints: `/sentiment` and `/fakenews`
         - If API is unavailable, demo data will be displayed
         
@@ -304,6 +1020,32 @@ def show_dashboard():
         
         st.markdown("---")
         
+        backend = get_backend_client()
+        if backend.breaker.state == 'closed':
+            st.caption(f"🟢 API: {backend.base_url}")
+        else:
+            st.caption(f"🔴 API unavailable, using demo data (retry in {backend.breaker.retry_in():.0f}s)")
+        
+        cached_count = len(st.session_state.get('api_cache', {}))
+        st.caption(f"🗄️ {cached_count} cached API response(s)")
+        if st.button("🧹 Clear cached results", key="clear_api_cache"):
+            for state_key in ['api_cache', 'sentiment_result', 'fakenews_result']:
+                st.session_state.pop(state_key, None)
+            st.rerun()
+        
+        st.markdown("---")
+        
+        # Opt-in stage timing of every rerun; the panel is filled once the page has been drawn
+        perf_panel = None
+        if st.toggle("⏱️ Performance panel", key="perf_enabled",
+                     help="Time network, parsing, computation, figure building and rendering on each rerun"):
+            st.session_state.perf_profile = RerunProfile(started=RERUN_STARTED)
+            perf_panel = st.expander("⏱️ Rerun timing", expanded=True)
+        else:
+            st.session_state.pop('perf_profile', None)
+        
+        st.markdown("---")
+        
         with st.expander("📖 Quick Help"):
             st.markdown("""
             **Sentiment Analysis:**
@@ -343,7 +1085,7 @@ def show_dashboard():
             # Input method selection
             input_method = st.radio(
                 "Choose input method:",
-                ["Keyword Analysis", "CSV Upload"],
+                ["Keyword Analysis", "CSV Upload", "Live Stream"],
                 horizontal=True
             )
             
@@ -351,7 +1093,30 @@ def show_dashboard():
                 keyword = st.text_input(
                     "Enter keyword to analyze:",
                     placeholder="e.g., elections, climate change, AI",
-                    help="Enter a topic to analyze recent social media sentiment"
+                    help="Enter a topic to analyze recent social media sentiment, or several comma-separated topics to compare them"
+                )
+            elif input_method == "Live Stream":
+                keyword = None
+                live_keyword = st.text_input(
+                    "Only show posts mentioning (optional):",
+                    placeholder="e.g., elections",
+                    key="live_keyword"
+                )
+                live_window = st.slider(
+                    "Rolling window (most recent posts):",
+                    min_value=50, max_value=2000, value=500, step=50,
+                    key="live_window"
+                )
+                live_rate = st.number_input(
+                    "Replay speed (posts/sec, 0 = as fast as possible):",
+                    min_value=0.0, max_value=10000.0, value=20.0, step=10.0,
+                    key="live_rate"
+                )
+                live_replay = st.checkbox(
+                    "Replay the source from the beginning",
+                    value=True,
+                    help="Otherwise only posts written to the source from now on are shown",
+                    key="live_replay"
                 )
             else:
                 uploaded_file = st.file_uploader(
@@ -359,107 +1124,94 @@ def show_dashboard():
                     type=['csv'],
                     help="CSV should contain a 'tweet' column"
                 )
+                csv_source = uploaded_file or server_csv_picker("csv_data_file")
                 keyword = None
-                if uploaded_file:
+                text_column = None
+                if csv_source:
                     try:
-                        df = pd.read_csv(uploaded_file)
-                        st.success(f"✅ Loaded {len(df)} tweets from CSV")
-                        if 'tweet' not in df.columns:
-                            st.error("❌ CSV must contain a 'tweet' column")
+                        # Only the header and a few rows are read here; scoring streams the rest
+                        with perf_span('parse', "CSV header"):
+                            text_column = find_text_column(read_columns(csv_source))
+                        if text_column is None:
+                            st.error("❌ CSV must contain a 'tweet', 'text', 'content', or 'message' column")
                         else:
+                            st.success(f"✅ Found text data in '{text_column}' column")
                             st.write("Preview of uploaded data:")
-                            st.dataframe(df.head(3))
+                            with perf_span('parse', "CSV preview"):
+                                preview = read_preview(csv_source, text_column)
+                            with perf_span('render', "CSV preview table"):
+                                st.dataframe(preview)
                     except Exception as e:
                         st.error(f"❌ Error loading CSV: {str(e)}")
         
         with col2:
             st.markdown("### Analysis Controls")
-            analyze_btn = st.button(
+            if input_method == "Live Stream":
+                if st.button("▶️ Start Live", type="primary", key="live_start"):
+                    st.session_state.live_running = True
+                    st.session_state.pop('sentiment_result', None)
+                if st.button("⏹️ Stop", key="live_stop"):
+                    st.session_state.live_running = False
+            analyze_btn = input_method != "Live Stream" and st.button(
                 "🚀 Analyze Sentiment",
                 type="primary",
                 help="Start sentiment analysis"
             )
+            refresh_btn = input_method != "Live Stream" and st.button(
+                "🔄 Refresh",
+                key="refresh_sentiment",
+                help="Re-run the analysis, bypassing cached results"
+            )
         
         # Sentiment Analysis Results
-        if analyze_btn:
-            if input_method == "Keyword Analysis" and keyword:
+        if analyze_btn or refresh_btn:
+            st.session_state.pop('sentiment_result', None)
+            keywords = list(dict.fromkeys(k.strip() for k in (keyword or '').split(',') if k.strip()))
+            
+            if input_method == "Keyword Analysis" and len(keywords) > 1:
+                # Fan the keywords out concurrently and redraw the comparison as each one lands
+                comparison_placeholder = st.empty()
+                progress = st.progress(0.0)
+                results = {}
+                failures = []
+                started = time.perf_counter()
+                
+                payloads = [{"keyword": k} for k in keywords]
+                for index, data, error in cached_post_many("/sentiment", payloads, refresh=refresh_btn):
+                    if error is None:
+                        results[keywords[index]] = data
+                        with perf_span('figure', "keyword comparison (progress)"):
+                            fig = build_comparison_figure({k: results[k] for k in keywords if k in results})
+                        with perf_span('render', "keyword comparison (progress)"):
+                            comparison_placeholder.plotly_chart(
+                                fig,
+                                use_container_width=True,
+                                key=f"comparison_progress_{len(results)}"
+                            )
+                    else:
+                        failures.append(f"{keywords[index]}: {error}")
+                    progress.progress((len(results) + len(failures)) / len(keywords))
+                
+                comparison_placeholder.empty()
+                progress.empty()
+                for failure in failures:
+                    st.error(f"❌ {failure}")
+                
+                if results:
+                    st.session_state.sentiment_result = {
+                        'title': f"{len(results)} keywords in {time.perf_counter() - started:.1f}s",
+                        'comparison': {k: results[k] for k in keywords if k in results}
+                    }
+            
+            elif input_method == "Keyword Analysis" and keyword:
                 with st.spinner("🔄 Analyzing sentiment data..."):
                     try:
-                        # API call to backend
-                        response = requests.post(
-                            "http://127.0.0.1:5000/sentiment",
-                            json={"keyword": keyword},
-                            timeout=30
-                        )
-                        
-                        if response.status_code == 200:
-                            data = response.json()
-                            
-                            # Display results
-                            st.success("✅ Analysis completed successfully!")
-                            
-                            # Metrics row
-                            col1, col2, col3, col4 = st.columns(4)
-                            with col1:
-                                st.metric("Total Analyzed", data.get('total_tweets', 0))
-                            with col2:
-                                st.metric("Positive", data.get('positive', 0), f"{data.get('positive_pct', 0):.1f}%")
-                            with col3:
-                                st.metric("Negative", data.get('negative', 0), f"{data.get('negative_pct', 0):.1f}%")
-                            with col4:
-                                st.metric("Neutral", data.get('neutral', 0), f"{data.get('neutral_pct', 0):.1f}%")
-                            
-                            # Charts
-                            col1, col2 = st.columns(2)
-                            
-                            with col1:
-                                # Pie chart
-                                labels = ['Positive', 'Negative', 'Neutral']
-                                values = [data.get('positive', 0), data.get('negative', 0), data.get('neutral', 0)]
-                                colors = ['#2ecc71', '#e74c3c', '#95a5a6']
-                                
-                                fig_pie = go.Figure(data=[go.Pie(
-                                    labels=labels, 
-                                    values=values,
-                                    marker_colors=colors,
-                                    hole=0.4
-                                )])
-                                fig_pie.update_layout(title="Sentiment Distribution")
-                                st.plotly_chart(fig_pie, use_container_width=True)
-                            
-                            with col2:
-                                # Bar chart
-                                fig_bar = px.bar(
-                                    x=labels,
-                                    y=values,
-                                    color=labels,
-                                    color_discrete_map={
-                                        'Positive': '#2ecc71',
-                                        'Negative': '#e74c3c',
-                                        'Neutral': '#95a5a6'
-                                    },
-                                    title="Sentiment Comparison"
-                                )
-                                fig_bar.update_layout(showlegend=False)
-                                st.plotly_chart(fig_bar, use_container_width=True)
-                            
-                            # Sample tweets
-                            if 'sample_tweets' in data:
-                                st.markdown("### 📝 Sample Tweets Analysis")
-                                for i, tweet in enumerate(data['sample_tweets'][:5]):
-                                    sentiment = tweet['sentiment']
-                                    emoji = "😊" if sentiment == 'positive' else "😢" if sentiment == 'negative' else "😐"
-                                    color = "#d4edda" if sentiment == 'positive' else "#f8d7da" if sentiment == 'negative' else "#e2e3e5"
-                                    
-                                    st.markdown(f"""
-                                    <div style="background-color: {color}; padding: 10px; margin: 5px 0; border-radius: 8px;">
-                                        <strong>{emoji} {sentiment.capitalize()}</strong><br>
-                                        {tweet['text']}
-                                    </div>
-                                    """, unsafe_allow_html=True)
-                        
-                        else:
-                            st.error(f"❌ API Error: {response.status_code}")
+                        # API call to backend (served from the session cache when possible)
+                        data = cached_post("/sentiment", {"keyword": keyword}, refresh=refresh_btn)
+                        st.session_state.sentiment_result = {'title': f"'{keyword}'", 'data': data, 'keyword': keyword}
+                    
+                    except ApiError as e:
+                        st.error(f"❌ API Error: {e.status_code}")
                     
                     except requests.exceptions.RequestException as e:
                         st.error(f"❌ Connection Error: {str(e)}")
@@ -488,11 +1240,82 @@ def show_dashboard():
                         with col4:
                             st.metric("Neutral", mock_data['neutral'], f"{mock_data['neutral_pct']:.1f}%")
             
-            elif input_method == "CSV Upload" and uploaded_file:
-                st.info("📊 Processing uploaded CSV data...")
-                # Process uploaded CSV here
+            elif input_method == "CSV Upload" and csv_source:
+                if text_column is None:
+                    st.warning("⚠️ Please upload a valid CSV file before analyzing")
+                else:
+                    progress_text = st.empty()
+                    with st.spinner("🔄 Scoring tweets..."):
+                        try:
+                            # Stream the file chunk by chunk, one batch request per chunk; the
+                            # labeled rows go to a file on disk (one per session, overwritten by
+                            # the next analysis) instead of piling up in memory
+                            tally = SentimentTally()
+                            labeled = LabeledCsvWriter(text_column, st.session_state.get('labeled_csv_path'))
+                            st.session_state.labeled_csv_path = labeled.path
+                            chunks = iter_text_chunks(csv_source, text_column, CHUNK_SIZE)
+                            try:
+                                for texts in timed_iter(perf_profile(), 'parse', "CSV chunks", chunks):
+                                    batch = post_sentiment_batch(texts)
+                                    tally.add(texts, batch)
+                                    labeled.add(texts, batch.get('labels', []))
+                                    progress_text.caption(f"Scored {tally.total:,} tweets...")
+                            finally:
+                                labeled.close()
+                            progress_text.empty()
+                            
+                            import pandas as pd
+                            st.session_state.sentiment_result = {
+                                'title': f"'{getattr(csv_source, 'name', csv_source)}'",
+                                'data': tally.result(),
+                                'labeled_preview': pd.DataFrame(tally.labeled_preview, columns=[text_column, 'sentiment']),
+                                'labeled_csv': labeled.path
+                            }
+                        
+                        except requests.exceptions.RequestException as e:
+                            st.error(f"❌ Connection Error: {str(e)}")
             else:
                 st.warning("⚠️ Please provide input data before analyzing")
+        
+        # The live view is filled in after the rest of the page has rendered (see below)
+        live_view = None
+        if input_method == "Live Stream" and st.session_state.get('live_running'):
+            live_status = st.empty()
+            live_status.caption("🔴 Connecting to the live stream...")
+            live_view = {
+                'view': st.empty(),
+                'status': live_status,
+                'keyword': live_keyword.strip(),
+                'window_size': live_window,
+                'rate': live_rate,
+                'replay': live_replay
+            }
+        
+        # Reruns redraw the latest results from session state without calling the backend
+        sentiment_result = st.session_state.get('sentiment_result')
+        if sentiment_result and not live_view:
+            st.success(f"✅ Analysis completed for {sentiment_result['title']}")
+            if 'comparison' in sentiment_result:
+                display_keyword_comparison(sentiment_result['comparison'])
+            else:
+                display_sentiment_results(sentiment_result['data'])
+            
+            if 'keyword' in sentiment_result:
+                display_sentiment_trend(sentiment_result['keyword'])
+            
+            # Per-row labels
+            if 'labeled_preview' in sentiment_result:
+                st.markdown("### 🏷️ Labeled Tweets")
+                with perf_span('render', "labeled tweets table"):
+                    st.dataframe(sentiment_result['labeled_preview'])
+                if os.path.exists(sentiment_result.get('labeled_csv', '')):
+                    with open(sentiment_result['labeled_csv'], 'rb') as labeled_csv:
+                        st.download_button(
+                            "⬇️ Download labeled CSV",
+                            labeled_csv,
+                            file_name="sentiment_labels.csv",
+                            mime="text/csv"
+                        )
 
     # Tab 2: Fake News Checker
     with tab2:
@@ -516,79 +1339,22 @@ def show_dashboard():
                 type="primary",
                 help="Analyze text for fake news indicators"
             )
+            refresh_check_btn = st.button(
+                "🔄 Refresh",
+                key="refresh_fakenews",
+                help="Re-check the text, bypassing cached results"
+            )
         
-        if check_btn and news_text:
+        if (check_btn or refresh_check_btn) and news_text:
+            st.session_state.pop('fakenews_result', None)
             with st.spinner("🔄 Analyzing news content..."):
                 try:
-                    # API call to backend
-                    response = requests.post(
-                        "http://127.0.0.1:5000/fakenews",
-                        json={"text": news_text},
-                        timeout=30
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        
-                        # Display results
-                        prediction = result.get('prediction', 'real')
-                        confidence = result.get('confidence', 0.5)
-                        
-                        col1, col2 = st.columns([2, 1])
-                        
-                        with col1:
-                            if prediction.lower() == 'real':
-                                st.markdown(f'''
-                                <div class="fake-news-real">
-                                    ✅ REAL NEWS DETECTED
-                                </div>
-                                ''', unsafe_allow_html=True)
-                            else:
-                                st.markdown(f'''
-                                <div class="fake-news-fake">
-                                    ❌ FAKE NEWS DETECTED
-                                </div>
-                                ''', unsafe_allow_html=True)
-                        
-                        with col2:
-                            # Confidence gauge
-                            fig_gauge = go.Figure(go.Indicator(
-                                mode = "gauge+number",
-                                value = confidence * 100,
-                                domain = {'x': [0, 1], 'y': [0, 1]},
-                                title = {'text': "Confidence"},
-                                gauge = {
-                                    'axis': {'range': [None, 100]},
-                                    'bar': {'color': "#2ecc71" if prediction.lower() == 'real' else "#e74c3c"},
-                                    'steps': [
-                                        {'range': [0, 50], 'color': "lightgray"},
-                                        {'range': [50, 100], 'color': "gray"}
-                                    ],
-                                    'threshold': {
-                                        'line': {'color': "red", 'width': 4},
-                                        'thickness': 0.75,
-                                        'value': 90
-                                    }
-                                }
-                            ))
-                            fig_gauge.update_layout(height=200)
-                            st.plotly_chart(fig_gauge, use_container_width=True)
-                        
-                        # Additional analysis
-                        if 'analysis' in result:
-                            st.markdown("### 📊 Detailed Analysis")
-                            analysis = result['analysis']
-                            
-                            col1, col2, col3 = st.columns(3)
-                            with col1:
-                                st.metric("Credibility Score", f"{analysis.get('credibility', 0.5):.2f}")
-                            with col2:
-                                st.metric("Language Quality", f"{analysis.get('language_quality', 0.5):.2f}")
-                            with col3:
-                                st.metric("Source Reliability", f"{analysis.get('source_reliability', 0.5):.2f}")
-                    
-                    else:
-                        st.error(f"❌ API Error: {response.status_code}")
+                    # API call to backend (served from the session cache when possible)
+                    result = cached_post("/fakenews", {"text": news_text}, refresh=refresh_check_btn)
+                    st.session_state.fakenews_result = result
+                
+                except ApiError as e:
+                    st.error(f"❌ API Error: {e.status_code}")
                 
                 except requests.exceptions.RequestException as e:
                     st.error(f"❌ Connection Error: {str(e)}")
@@ -616,8 +1382,12 @@ def show_dashboard():
                     st.progress(mock_confidence)
                     st.write(f"Confidence: {mock_confidence:.1%}")
         
-        elif check_btn and not news_text:
+        elif (check_btn or refresh_check_btn) and not news_text:
             st.warning("⚠️ Please enter news text to analyze")
+        
+        # Reruns redraw the latest verdict from session state without calling the backend
+        if st.session_state.get('fakenews_result'):
+            display_fake_news_result(st.session_state.fakenews_result)
 
     # Tab 3: Word Cloud Generator
     with tab3:
@@ -633,6 +1403,7 @@ def show_dashboard():
                 help="CSV should contain text data in a 'tweet' or 'text' column",
                 key="wordcloud_upload"
             )
+            wordcloud_source = wordcloud_file or server_csv_picker("wordcloud_data_file")
         
         with col2:
             st.markdown("### Customization")
@@ -642,75 +1413,71 @@ def show_dashboard():
                 ["viridis", "plasma", "inferno", "magma", "cool", "hot"]
             )
         
-        if wordcloud_file:
+        if wordcloud_source:
             try:
-                df_wc = pd.read_csv(wordcloud_file)
-                
-                # Find text column
-                text_column = None
-                for col in ['tweet', 'text', 'content', 'message']:
-                    if col in df_wc.columns:
-                        text_column = col
-                        break
+                # Find text column from the header only
+                with perf_span('parse', "CSV header"):
+                    wc_columns = read_columns(wordcloud_source)
+                text_column = find_text_column(wc_columns)
                 
                 if text_column:
                     st.success(f"✅ Found text data in '{text_column}' column")
                     
                     # Generate word cloud
+                    progress_text = st.empty()
                     with st.spinner("🎨 Generating word cloud..."):
                         try:
-                            # Combine all text
-                            text_data = ' '.join(df_wc[text_column].astype(str).tolist())
+                            # Counted once per file; option changes reuse the stored counts
+                            with perf_span('compute', "word counts (read + tokenize)"):
+                                term_counts = get_term_counts(wordcloud_source, text_column, progress_text)
                             
-                            # Create word cloud
-                            wordcloud = WordCloud(
-                                width=800, 
-                                height=400, 
-                                max_words=max_words,
-                                colormap=colormap,
-                                background_color='white',
-                                relative_scaling=0.5
-                            ).generate(text_data)
+                            # Render (or reuse) the word cloud as a PNG for these counts and options
+                            with perf_span('compute', "top word frequencies"):
+                                frequencies = term_counts.frequencies(max_words)
+                            figures = get_figure_cache()
+                            with perf_span('figure', "word cloud layout + PNG"):
+                                wordcloud_png = figures.get_or_build(
+                                    'wordcloud',
+                                    [sorted(frequencies.items()), max_words, colormap],
+                                    lambda: render_wordcloud_png(frequencies, max_words, colormap)
+                                )
                             
                             # Display word cloud
-                            fig, ax = plt.subplots(figsize=(12, 6))
-                            ax.imshow(wordcloud, interpolation='bilinear')
-                            ax.axis('off')
-                            plt.title(f'Word Cloud - Top {max_words} Words', fontsize=16, fontweight='bold')
-                            
-                            st.pyplot(fig)
+                            st.markdown(f"#### Word Cloud - Top {max_words} Words")
+                            with perf_span('render', "word cloud image"):
+                                st.image(wordcloud_png)
                             
                             # Word frequency table
                             st.markdown("### 📊 Top Words")
-                            word_freq = wordcloud.words_
+                            import pandas as pd
                             freq_df = pd.DataFrame(
-                                list(word_freq.items()), 
+                                term_counts.most_common(20), 
                                 columns=['Word', 'Frequency']
-                            ).head(20)
+                            )
                             
                             col1, col2 = st.columns([1, 2])
                             
                             with col1:
-                                st.dataframe(freq_df)
+                                with perf_span('render', "top words table"):
+                                    st.dataframe(freq_df)
                             
                             with col2:
                                 # Bar chart of top words
-                                fig_words = px.bar(
-                                    freq_df.head(10), 
-                                    x='Frequency', 
-                                    y='Word',
-                                    orientation='h',
-                                    title='Top 10 Most Frequent Words'
-                                )
-                                fig_words.update_layout(height=400)
-                                st.plotly_chart(fig_words, use_container_width=True)
+                                with perf_span('figure', "top words"):
+                                    fig_words = figures.get_or_build(
+                                        'top_words',
+                                        term_counts.most_common(10),
+                                        lambda: build_top_words_figure(freq_df.head(10))
+                                    )
+                                with perf_span('render', "top words"):
+                                    st.plotly_chart(fig_words, use_container_width=True)
                             
                         except Exception as e:
                             st.error(f"❌ Error generating word cloud: {str(e)}")
                             
                 else:
                     st.error("❌ No suitable text column found. Please ensure your CSV has a 'tweet', 'text', 'content', or 'message' column")
-                    st.write("Available columns:", list(df_wc.columns))
+                    st.write("Available columns:", wc_columns)
             
             except Exception as e:
                 st.error(f"❌ Error loading file: {str(e)}")
@@ -726,6 +1493,13 @@ def show_dashboard():
         """.format(datetime.now().strftime("%Y-%m-%d %H:%M")),
         unsafe_allow_html=True
     )
+    
+    if perf_panel is not None:
+        show_perf_panel(perf_panel, st.session_state.perf_profile)
+    
+    # Runs last, so every tab is drawn while the live view keeps updating
+    if live_view:
+        run_live_sentiment(**live_view)
 
 # Main app logic
 if st.session_state.page == 'landing':
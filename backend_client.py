@@ -0,0 +1,129 @@
+# Shared HTTP client for the dashboard's backend calls
+# One pooled keep-alive session, bounded retries with backoff, and a circuit breaker
+# so the dashboard falls back to demo data immediately while the API is down
+
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Backend location and call budget
+BACKEND_URL = os.environ.get('BACKEND_URL', 'http://127.0.0.1:5000')
+BACKEND_TIMEOUT = float(os.environ.get('BACKEND_TIMEOUT', 30))
+BACKEND_RETRIES = int(os.environ.get('BACKEND_RETRIES', 2))
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling the backend while the circuit breaker is open"""
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures and rejects calls for reset_timeout
+    seconds, then lets a single trial call through (half-open) to decide whether to close
+    """
+
+    def __init__(self, failure_threshold=2, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def retry_in(self):
+        """Seconds until the next trial call is allowed (0 when not open)"""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def allow(self):
+        """Whether a call may go through right now"""
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+class BackendClient:
+    """Pooled keep-alive client for the backend API"""
+
+    def __init__(self, base_url=BACKEND_URL, connect_timeout=3.05, read_timeout=BACKEND_TIMEOUT,
+                 retries=BACKEND_RETRIES, backoff_factor=0.3, pool_size=10, breaker=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker or CircuitBreaker()
+
+        # Retry connection failures and overload responses, but never re-send a request
+        # that already timed out while the backend was working on it
+        retry = Retry(
+            total=retries,
+            read=0,
+            backoff_factor=backoff_factor,
+            status_forcelist=[429, 502, 503, 504],
+            allowed_methods=frozenset(['GET', 'POST']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method, endpoint, **kwargs):
+        """Send a request through the circuit breaker; returns the requests.Response"""
+        if not self.breaker.allow():
+            raise CircuitOpenError(
+                f"Backend API unavailable at {self.base_url} "
+                f"(circuit open, retrying in {self.breaker.retry_in():.0f}s)"
+            )
+
+        kwargs.setdefault('timeout', self.timeout)
+        try:
+            response = self.session.request(method, f"{self.base_url}{endpoint}", **kwargs)
+        except requests.exceptions.RequestException:
+            self.breaker.record_failure()
+            raise
+
+        # A 500 still means the backend is up; only gateway/unavailable answers count as outages
+        if response.status_code in (502, 503, 504):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def post(self, endpoint, payload, **kwargs):
+        return self.request('POST', endpoint, json=payload, **kwargs)
+
+    def get(self, endpoint, **kwargs):
+        return self.request('GET', endpoint, **kwargs)
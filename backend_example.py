@@ -1,14 +1,489 @@
 # Example Flask Backend API for the Streamlit Dashboard
 # This is a reference implementation - you'll need to implement actual ML models
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
+from batch_format import ARROW_MEDIA_TYPE, arrow_available, encode_arrow
+from indicators import IndicatorLexicon
+from response_cache import ResponseCache, make_key
+from serving import InferenceExecutor, Overloaded
+from batching import MicroBatcher
+from claim_index import ClaimIndex
+from dedup import Deduplicator, score_deduplicated
+from live_source import CsvTail
+from metrics import Metrics, RequestTimer
+from model_registry import ArtifactStore, ModelRegistry, ModelUnavailable
+from post_index import PostIndex, tokenize
+from profiler import ProfileStore, SamplingProfiler
+from request_log import RequestLog
+from sentiment_store import SentimentStore, SentimentTracker, counts_summary, normalize_keyword
+from sentiment_engine import LABELS, load_engine
+from collections import deque
+import argparse
+import atexit
+import json
+import numpy as np
+import os
 import random
+import threading
 import time
 
 app = Flask(__name__)
 CORS(app)
 
+# Request metrics for GET /metrics (Prometheus text format); stages of a request are timed
+# on its own thread, stages of a shared model batch on the worker thread that runs it
+metrics = Metrics(window=int(os.environ.get('API_METRICS_WINDOW', 1024)))
+metrics.describe('http_requests_total', 'counter', "Requests by route, method and status")
+metrics.describe('http_request_duration_seconds', 'summary', "Time to produce a response, by route")
+metrics.describe('http_request_size_bytes', 'summary', "Request body size, by route")
+metrics.describe('http_response_size_bytes', 'summary', "Response body size (not streams), by route")
+metrics.describe('http_requests_in_flight', 'gauge', "Requests currently being handled, by route")
+metrics.describe('sentiment_streams_open', 'gauge', "Open /sentiment/stream responses")
+metrics.describe('backend_stage_seconds', 'summary', "Time per stage of a request, by route")
+metrics.describe('backend_batch_stage_seconds', 'summary', "Time per stage of a model batch, by batch kind")
+
+# Models are loaded and warmed up once at startup by the registry (see model_registry.py);
+# /health answers 503 until all of them are ready. Large arrays are memory-mapped from
+# MODEL_ARTIFACT_PATH, so worker processes on one machine share a single copy
+MODEL_ARTIFACT_PATH = os.environ.get(
+    'MODEL_ARTIFACT_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model_artifacts')
+)
+artifact_store = ArtifactStore(MODEL_ARTIFACT_PATH)
+models = ModelRegistry(
+    wait_timeout=float(os.environ.get('API_MODEL_WAIT_TIMEOUT', 30)),
+    retry_after=int(os.environ.get('API_RETRY_AFTER', 1))
+)
+
+# Warm-up batch: a few typical posts, repeated to a realistic batch size
+WARMUP_TEXTS = [
+    "Great progress on climate policy today, really impressive work",
+    "This is not good at all, a complete disaster and a scandal",
+    "BREAKING: shocking truth they don't want you to know, share before it's deleted",
+    "According to a peer-reviewed study published by researchers, the report was confirmed",
+    "People are talking about the election and the economy",
+] * 32
+
+# Fake/real indicator phrases, reloaded automatically when the file changes
+INDICATOR_LEXICON_PATH = os.environ.get(
+    'INDICATOR_LEXICON_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'indicators.json')
+)
+models.register(
+    'indicators',
+    lambda: IndicatorLexicon(INDICATOR_LEXICON_PATH),
+    warmup=lambda lexicon: [lexicon.scan(text) for text in WARMUP_TEXTS]
+)
+
+# Response cache for /sentiment and /fakenews
+# API_CACHE_SIZE=0 disables it; set API_CACHE_PATH to keep entries across restarts
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get('API_CACHE_SIZE', 1024)),
+    ttl=float(os.environ.get('API_CACHE_TTL', 300)),
+    path=os.environ.get('API_CACHE_PATH') or None
+)
+
+# Model calls run on a bounded pool; requests beyond workers + queue get a 429, and a
+# request gives up (500) after API_INFERENCE_TIMEOUT seconds rather than waiting forever
+INFERENCE_TIMEOUT = float(os.environ.get('API_INFERENCE_TIMEOUT', 60))
+inference_executor = InferenceExecutor(
+    max_workers=int(os.environ.get('API_INFERENCE_WORKERS', 4)),
+    max_queue=int(os.environ.get('API_INFERENCE_QUEUE', 16)),
+    retry_after=int(os.environ.get('API_RETRY_AFTER', 1)),
+    timeout=INFERENCE_TIMEOUT
+)
+
+# Micro-batching of concurrent /sentiment and /fakenews model calls
+BATCH_MAX_SIZE = int(os.environ.get('API_BATCH_MAX_SIZE', 32))
+BATCH_MAX_WAIT_MS = float(os.environ.get('API_BATCH_MAX_WAIT_MS', 10))
+
+# Simulated model latency: a fixed cost per batch plus a small cost per item
+MODEL_BATCH_OVERHEAD = 1.0
+MODEL_ITEM_COST = 0.01
+
+# Upper bound on texts accepted by a single /sentiment/batch call
+MAX_BATCH_TEXTS = 100000
+
+# Batches of at least this many texts are answered as an Arrow IPC stream when the client
+# accepts one (see batch_format.py); smaller ones, and every batch without pyarrow, as JSON
+ARROW_MIN_ROWS = int(os.environ.get('API_ARROW_MIN_ROWS', 2000))
+ARROW_AVAILABLE = arrow_available()
+
+# Sentiment engine (SENTIMENT_ENGINE=lexicon|transformer), shared by every endpoint
+# Warm-up calls score() rather than predict(), so it does not count in the throughput stats
+models.register(
+    'sentiment',
+    lambda: load_engine(artifacts=artifact_store),
+    warmup=lambda engine: engine.score(WARMUP_TEXTS)
+)
+
+# Near-duplicate collapsing (see dedup.py): within each scored batch, retweets and
+# copy-paste variants are scored once and share a label. API_DEDUP_THRESHOLD=0 disables it
+DEDUP_THRESHOLD = float(os.environ.get('API_DEDUP_THRESHOLD', 0.7))
+deduplicator = Deduplicator(threshold=DEDUP_THRESHOLD) if DEDUP_THRESHOLD > 0 else None
+
+# Sentiment scoring collapses duplicates when API_SENTIMENT_DEDUP is 'always', never when it
+# is 'never', and with 'auto' (default) only for engines slower than the fingerprinting
+# itself; the lexicon engine scores texts faster than MinHash can group them
+SENTIMENT_DEDUP = os.environ.get('API_SENTIMENT_DEDUP', 'auto')
+
+def sentiment_deduplicator(engine):
+    """The deduplicator to use when scoring with engine, or None to score every text"""
+    if SENTIMENT_DEDUP == 'never' or (SENTIMENT_DEDUP == 'auto' and not engine.dedup_by_default):
+        return None
+    return deduplicator
+
+def classify_texts_deduplicated(texts):
+    """
+    Classify a list of texts, running the model once per near-duplicate cluster
+    Returns (codes, scores, representatives): int8 label codes into LABELS and float32
+    polarities per text; representatives[i] is the index of the text whose result text i
+    shares (i itself for texts that were scored)
+    """
+    sentiment_engine = models.get('sentiment')
+    deduplicator = sentiment_deduplicator(sentiment_engine)
+    if deduplicator is None:
+        with metrics.timed('backend_batch_stage_seconds', batch='scoring', stage='inference'):
+            codes, scores = sentiment_engine.classify(texts)
+        return codes, scores, np.arange(len(texts))
+    
+    unique_scores = []
+    
+    def predict(unique_texts):
+        with metrics.timed('backend_batch_stage_seconds', batch='scoring', stage='inference'):
+            codes, scores = sentiment_engine.classify(unique_texts)
+        unique_scores.append(scores)
+        return codes
+    
+    with metrics.timed('backend_batch_stage_seconds', batch='scoring', stage='total'):
+        codes, representatives = score_deduplicated(predict, texts, deduplicator)
+    if not unique_scores:
+        return np.zeros(0, dtype=np.int8), np.zeros(0, dtype=np.float32), representatives
+    # Scored texts are the representatives, in index order; copy their scores like the codes
+    unique = np.flatnonzero(representatives == np.arange(len(texts)))
+    return codes, unique_scores[0][np.searchsorted(unique, representatives)], representatives
+
+def score_texts(texts):
+    """
+    Score a list of texts in a single batched pass
+    Returns a numpy array with one 'positive'/'negative'/'neutral' label per text
+    """
+    return LABELS[classify_texts_deduplicated(texts)[0]]
+
+def duplicate_fields(duplicates, total):
+    """Response fields reporting how many posts were near-duplicates of another"""
+    return {
+        "duplicates": int(duplicates),
+        "duplicate_ratio": round(duplicates / total, 3) if total else 0.0
+    }
+
+# Local corpus of posts that /sentiment keyword queries are answered from
+SENTIMENT_CORPUS_PATH = os.environ.get(
+    'SENTIMENT_CORPUS_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data.csv')
+)
+
+# On-disk inverted index over the corpus (see post_index.py), rebuilt when a source changes
+# POST_INDEX_SOURCES lists the CSV/JSONL files to ingest, separated by os.pathsep
+POST_INDEX_PATH = os.environ.get(
+    'POST_INDEX_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'post_index')
+)
+POST_INDEX_SOURCES = os.environ.get('POST_INDEX_SOURCES', SENTIMENT_CORPUS_PATH).split(os.pathsep)
+
+def load_post_index():
+    """
+    Open (or build) the post index; unreadable sources fail the model, so /health reports
+    the service unhealthy rather than /sentiment answering every keyword with zero posts
+    """
+    sentiment_engine = models.get('sentiment')
+    return PostIndex.open_or_build(
+        POST_INDEX_PATH, POST_INDEX_SOURCES, sentiment_engine.predict, sentiment_deduplicator(sentiment_engine)
+    )
+
+# Opened (or built) after the sentiment engine, which scores the posts it indexes
+models.register('post_index', load_post_index)
+
+# API_MODEL_LOADING=background (default) lets the server start answering /health while models
+# load; 'blocking' loads them before the module finishes importing
+models.start(background=os.environ.get('API_MODEL_LOADING', 'background') != 'blocking')
+
+# Import starts threads (batchers, inference pool, tracker, capture writer) and opens SQLite
+# connections, none of which survive fork(); a worker forked from an imported app (gunicorn
+# --preload) reports itself unhealthy instead of hanging. Each worker imports the app itself,
+# and memory-mapped model artifacts keep that cheap
+IMPORTED_IN_PID = os.getpid()
+
+def summarize_sentiment(texts, labels):
+    """Build the /sentiment response fields from texts and their labels"""
+    total = len(labels)
+    positive = int(np.count_nonzero(labels == 'positive'))
+    negative = int(np.count_nonzero(labels == 'negative'))
+    neutral = total - positive - negative
+    
+    sample_tweets = [
+        {"text": str(text), "sentiment": str(label)}
+        for text, label in zip(texts[:5], labels[:5])
+    ]
+    
+    return {
+        "total_tweets": total,
+        "positive": positive,
+        "negative": negative,
+        "neutral": neutral,
+        "positive_pct": round((positive / total) * 100, 1) if total else 0.0,
+        "negative_pct": round((negative / total) * 100, 1) if total else 0.0,
+        "neutral_pct": round((neutral / total) * 100, 1) if total else 0.0,
+        "sample_tweets": sample_tweets
+    }
+
+def cached_json(endpoint, payload, compute):
+    """
+    Serve a response from the cache, computing and storing it on a miss
+    Clients can force a fresh result with a 'Cache-Control: no-cache' header
+    """
+    with g.timer.stage('cache'):
+        key = make_key(endpoint, payload)
+        bypass = 'no-cache' in request.headers.get('Cache-Control', '')
+        result = None if bypass else response_cache.get(key)
+    hit = result is not None
+    if not hit:
+        with g.timer.stage('inference'):
+            result = compute()
+        response_cache.set(key, result)
+    
+    with g.timer.stage('serialize'):
+        response = jsonify(result)
+    response.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+    return response
+
+def simulate_model_latency(batch_size):
+    """Stand-in for batched inference cost"""
+    time.sleep(MODEL_BATCH_OVERHEAD + MODEL_ITEM_COST * batch_size)
+
+def run_sentiment_batch(keywords):
+    """Sentiment results for a batch of keywords"""
+    return [keyword_sentiment(keyword) for keyword in keywords]
+
+def keyword_sentiment(keyword):
+    """Aggregate the indexed corpus posts that contain every word of keyword"""
+    # In a real implementation, you would fetch fresh posts for the keyword
+    # Here the indexed local corpus stands in for the social media feed
+    post_index = models.get('post_index')
+    with metrics.timed('backend_batch_stage_seconds', batch='sentiment', stage='index_search'):
+        counts, samples = post_index.search(keyword)
+    response = counts_summary(counts['positive'], counts['negative'], counts['neutral'])
+    response.update(duplicate_fields(counts['duplicates'], response["total_tweets"]))
+    response["sample_tweets"] = [{"text": text, "sentiment": label} for text, label in samples]
+    return response
+
+# Similarity index of past /fakenews verdicts (see claim_index.py): a text whose cosine
+# similarity to an already checked claim is at least CLAIM_MATCH_THRESHOLD reuses its verdict
+# An empty CLAIM_INDEX_PATH disables it
+CLAIM_INDEX_PATH = os.environ.get(
+    'CLAIM_INDEX_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'claim_index')
+)
+CLAIM_MATCH_THRESHOLD = float(os.environ.get('CLAIM_MATCH_THRESHOLD', 0.8))
+
+def load_claim_index():
+    """Open (or create) the claim index; None if disabled or unreadable"""
+    if not CLAIM_INDEX_PATH:
+        return None
+    try:
+        return ClaimIndex(CLAIM_INDEX_PATH, max_claims=int(os.environ.get('CLAIM_INDEX_MAX_CLAIMS', 1000000)))
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not open the claim index at {CLAIM_INDEX_PATH}: {e}")
+        return None
+
+claim_index = load_claim_index()
+
+def run_fake_news_batch(texts):
+    """Run the (mock) fake news classifier on a batch of texts"""
+    # Near-duplicates reuse their representative's verdict, so only distinct texts are classified
+    with metrics.timed('backend_batch_stage_seconds', batch='fakenews', stage='preprocess'):
+        if deduplicator is not None:
+            representatives = deduplicator.group(texts)
+        else:
+            representatives = np.arange(len(texts))
+        distinct = {int(i): None for i in representatives}
+    
+    # Reworded versions of claims that were already checked reuse the stored verdict
+    if claim_index is not None:
+        with metrics.timed('backend_batch_stage_seconds', batch='fakenews', stage='claim_lookup'):
+            matches = claim_index.lookup([texts[i] for i in distinct], CLAIM_MATCH_THRESHOLD)
+        for i, match in zip(list(distinct), matches):
+            if match is not None:
+                distinct[i] = {**match, "indicators": scan_indicators(texts[i])}
+    
+    unchecked = [i for i, verdict in distinct.items() if verdict is None]
+    if unchecked:
+        with metrics.timed('backend_batch_stage_seconds', batch='fakenews', stage='inference'):
+            # Simulate processing time, paid once for the whole batch
+            simulate_model_latency(len(unchecked))
+            for i in unchecked:
+                distinct[i] = mock_fake_news(texts[i])
+        if claim_index is not None:
+            with metrics.timed('backend_batch_stage_seconds', batch='fakenews', stage='claim_store'):
+                claim_index.add([texts[i] for i in unchecked], [distinct[i] for i in unchecked], time.time())
+    return [dict(distinct[int(i)]) for i in representatives]
+
+def scan_indicators(text):
+    """Indicator phrases in text, timed as the indicator_scan stage"""
+    with metrics.timed('backend_batch_stage_seconds', batch='fakenews', stage='indicator_scan'):
+        return models.get('indicators').scan(text)
+
+def mock_fake_news(text):
+    """Mock fake news verdict for one text"""
+    # Mock fake news detection
+    # In a real implementation, you would:
+    # 1. Preprocess the text
+    # 2. Run it through a trained fake news detection model
+    # 3. Return prediction and confidence score
+    
+    # Simple mock logic based on indicator phrases (see indicators.json)
+    # One pass over the text finds every indicator and where it occurs
+    hits = scan_indicators(text)
+    fake_score = len({hit['phrase'] for hit in hits if hit['label'] == 'fake'})
+    real_score = len({hit['phrase'] for hit in hits if hit['label'] == 'real'})
+    
+    if fake_score > real_score:
+        prediction = "fake"
+        confidence = random.uniform(0.6, 0.9)
+    else:
+        prediction = "real" 
+        confidence = random.uniform(0.6, 0.9)
+    
+    return {
+        "prediction": prediction,
+        "confidence": confidence,
+        "analysis": {
+            "credibility": random.uniform(0.3, 0.9),
+            "language_quality": random.uniform(0.4, 0.9),
+            "source_reliability": random.uniform(0.3, 0.8)
+        },
+        "indicators": hits
+    }
+
+# Concurrent single-item requests share model calls through these batchers
+# At most one batch per inference worker runs at a time; the rest of the queue waits
+sentiment_batcher = MicroBatcher(
+    run_sentiment_batch,
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_ms=BATCH_MAX_WAIT_MS,
+    executor=inference_executor,
+    max_concurrent_batches=inference_executor.max_workers,
+    max_pending=BATCH_MAX_SIZE * (inference_executor.max_workers + inference_executor.max_queue),
+    retry_after=inference_executor.retry_after,
+    name='sentiment-batcher',
+    timeout=INFERENCE_TIMEOUT
+)
+fakenews_batcher = MicroBatcher(
+    run_fake_news_batch,
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_ms=BATCH_MAX_WAIT_MS,
+    executor=inference_executor,
+    max_concurrent_batches=inference_executor.max_workers,
+    max_pending=BATCH_MAX_SIZE * (inference_executor.max_workers + inference_executor.max_queue),
+    retry_after=inference_executor.retry_after,
+    name='fakenews-batcher',
+    timeout=INFERENCE_TIMEOUT
+)
+
+# Gauges read from the components when /metrics is scraped
+metrics.gauge_callback('inference_in_flight', "Model calls running or queued on the inference pool",
+                       lambda: [({}, inference_executor.stats()['in_flight'])])
+metrics.gauge_callback('batcher_pending', "Items waiting for a micro-batch",
+                       lambda: [({'batch': 'sentiment'}, sentiment_batcher.stats()['pending']),
+                                ({'batch': 'fakenews'}, fakenews_batcher.stats()['pending'])])
+metrics.gauge_callback('response_cache_entries', "Entries in the response cache",
+                       lambda: [({}, response_cache.stats()['size'])])
+metrics.gauge_callback('model_ready', "1 once a model is loaded and warmed up, by model",
+                       lambda: [({'model': name}, int(model['status'] == 'ready'))
+                                for name, model in models.stats().items()])
+
+# Per-request sampling profiler, off unless API_PROFILING=1 or switched on at runtime with
+# POST /debug/profiling; then a request sent with an 'X-Profile: 1' header is profiled and
+# its collapsed stacks are kept for GET /debug/profiles/<id>
+profiling = {
+    'enabled': os.environ.get('API_PROFILING', '0') == '1',
+    'interval_ms': float(os.environ.get('API_PROFILING_INTERVAL_MS', 5))
+}
+profile_store = ProfileStore(max_profiles=20)
+
+# Traffic capture for capacity testing, off unless API_CAPTURE_PATH is set: every /sentiment and
+# /fakenews request is appended to a rotating JSON Lines log with its arrival time, latency and
+# response size, and benchmarks/replay.py re-issues the log at its original pace (or N times faster)
+CAPTURE_ENDPOINTS = ('/sentiment', '/fakenews')
+request_log = None
+if os.environ.get('API_CAPTURE_PATH'):
+    request_log = RequestLog(
+        os.environ['API_CAPTURE_PATH'],
+        max_bytes=int(float(os.environ.get('API_CAPTURE_MAX_MB', 100)) * 2**20),
+        backups=int(os.environ.get('API_CAPTURE_BACKUPS', 5)),
+        compress=os.environ.get('API_CAPTURE_COMPRESS', '0') == '1'
+    ).start()
+    atexit.register(request_log.close)
+
+def route_label():
+    """Route rule of the current request, so metric labels stay bounded"""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+@app.before_request
+def start_request_metrics():
+    g.arrived = time.time()
+    g.timer = RequestTimer()
+    g.route = route_label()
+    metrics.inc('http_requests_in_flight', 1, route=g.route)
+    if request.content_length:
+        metrics.observe('http_request_size_bytes', request.content_length, route=g.route)
+    g.profiler = None
+    if profiling['enabled'] and request.headers.get('X-Profile') == '1':
+        g.profiler = SamplingProfiler(
+            [threading.get_ident()], thread_prefixes=('inference',), interval=profiling['interval_ms'] / 1000
+        ).start()
+
+@app.after_request
+def record_request_metrics(response):
+    route = g.get('route') or route_label()
+    timer = g.get('timer')
+    elapsed = timer.elapsed() if timer is not None else None
+    if timer is not None:
+        metrics.observe('http_request_duration_seconds', elapsed, route=route)
+        for stage, seconds in timer.stages.items():
+            metrics.observe('backend_stage_seconds', seconds, route=route, stage=stage)
+        response.headers['Server-Timing'] = timer.server_timing()
+    metrics.inc('http_requests_total', 1, route=route, method=request.method, status=response.status_code)
+    if not response.is_streamed:
+        metrics.observe('http_response_size_bytes', response.calculate_content_length() or 0, route=route)
+    
+    if request_log is not None and route in CAPTURE_ENDPOINTS:
+        request_log.append({
+            "ts": round(g.get('arrived', time.time()), 6),
+            "endpoint": route,
+            "payload": request.get_json(silent=True),
+            "latency_ms": round(elapsed * 1000, 3) if elapsed is not None else None,
+            "status": response.status_code,
+            "response_bytes": response.calculate_content_length() or 0,
+            "cache": response.headers.get('X-Cache')
+        })
+    
+    if g.get('profiler') is not None:
+        response.headers['X-Profile-Id'] = profile_store.add(route, g.profiler.stop())
+        g.profiler = None
+    return response
+
+@app.teardown_request
+def finish_request_metrics(_error):
+    # Runs even when a handler raised; streamed responses can run it twice, hence the pop
+    route = g.pop('route', None)
+    if route is not None:
+        metrics.inc('http_requests_in_flight', -1, route=route)
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.stop()
+
 @app.route('/sentiment', methods=['POST'])
 def analyze_sentiment():
     """
@@ -16,43 +491,231 @@ def analyze_sentiment():
     Expected input: {"keyword": "your_keyword"}
     """
     try:
-        data = request.get_json()
-        keyword = data.get('keyword', '')
+        with g.timer.stage('parse'):
+            data = request.get_json()
+        with g.timer.stage('preprocess'):
+            keyword = data.get('keyword', '')
+            if sentiment_store is not None and keyword.strip():
+                # Start recording this keyword's sentiment over time for /sentiment/trend
+                sentiment_store.track(keyword)
         
-        # Simulate processing time
-        time.sleep(1)
+        return cached_json('/sentiment', data, lambda: sentiment_batcher(keyword))
+    
+    except (Overloaded, ModelUnavailable):
+        raise
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/sentiment/batch', methods=['POST'])
+def analyze_sentiment_batch():
+    """
+    Batch sentiment analysis endpoint
+    Expected input: {"texts": ["first tweet", "second tweet", ...]}
+    Returns the /sentiment aggregate fields plus one label per input text, as JSON or, for
+    large batches and 'Accept: application/vnd.apache.arrow.stream', as an Arrow IPC stream
+    """
+    try:
+        with g.timer.stage('parse'):
+            data = request.get_json()
+        texts = data.get('texts', [])
         
-        # Mock sentiment analysis results
-        # In a real implementation, you would:
-        # 1. Fetch tweets/social media posts for the keyword
-        # 2. Run them through a sentiment analysis model
-        # 3. Aggregate the results
+        if not isinstance(texts, list):
+            return jsonify({"error": "'texts' must be a list of strings"}), 400
+        if len(texts) > MAX_BATCH_TEXTS:
+            return jsonify({"error": f"At most {MAX_BATCH_TEXTS} texts per batch"}), 413
+        if not all(isinstance(text, str) for text in texts):
+            return jsonify({"error": "'texts' must be a list of strings"}), 400
         
-        total = random.randint(100, 500)
-        positive = random.randint(20, total//2)
-        negative = random.randint(10, total//3)
-        neutral = total - positive - negative
+        # Score the whole batch at once rather than one model call per text
+        with g.timer.stage('inference'):
+            codes, scores, representatives = inference_executor.run(classify_texts_deduplicated, texts)
         
-        sample_tweets = [
-            {"text": f"Great news about {keyword}! Very positive development.", "sentiment": "positive"},
-            {"text": f"Not sure about this {keyword} situation. Seems concerning.", "sentiment": "negative"},
-            {"text": f"Just heard about {keyword}. Need more information.", "sentiment": "neutral"},
-            {"text": f"Amazing progress with {keyword}! Love to see it.", "sentiment": "positive"},
-            {"text": f"The {keyword} issue is getting worse every day.", "sentiment": "negative"}
-        ]
+        with g.timer.stage('postprocess'):
+            labels = LABELS[codes]
+            response = summarize_sentiment(texts, labels)
+            response.update(duplicate_fields(np.count_nonzero(representatives != np.arange(len(texts))), len(texts)))
         
-        response = {
-            "total_tweets": total,
-            "positive": positive,
-            "negative": negative,
-            "neutral": neutral,
-            "positive_pct": round((positive / total) * 100, 1),
-            "negative_pct": round((negative / total) * 100, 1),
-            "neutral_pct": round((neutral / total) * 100, 1),
-            "sample_tweets": sample_tweets
-        }
+        with g.timer.stage('serialize'):
+            if ARROW_AVAILABLE and len(texts) >= ARROW_MIN_ROWS and ARROW_MEDIA_TYPE in request.headers.get('Accept', ''):
+                result = Response(encode_arrow(response, codes, scores, LABELS), mimetype=ARROW_MEDIA_TYPE)
+            else:
+                response["labels"] = labels.tolist()
+                result = jsonify(response)
+        result.headers['Vary'] = 'Accept'
+        return result
+    
+    except (Overloaded, ModelUnavailable):
+        raise
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Live stream: posts replayed from, then tailed on, a local CSV (defaults to the corpus)
+STREAM_SOURCE_PATH = os.environ.get('SENTIMENT_STREAM_PATH', SENTIMENT_CORPUS_PATH)
+STREAM_TICK_SECONDS = float(os.environ.get('API_STREAM_TICK_SECONDS', 0.5))
+# Per-tick bounds, so a huge backlog or a sparse keyword never stalls a tick
+STREAM_MAX_POSTS_PER_TICK = 5000
+STREAM_MAX_READS_PER_TICK = 8
+# Open streams each hold a request thread, so they are capped separately (429 beyond this)
+stream_slots = threading.BoundedSemaphore(int(os.environ.get('API_MAX_STREAMS', 4)))
+
+def stream_scored_posts(tail, keyword, rate, loop, limit):
+    """
+    Yield NDJSON lines for /sentiment/stream
+    Each tick scores up to rate * tick newly read posts in one batch; a tick with nothing
+    to send yields a heartbeat so clients (and disconnect detection) see regular traffic
+    """
+    # Posts must contain every word of keyword, matched whole as PostIndex.search does; an
+    # empty keyword passes every post, one without indexable words ('!!!') none
+    terms = set(tokenize(keyword))
+    match_all = not keyword.strip()
+    pending = deque()
+    allowance = 0.0
+    sent = 0
+    
+    while True:
+        tick_started = time.monotonic()
+        if rate > 0:
+            allowance = min(allowance + rate * STREAM_TICK_SECONDS, STREAM_MAX_POSTS_PER_TICK)
+        else:
+            allowance = STREAM_MAX_POSTS_PER_TICK
+        
+        # Read only as much of the source as this tick can send
+        for _ in range(STREAM_MAX_READS_PER_TICK):
+            if len(pending) >= allowance:
+                break
+            texts = tail.read()
+            if not texts and loop and not pending:
+                tail.rewind()
+                texts = tail.read()
+            if not texts:
+                break
+            pending.extend(text for text in texts if match_all or (terms and terms.issubset(tokenize(text))))
         
-        return jsonify(response)
+        count = int(min(allowance, len(pending)))
+        if limit:
+            count = min(count, limit - sent)
+        batch = [pending.popleft() for _ in range(count)]
+        lines = []
+        if batch:
+            try:
+                labels = inference_executor.run(score_texts, batch)
+            except (Overloaded, ModelUnavailable):
+                # Keep the posts and try again next tick instead of dropping the stream
+                pending.extendleft(reversed(batch))
+                batch = []
+            else:
+                allowance -= len(batch)
+                sent += len(batch)
+                now = round(time.time(), 3)
+                lines = [
+                    json.dumps({"type": "post", "text": text, "sentiment": str(label), "ts": now})
+                    for text, label in zip(batch, labels)
+                ]
+        if rate <= 0 or not pending:
+            allowance = 0.0
+        
+        if lines:
+            yield '\n'.join(lines) + '\n'
+        else:
+            yield json.dumps({"type": "heartbeat", "ts": round(time.time(), 3), "pending": len(pending)}) + '\n'
+        
+        if limit and sent >= limit:
+            yield json.dumps({"type": "end", "posts": sent}) + '\n'
+            return
+        time.sleep(max(0.0, STREAM_TICK_SECONDS - (time.monotonic() - tick_started)))
+
+@app.route('/sentiment/stream', methods=['GET'])
+def stream_sentiment():
+    """
+    Live sentiment stream as NDJSON (one JSON object per line)
+    Query parameters: keyword (posts containing all of its words), rate (posts/sec, 0 = as fast as read),
+    replay (1 = start from the first row, 0 = only new rows), loop (1 = restart at the end),
+    limit (stop after this many posts)
+    Lines: {"type": "post", "text", "sentiment", "ts"}, {"type": "heartbeat", "ts", "pending"},
+    and a final {"type": "end", "posts"} when limit is reached
+    """
+    keyword = request.args.get('keyword', '').strip()
+    rate = request.args.get('rate', 20.0, type=float)
+    replay = request.args.get('replay', '1') != '0'
+    loop = request.args.get('loop', '0') == '1'
+    limit = max(0, request.args.get('limit', 0, type=int))
+    
+    if not stream_slots.acquire(blocking=False):
+        raise Overloaded(inference_executor.retry_after)
+    try:
+        tail = CsvTail(STREAM_SOURCE_PATH, replay=replay)
+    except (OSError, ValueError) as e:
+        stream_slots.release()
+        return jsonify({"error": f"Stream source unavailable: {e}"}), 500
+    
+    def generate():
+        metrics.inc('sentiment_streams_open', 1)
+        try:
+            yield from stream_scored_posts(tail, keyword, rate, loop, limit)
+        finally:
+            # Runs when the stream ends or the client disconnects
+            metrics.inc('sentiment_streams_open', -1)
+            tail.close()
+            stream_slots.release()
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+# Aggregation store: per-keyword sentiment counts over time, fed from the stream source
+# SENTIMENT_STORE_PATH= (empty) disables it
+SENTIMENT_STORE_PATH = os.environ.get(
+    'SENTIMENT_STORE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sentiment_store.db')
+)
+sentiment_store = None
+sentiment_tracker = None
+if SENTIMENT_STORE_PATH:
+    sentiment_store = SentimentStore(
+        SENTIMENT_STORE_PATH, max_keywords=int(os.environ.get('SENTIMENT_MAX_TRACKED_KEYWORDS', 200))
+    )
+    for tracked_keyword in os.environ.get('SENTIMENT_TRACKED_KEYWORDS', '').split(','):
+        if tracked_keyword.strip():
+            sentiment_store.track(tracked_keyword)
+    sentiment_tracker = SentimentTracker(
+        sentiment_store, STREAM_SOURCE_PATH, lambda texts: inference_executor.run(score_texts, texts)
+    ).start()
+
+# Longest window /sentiment/trend answers
+MAX_TREND_HOURS = 24 * 365
+
+@app.route('/sentiment/trend', methods=['GET'])
+def sentiment_trend():
+    """
+    Sentiment for a keyword over a time window, from the pre-computed rollups
+    Query parameters: keyword (omit for all posts), hours (window length, default 168),
+    granularity (minute, hour or day; chosen from the window length by default)
+    """
+    if sentiment_store is None:
+        return jsonify({"error": "Sentiment store is disabled (SENTIMENT_STORE_PATH is empty)"}), 404
+    
+    try:
+        keyword = normalize_keyword(request.args.get('keyword', ''))
+        hours = request.args.get('hours', 168.0, type=float)
+        granularity = request.args.get('granularity') or None
+        if not 0 < hours <= MAX_TREND_HOURS:
+            return jsonify({"error": f"'hours' must be between 0 and {MAX_TREND_HOURS}"}), 400
+        if granularity not in (None, 'minute', 'hour', 'day'):
+            return jsonify({"error": "'granularity' must be minute, hour or day"}), 400
+        
+        tracked = sentiment_store.track(keyword)
+        until = time.time()
+        since = until - hours * 3600
+        granularity, buckets = sentiment_store.series(keyword, since, until, granularity)
+        
+        return jsonify({
+            "keyword": keyword,
+            "tracked": tracked,
+            "tracking_since": sentiment_store.tracked().get(keyword),
+            "since": since,
+            "until": until,
+            "granularity": granularity,
+            "summary": sentiment_store.summary(keyword, since, until),
+            "buckets": buckets
+        })
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -64,56 +727,132 @@ def check_fake_news():
     Expected input: {"text": "news text to analyze"}
     """
     try:
-        data = request.get_json()
+        with g.timer.stage('parse'):
+            data = request.get_json()
         text = data.get('text', '')
         
-        # Simulate processing time
-        time.sleep(1)
-        
-        # Mock fake news detection
-        # In a real implementation, you would:
-        # 1. Preprocess the text
-        # 2. Run it through a trained fake news detection model
-        # 3. Return prediction and confidence score
-        
-        # Simple mock logic based on certain keywords
-        fake_indicators = ['shocking', 'unbelievable', 'doctors hate this', 'secret', 'conspiracy']
-        real_indicators = ['according to', 'study shows', 'research indicates', 'official', 'confirmed']
-        
-        fake_score = sum(1 for indicator in fake_indicators if indicator.lower() in text.lower())
-        real_score = sum(1 for indicator in real_indicators if indicator.lower() in text.lower())
-        
-        if fake_score > real_score:
-            prediction = "fake"
-            confidence = random.uniform(0.6, 0.9)
-        else:
-            prediction = "real" 
-            confidence = random.uniform(0.6, 0.9)
-        
-        response = {
-            "prediction": prediction,
-            "confidence": confidence,
-            "analysis": {
-                "credibility": random.uniform(0.3, 0.9),
-                "language_quality": random.uniform(0.4, 0.9),
-                "source_reliability": random.uniform(0.3, 0.8)
-            }
-        }
-        
-        return jsonify(response)
+        return cached_json('/fakenews', data, lambda: fakenews_batcher(text))
     
+    except (Overloaded, ModelUnavailable):
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.errorhandler(Overloaded)
+def handle_overloaded(e):
+    """Backpressure: tell clients to back off instead of queueing without limit"""
+    response = jsonify({"error": "Server busy, retry later", "retry_after": e.retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+@app.errorhandler(ModelUnavailable)
+def handle_model_unavailable(e):
+    """Models still loading (or failed to load): 503 until /health reports ready"""
+    response = jsonify({"error": str(e), "retry_after": e.retry_after})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+@app.route('/indicators/reload', methods=['POST'])
+def reload_indicators():
+    """Recompile the indicator lexicon from disk without restarting the server"""
+    try:
+        return jsonify(models.get('indicators').reload())
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Request counts, latency and size quantiles, stage timings and gauges for Prometheus"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/debug/profiling', methods=['GET', 'POST'])
+def profiling_settings():
+    """
+    Show or change the profiler switch
+    Expected input: {"enabled": true, "interval_ms": 5}
+    """
+    if request.method == 'POST':
+        data = request.get_json() or {}
+        if 'enabled' in data:
+            profiling['enabled'] = bool(data['enabled'])
+        if 'interval_ms' in data:
+            interval_ms = float(data['interval_ms'])
+            if not 0.5 <= interval_ms <= 1000:
+                return jsonify({"error": "'interval_ms' must be between 0.5 and 1000"}), 400
+            profiling['interval_ms'] = interval_ms
+    return jsonify({**profiling, "profiles": profile_store.list()})
+
+@app.route('/debug/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """One stored profile in collapsed-stack format (flamegraph.pl / speedscope input)"""
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        return jsonify({"error": "Unknown or expired profile"}), 404
+    return Response(profile['collapsed'], mimetype='text/plain')
+
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
-    return jsonify({"status": "healthy", "service": "fake-news-sentiment-api"})
+    """Health check endpoint; 503 while models are loading or if one failed to load"""
+    status = models.status() if os.getpid() == IMPORTED_IN_PID else 'forked'
+    sentiment_engine = models.peek('sentiment')
+    post_index = models.peek('post_index')
+    return jsonify({
+        "status": {"ready": "healthy", "starting": "starting", "failed": "unhealthy", "forked": "unhealthy"}[status],
+        "error": "Forked after import; run without --preload" if status == 'forked' else None,
+        "service": "fake-news-sentiment-api",
+        "models": models.stats(),
+        "cache": response_cache.stats(),
+        "sentiment_engine": sentiment_engine.stats() if sentiment_engine is not None else None,
+        "post_index": post_index.stats() if post_index is not None else None,
+        "dedup": deduplicator.stats() if deduplicator is not None else None,
+        "claim_index": claim_index.stats() if claim_index is not None else None,
+        "capture": request_log.stats() if request_log is not None else None,
+        "inference": inference_executor.stats(),
+        "sentiment_store": (
+            {**sentiment_store.stats(), "tracker": sentiment_tracker.stats()} if sentiment_store else None
+        ),
+        "batching": {
+            "sentiment": sentiment_batcher.stats(),
+            "fakenews": fakenews_batcher.stats()
+        }
+    }), 200 if status == 'ready' else 503
+
+def serve_production(host, port, threads):
+    """Serve with waitress when installed, otherwise Werkzeug's threaded server without debug"""
+    try:
+        from waitress import serve
+    except ImportError:
+        print(f"waitress not installed, using Werkzeug threaded server on {host}:{port}")
+        app.run(debug=False, threaded=True, host=host, port=port)
+    else:
+        print(f"Serving with waitress ({threads} threads) on {host}:{port}")
+        serve(app, host=host, port=port, threads=threads)
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fake news & sentiment API")
+    parser.add_argument('--serve', choices=['dev', 'production'], default='dev',
+                        help="'dev' runs Flask's debug server, 'production' a threaded WSGI server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=32,
+                        help="Request threads in production mode (inference is capped by API_INFERENCE_WORKERS)")
+    args = parser.parse_args()
+    
     print("Starting Flask API server...")
     print("Endpoints available:")
     print("- POST /sentiment - Sentiment analysis")
+    print("- POST /sentiment/batch - Batch sentiment analysis")
+    print("- GET /sentiment/stream - Live sentiment stream (NDJSON)")
+    print("- GET /sentiment/trend - Keyword sentiment over time")
     print("- POST /fakenews - Fake news detection") 
+    print("- POST /indicators/reload - Reload indicator lexicon")
+    print("- GET /metrics - Prometheus metrics")
+    print("- GET|POST /debug/profiling - Per-request profiler switch")
     print("- GET /health - Health check")
-    app.run(debug=True, host='127.0.0.1', port=5000)
\ No newline at end of file
+    
+    if args.serve == 'production':
+        serve_production(args.host, args.port, args.threads)
+    else:
+        app.run(debug=True, host=args.host, port=args.port)
\ No newline at end of file
@@ -0,0 +1,68 @@
+# Compact columnar encoding for large /sentiment/batch responses
+# A JSON body with one label string per text costs more to build in Flask and to parse in the
+# dashboard than scoring the texts does. A client that sends 'Accept: application/vnd.apache.arrow.stream'
+# instead gets an Arrow IPC stream with two columns: label (int8 dictionary codes, read by pandas
+# as a Categorical) and score (float32 polarity). The aggregate fields of the JSON response ride
+# along as JSON in the schema metadata. pyarrow is optional on the backend: without it, and for
+# small batches, the response stays JSON. Streamlit depends on pyarrow, so the dashboard has it
+
+import importlib.util
+import json
+
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+
+def arrow_available():
+    """Whether pyarrow can be imported, without importing it"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+def accept_header():
+    """Accept header for a batch request: Arrow when this side can decode it, JSON either way"""
+    if arrow_available():
+        return f'{ARROW_MEDIA_TYPE}, application/json;q=0.5'
+    return 'application/json'
+
+def is_arrow(content_type):
+    return (content_type or '').split(';')[0].strip() == ARROW_MEDIA_TYPE
+
+def encode_arrow(fields, codes, scores, label_names):
+    """Arrow IPC stream bytes for the response fields plus per-text scores and label codes (into label_names)"""
+    import pyarrow as pa
+
+    labels = pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int8()), pa.array(list(label_names)))
+    table = pa.table(
+        {'label': labels, 'score': pa.array(scores, type=pa.float32())},
+        metadata={'fields': json.dumps(fields)}
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def decode_arrow(content):
+    """
+    Decode encode_arrow() output into (fields, labels, scores): the JSON response's fields, a
+    pandas Categorical over the int8 label codes and a float32 array of scores; both use the
+    response's buffers, pd.DataFrame({'label': labels, 'score': scores}) makes them a frame
+    """
+    import pandas as pd
+    import pyarrow as pa
+
+    table = pa.ipc.open_stream(pa.py_buffer(content)).read_all()
+    fields = json.loads(table.schema.metadata[b'fields'])
+    labels, scores = (
+        # encode_arrow writes a single batch, read in place; combine_chunks() would copy it
+        column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+        for column in (table.column('label'), table.column('score'))
+    )
+    categorical = pd.Categorical.from_codes(labels.indices.to_numpy(), labels.dictionary.to_pylist())
+    return fields, categorical, scores.to_numpy()
+
+def decode_response(response):
+    """
+    Batch response as a dict shaped like the JSON one, whichever format the backend chose
+    With Arrow, 'labels' is a pandas Categorical and there is a 'scores' float32 array
+    """
+    if not is_arrow(response.headers.get('Content-Type')):
+        return response.json()
+    fields, labels, scores = decode_arrow(response.content)
+    return {**fields, 'labels': labels, 'scores': scores}
@@ -0,0 +1,138 @@
+# Dynamic micro-batching for model inference
+# Concurrent single-item requests are collected for up to max_wait_ms (or until
+# max_batch_size items are waiting), run through the model as one batch, and each
+# caller gets its own result back through a Future
+
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+import threading
+import time
+
+from serving import Overloaded
+
+class MicroBatcher:
+    """
+    Collects items submitted from many request threads into batches for batch_fn
+    batch_fn(items) must return one result per item, in order
+
+    A new batch is only formed once one of max_concurrent_batches slots is free, so while
+    the model is busy, arrivals pile up and the next batch is larger
+    Past max_pending waiting items, submit() raises Overloaded carrying retry_after (seconds)
+    """
+
+    def __init__(self, batch_fn, max_batch_size=32, max_wait_ms=10, executor=None,
+                 max_concurrent_batches=1, max_pending=None, retry_after=1, name='batcher', timeout=None):
+        self.batch_fn = batch_fn
+        self.name = name
+        self.timeout = timeout
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = executor
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._slots = threading.Semaphore(max_concurrent_batches)
+        self._queue = deque()
+        self._cond = threading.Condition()
+
+        self._batches = 0
+        self._items = 0
+        self._rejected = 0
+        # Histogram buckets: 1, 2, 4, ... up to max_batch_size
+        self._bucket_bounds = []
+        bound = 1
+        while bound < max_batch_size:
+            self._bucket_bounds.append(bound)
+            bound *= 2
+        self._bucket_bounds.append(max_batch_size)
+        self._histogram = [0] * len(self._bucket_bounds)
+
+        self._thread = threading.Thread(target=self._collect_forever, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """Queue one item and return a Future for its result; raises Overloaded when full"""
+        if not self._thread.is_alive():
+            # Threads do not survive fork(): a batcher created before the process forked has
+            # no collector here, and its items would wait forever
+            raise RuntimeError(f"{self.name} has no collector thread in this process (forked after start?)")
+        future = Future()
+        with self._cond:
+            if self.max_pending is not None and len(self._queue) >= self.max_pending:
+                self._rejected += 1
+                raise Overloaded(self.retry_after)
+            self._queue.append((item, future))
+            self._cond.notify()
+        return future
+
+    def __call__(self, item):
+        """Submit one item and wait for its result, at most timeout seconds (None = no limit)"""
+        try:
+            return self.submit(item).result(self.timeout)
+        except FutureTimeout:
+            raise TimeoutError(f"No result from {self.name} within {self.timeout:g}s") from None
+
+    def _collect_forever(self):
+        while True:
+            self._slots.acquire()
+            batch = self._next_batch()
+            try:
+                if self.executor is not None:
+                    self.executor.submit(self._run_batch, batch)
+                else:
+                    threading.Thread(target=self._run_batch, args=(batch,), daemon=True).start()
+            except Overloaded as e:
+                self._slots.release()
+                for _, future in batch:
+                    future.set_exception(e)
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            # Give other requests a short window to join this batch
+            deadline = time.monotonic() + self.max_wait
+            while len(self._queue) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            size = min(len(self._queue), self.max_batch_size)
+            return [self._queue.popleft() for _ in range(size)]
+
+    def _run_batch(self, batch):
+        try:
+            results = self.batch_fn([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+        else:
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        finally:
+            self._record(len(batch))
+            self._slots.release()
+
+    def _record(self, size):
+        with self._cond:
+            self._batches += 1
+            self._items += size
+            for i, bound in enumerate(self._bucket_bounds):
+                if size <= bound:
+                    self._histogram[i] += 1
+                    break
+
+    def stats(self):
+        """Batch counters and the batch-size histogram as [{"le": N, "count": batches}]"""
+        with self._cond:
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+                'pending': len(self._queue),
+                'batches': self._batches,
+                'items': self._items,
+                'rejected': self._rejected,
+                'mean_batch_size': round(self._items / self._batches, 2) if self._batches else 0.0,
+                'batch_size_histogram': [
+                    {'le': bound, 'count': count} for bound, count in zip(self._bucket_bounds, self._histogram)
+                ]
+            }
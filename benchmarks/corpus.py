@@ -0,0 +1,199 @@
+# Synthetic corpus generator for the benchmarks
+# Writes, from one seed and always byte-for-byte the same:
+#   tweets.csv         id,created_at,tweet rows for the sentiment, word cloud and index paths, with
+#                      sentiment words, negations, hashtags, mentions, links and a share of
+#                      retweets and copy-paste variants (so deduplication has work to do)
+#   news.jsonl         headlines for /fakenews, with fake/real indicator phrases and a share of
+#                      rewordings of earlier headlines (so the claim index gets matches)
+#   request_log.jsonl  a request log for benchmarks/replay.py: Poisson arrivals at --qps,
+#                      mixing /sentiment keyword queries (popular topics dominate) and /fakenews texts
+# Rows are written as they are generated, so 10M rows need no more memory than 10k
+#
+# Usage:
+#   python benchmarks/corpus.py --rows 100000 --out bench_data
+#   python benchmarks/corpus.py --rows 10000000 --news-rows 100000 --requests 50000 --qps 200 --out bench_data
+
+import argparse
+import csv
+import datetime
+import json
+import os
+import random
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from sentiment_engine import DEFAULT_LEXICON, NEGATORS
+
+TOPICS = (
+    "election climate economy ai vaccine market football housing energy jobs tax healthcare crypto "
+    "space school inflation police immigration wildfire tech science transport water farming"
+).split()
+
+FILLER = (
+    "the a this that people today new just really about we they it is are was will news "
+    "city government report week year time more some many our their from with after over"
+).split()
+
+POSITIVE = [word for word, weight in DEFAULT_LEXICON.items() if weight > 0]
+NEGATIVE = [word for word, weight in DEFAULT_LEXICON.items() if weight < 0]
+
+FAKE_PHRASES = ["shocking", "unbelievable", "doctors hate this", "secret", "conspiracy"]
+REAL_PHRASES = ["according to", "study shows", "research indicates", "official", "confirmed"]
+
+CLAIMS = [
+    "{topic} figures were {verb} by the ministry this week",
+    "new {topic} plan will {verb} costs for families",
+    "scientists link {topic} to a rise in hospital visits",
+    "leaked memo reveals the truth about {topic}",
+    "{topic} spending {verb} for the third year in a row",
+    "experts warn {topic} crisis could last a decade",
+]
+VERBS = ["cut", "raise", "double", "halve", "freeze", "confirm", "revise", "hide"]
+
+# Share of posts that repost or lightly edit a recent post, and of headlines that reword an
+# earlier one; recent items are drawn from a window of this many
+DUPLICATE_SHARE = 0.15
+REWORD_SHARE = 0.2
+RECENT_WINDOW = 1000
+
+def _topic(rng):
+    """A topic, with popular topics much more frequent (roughly Zipf)"""
+    return TOPICS[min(len(TOPICS) - 1, int(rng.paretovariate(1.2)) - 1)]
+
+def _post(rng):
+    words = rng.choices(FILLER, k=rng.randint(4, 14))
+    for _ in range(rng.randint(1, 2)):
+        words.insert(rng.randrange(len(words) + 1), _topic(rng))
+    for _ in range(rng.randint(0, 2)):
+        word = rng.choice(POSITIVE if rng.random() < 0.55 else NEGATIVE)
+        if rng.random() < 0.15:
+            word = f"{rng.choice(NEGATORS)} {word}"
+        words.insert(rng.randrange(len(words) + 1), word)
+    if rng.random() < 0.4:
+        words.append(f"#{_topic(rng)}")
+    if rng.random() < 0.2:
+        words.insert(0, f"@user{rng.randint(1, 50000)}")
+    if rng.random() < 0.1:
+        words.append(f"https://t.co/{rng.getrandbits(40):x}")
+    return ' '.join(words)
+
+def _variant(rng, text):
+    """A retweet or copy-paste edit of text"""
+    kind = rng.random()
+    if kind < 0.5:
+        return f"RT @user{rng.randint(1, 50000)}: {text}"
+    if kind < 0.8:
+        return f"{text} {rng.choice(['!!', '100%', 'so true', '#repost'])}"
+    return text.upper()
+
+def tweets(rows, seed=0, start=None, days=30):
+    """Yield (created_at, text) for `rows` posts spread evenly over `days` days from start (Unix seconds)"""
+    rng = random.Random(seed)
+    start = 1717200000 if start is None else start
+    step = days * 86400 / max(rows, 1)
+    recent = []
+    for i in range(rows):
+        if recent and rng.random() < DUPLICATE_SHARE:
+            text = _variant(rng, rng.choice(recent))
+        else:
+            text = _post(rng)
+            if len(recent) < RECENT_WINDOW:
+                recent.append(text)
+            else:
+                recent[rng.randrange(RECENT_WINDOW)] = text
+        created_at = datetime.datetime.fromtimestamp(int(start + i * step), datetime.timezone.utc)
+        yield created_at.strftime('%Y-%m-%dT%H:%M:%SZ'), text
+
+def _reword(rng, text):
+    """Reorder, drop or swap a word of text, keeping its claim recognisable"""
+    words = text.split()
+    kind = rng.random()
+    if kind < 0.4 and len(words) > 4:
+        del words[rng.randrange(len(words))]
+    elif kind < 0.7:
+        words.insert(rng.randrange(len(words) + 1), rng.choice(["reportedly", "now", "apparently", "really"]))
+    else:
+        i = rng.randrange(len(words) - 1) if len(words) > 1 else 0
+        words[i:i + 2] = reversed(words[i:i + 2])
+    return ' '.join(words)
+
+def headlines(rows, seed=0):
+    """Yield (text, label) news headlines; label is the kind of indicator phrase used, if any"""
+    rng = random.Random(seed + 1)
+    recent = []
+    for _ in range(rows):
+        if recent and rng.random() < REWORD_SHARE:
+            text, label = rng.choice(recent)
+            yield _reword(rng, text), label
+            continue
+        claim = rng.choice(CLAIMS).format(topic=_topic(rng), verb=rng.choice(VERBS))
+        kind = rng.random()
+        if kind < 0.4:
+            text, label = f"{rng.choice(FAKE_PHRASES).capitalize()}: {claim}", 'fake'
+        elif kind < 0.8:
+            text, label = f"{rng.choice(REAL_PHRASES).capitalize()}, {claim}", 'real'
+        else:
+            text, label = claim.capitalize(), 'none'
+        if len(recent) < RECENT_WINDOW:
+            recent.append((text, label))
+        else:
+            recent[rng.randrange(RECENT_WINDOW)] = (text, label)
+        yield text, label
+
+def request_log(count, qps=50.0, fakenews_share=0.3, seed=0, start=None):
+    """Yield request log entries with Poisson arrivals at qps (see benchmarks/replay.py)"""
+    rng = random.Random(seed + 2)
+    news = headlines(max(count, 1), seed)
+    ts = time.time() if start is None else start
+    for _ in range(count):
+        ts += rng.expovariate(qps)
+        if rng.random() < fakenews_share:
+            yield {"ts": round(ts, 6), "endpoint": "/fakenews", "payload": {"text": next(news)[0]}}
+        else:
+            keyword = _topic(rng) if rng.random() < 0.8 else f"{_topic(rng)} {rng.choice(POSITIVE + NEGATIVE)}"
+            yield {"ts": round(ts, 6), "endpoint": "/sentiment", "payload": {"keyword": keyword}}
+
+def write_tweets(path, rows, seed=0):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'created_at', 'tweet'])
+        for i, (created_at, text) in enumerate(tweets(rows, seed)):
+            writer.writerow([i, created_at, text])
+
+def write_jsonl(path, records):
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic tweet/news corpus and request log")
+    parser.add_argument('--out', default='bench_data', help="Output directory")
+    parser.add_argument('--rows', type=int, default=100000, help="Tweets to generate (10k to 10M)")
+    parser.add_argument('--news-rows', type=int, help="Headlines to generate (default: rows / 10)")
+    parser.add_argument('--requests', type=int, default=10000, help="Entries in the request log")
+    parser.add_argument('--qps', type=float, default=50.0, help="Mean request rate of the log")
+    parser.add_argument('--fakenews-share', type=float, default=0.3, help="Share of /fakenews requests in the log")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    news_rows = args.news_rows if args.news_rows is not None else max(1, args.rows // 10)
+    os.makedirs(args.out, exist_ok=True)
+
+    outputs = [
+        ('tweets.csv', args.rows, lambda path: write_tweets(path, args.rows, args.seed)),
+        ('news.jsonl', news_rows, lambda path: write_jsonl(
+            path, ({"text": text, "label": label} for text, label in headlines(news_rows, args.seed)))),
+        ('request_log.jsonl', args.requests, lambda path: write_jsonl(
+            path, request_log(args.requests, args.qps, args.fakenews_share, args.seed, start=0.0))),
+    ]
+    for name, count, write in outputs:
+        path = os.path.join(args.out, name)
+        started = time.perf_counter()
+        write(path)
+        elapsed = time.perf_counter() - started
+        print(f"{path}: {count:,} rows, {os.path.getsize(path) / 1e6:.1f} MB in {elapsed:.1f} s")
+
+if __name__ == '__main__':
+    main()
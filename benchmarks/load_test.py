@@ -0,0 +1,163 @@
+# Load test for the backend's production serving mode
+# Starts backend_example.py once per inference worker count, drives it with a fixed number
+# of concurrent clients, and reports throughput so the scaling with workers is visible
+#
+# Usage:
+#   python benchmarks/load_test.py --workers 1 2 4 8 --concurrency 32 --duration 10
+#   python benchmarks/load_test.py --url http://127.0.0.1:5000 --duration 10   # existing server
+
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+import results
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEADLINES = [
+    "Shocking secret the government doesn't want you to know",
+    "According to officials, the new policy takes effect next month",
+    "Study shows moderate exercise improves sleep quality",
+    "Unbelievable conspiracy behind the election results",
+    "Research indicates inflation is slowing across the region",
+]
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def check_port_free(port):
+    """Raise if something already listens on port, so its numbers are not taken for ours"""
+    with socket.socket() as sock:
+        if sock.connect_ex(('127.0.0.1', port)) == 0:
+            raise RuntimeError(f"Port {port} is already in use; pass a free one with --port")
+
+def wait_until_healthy(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{url}/health", timeout=1).status_code == 200:
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Backend at {url} did not become healthy")
+
+def drive(url, endpoint, concurrency, duration):
+    """Hammer url+endpoint from `concurrency` threads for `duration` seconds"""
+    latencies = []
+    counts = {'ok': 0, 'rejected': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        session = requests.Session()
+        while time.perf_counter() < deadline:
+            # Unique payloads, so that with the response cache, claim index and near-duplicate
+            # collapsing off in the launched servers every request reaches the model
+            payload = {"text": f"{random.choice(HEADLINES)} #{random.random()}"}
+            if endpoint == '/sentiment':
+                payload = {"keyword": payload["text"]}
+            started = time.perf_counter()
+            try:
+                response = session.post(f"{url}{endpoint}", json=payload, timeout=60)
+                status = response.status_code
+            except requests.exceptions.RequestException:
+                status = None
+            elapsed = time.perf_counter() - started
+            with lock:
+                if status == 200:
+                    counts['ok'] += 1
+                    latencies.append(elapsed)
+                elif status == 429:
+                    counts['rejected'] += 1
+                else:
+                    counts['errors'] += 1
+            if status == 429:
+                # Honour the backpressure signal instead of spinning
+                time.sleep(float(response.headers.get('Retry-After', 1)))
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    return {
+        **counts,
+        'throughput_rps': round(counts['ok'] / wall, 2),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+    }
+
+def run_with_workers(workers, args):
+    """Launch a production-mode backend with `workers` inference workers and load it"""
+    port = args.port
+    check_port_free(port)
+    env = dict(
+        os.environ,
+        API_INFERENCE_WORKERS=str(workers),
+        API_INFERENCE_QUEUE=str(args.queue),
+        API_CACHE_SIZE='0',
+        # Stored verdicts and shared near-duplicate results would skip the model being measured,
+        # and stored claims would carry over from one run into the next
+        CLAIM_INDEX_PATH='',
+        API_DEDUP_THRESHOLD='0'
+    )
+    server = subprocess.Popen(
+        [sys.executable, 'backend_example.py', '--serve', 'production',
+         '--port', str(port), '--threads', str(args.concurrency + 8)],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        url = f"http://127.0.0.1:{port}"
+        wait_until_healthy(url)
+        return drive(url, args.endpoint, args.concurrency, args.duration)
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend throughput vs. inference worker count")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--concurrency', type=int, default=32, help="Concurrent client threads")
+    parser.add_argument('--duration', type=float, default=10, help="Seconds per run")
+    parser.add_argument('--queue', type=int, default=16, help="API_INFERENCE_QUEUE for launched servers")
+    parser.add_argument('--endpoint', choices=['/fakenews', '/sentiment'], default='/fakenews')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--url', help="Load an already running backend instead of launching one per worker count")
+    parser.add_argument('--json', help="Write results to this JSON file (see benchmarks/results.py)")
+    args = parser.parse_args()
+
+    rows = []
+    if args.url:
+        result = drive(args.url.rstrip('/'), args.endpoint, args.concurrency, args.duration)
+        rows.append({'name': 'existing_server', 'workers': None, **result})
+    else:
+        for workers in args.workers:
+            rows.append({'name': f'workers_{workers}', 'workers': workers, **run_with_workers(workers, args)})
+
+    print(f"{'workers':>8} {'req/s':>8} {'ok':>7} {'429':>6} {'err':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for row in rows:
+        print(f"{str(row['workers'] or '-'):>8} {row['throughput_rps']:>8} {row['ok']:>7} {row['rejected']:>6} "
+              f"{row['errors']:>5} {row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8}")
+
+    if args.json:
+        params = {'endpoint': args.endpoint, 'concurrency': args.concurrency, 'duration_s': args.duration,
+                  'queue': args.queue, 'url': args.url}
+        results.write(args.json, 'load_test', params, rows)
+
+if __name__ == '__main__':
+    main()
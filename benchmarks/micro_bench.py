@@ -0,0 +1,245 @@
+# Microbenchmarks for the backend's sentiment, fake news and word frequency paths, and for
+# the JSON and Arrow encodings of /sentiment/batch responses
+# Each benchmark times one component in-process (no HTTP, no simulated model latency) on the
+# synthetic corpus from benchmarks/corpus.py, repeats it, and reports the median and best
+# run. Streaming benchmarks (CSV parsing, word counting, index build) read the whole corpus;
+# the others work on its first --sample texts. Results go to JSON for benchmarks/results.py
+#
+# Usage:
+#   python benchmarks/micro_bench.py --rows 100000 --json micro.json
+#   python benchmarks/micro_bench.py --data bench_data --only sentiment fakenews
+#   python benchmarks/results.py micro_old.json micro.json
+
+import argparse
+import itertools
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+
+import batch_format
+import corpus
+import results
+from claim_index import ClaimIndex, embed
+from dedup import Deduplicator, score_deduplicated
+from indicators import IndicatorLexicon
+from ingest import CHUNK_SIZE, iter_text_chunks
+from post_index import PostIndex, build_index
+from sentiment_engine import LABELS, LexiconEngine
+from term_frequency import TermCounter
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def batch_sizes(ctx, available):
+    """
+    The requested batch sizes clipped to the available items, each once: with a --sample
+    smaller than several sizes they would otherwise yield rows with the same name
+    """
+    return list(dict.fromkeys(min(size, available) for size in ctx['batch_sizes']))
+
+def measure(name, run, items, repeat, **extra):
+    """Time run() `repeat` times; items is how many texts (or queries) one run handles"""
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - started)
+    median = statistics.median(seconds)
+    return {
+        'name': name,
+        'items': items,
+        'seconds': round(median, 6),
+        'best_seconds': round(min(seconds), 6),
+        'items_per_sec': round(items / median, 1) if median else None,
+        **extra
+    }
+
+def bench_sentiment(ctx):
+    engine = LexiconEngine()
+    texts = ctx['tweets']
+    for batch_size in batch_sizes(ctx, len(texts)):
+        batch = texts[:batch_size]
+        yield measure(f'sentiment_predict_{len(batch)}', lambda: engine.predict(batch), len(batch), ctx['repeat'])
+
+    deduplicator = Deduplicator()
+    yield measure(
+        'dedup_group', lambda: [deduplicator.group(chunk) for chunk in chunked(texts, CHUNK_SIZE)],
+        len(texts), ctx['repeat']
+    )
+    labels, representatives = score_deduplicated(engine.predict, texts[:CHUNK_SIZE], deduplicator)
+    yield measure(
+        'sentiment_deduplicated',
+        lambda: [score_deduplicated(engine.predict, chunk, deduplicator) for chunk in chunked(texts, CHUNK_SIZE)],
+        len(texts), ctx['repeat'],
+        duplicate_ratio=round(float(np.mean(representatives != np.arange(len(representatives)))), 3)
+    )
+
+def bench_fakenews(ctx):
+    headlines = ctx['headlines']
+    lexicon = IndicatorLexicon(os.path.join(REPO_ROOT, 'indicators.json'))
+    yield measure('indicator_scan', lambda: [lexicon.scan(text) for text in headlines], len(headlines), ctx['repeat'])
+    yield measure('claim_embed', lambda: embed(headlines, 512), len(headlines), ctx['repeat'])
+
+    # Index the first half of the headlines, then look up the second half (with rewordings of
+    # indexed claims among them); a fresh index per run, so every run adds the same claims
+    known, queries = headlines[:len(headlines) // 2], headlines[len(headlines) // 2:]
+    verdicts = [{"prediction": "real", "confidence": 0.7}] * len(known)
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = itertools.count()
+
+        def add():
+            ClaimIndex(os.path.join(tmp, str(next(runs)))).add(known, verdicts, time.time())
+
+        yield measure('claim_add', add, len(known), ctx['repeat'])
+        index = ClaimIndex(os.path.join(tmp, 'lookup'))
+        index.add(known, verdicts, time.time())
+        index.lookup(queries[:10], 0.8)
+        yield measure('claim_lookup', lambda: index.lookup(queries, 0.8), len(queries), ctx['repeat'],
+                      match_rate=round(sum(match is not None for match in index.lookup(queries, 0.8)) / len(queries), 3))
+        index.close()
+
+def bench_words(ctx):
+    texts = ctx['tweets']
+
+    def count():
+        counter = TermCounter()
+        for chunk in chunked(texts, CHUNK_SIZE):
+            counter.update(chunk)
+        return counter
+
+    yield measure('term_count', count, len(texts), ctx['repeat'], distinct_words=len(count()))
+    counter = count()
+    yield measure('top_words', lambda: counter.frequencies(200), 200, ctx['repeat'])
+
+def bench_files(ctx):
+    csv_path, rows = ctx['csv'], ctx['rows']
+
+    def parse():
+        for _ in iter_text_chunks(csv_path, 'tweet', CHUNK_SIZE):
+            pass
+
+    yield measure('csv_parse', parse, rows, ctx['repeat'])
+
+    def count_file():
+        counter = TermCounter()
+        for _ in counter.update_chunks(iter_text_chunks(csv_path, 'tweet', CHUNK_SIZE)):
+            pass
+
+    yield measure('term_count_file', count_file, rows, ctx['repeat'])
+
+    engine = LexiconEngine()
+    with tempfile.TemporaryDirectory() as tmp:
+        index_path = os.path.join(tmp, 'index')
+        yield measure('post_index_build', lambda: build_index([csv_path], index_path, engine.predict, Deduplicator()),
+                      rows, 1)
+        index = PostIndex(index_path)
+        queries = corpus.TOPICS + [f'{topic} {word}' for topic, word in zip(corpus.TOPICS, corpus.POSITIVE)]
+        latencies = []
+        for query in queries * max(1, ctx['repeat']):
+            started = time.perf_counter()
+            index.search(query)
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        yield {
+            'name': 'post_index_search',
+            'items': len(latencies),
+            'latency_ms': {
+                'p50': round(latencies[len(latencies) // 2], 3),
+                'p95': round(latencies[int(len(latencies) * 0.95)], 3),
+                'max': round(latencies[-1], 3)
+            }
+        }
+        index.close()
+
+def bench_formats(ctx):
+    """/sentiment/batch response bodies: JSON with label strings vs Arrow IPC with int8 codes"""
+    codes, scores = LexiconEngine().classify(ctx['tweets'])
+    fields = {'total_tweets': len(codes), 'sample_tweets': [{'text': text, 'sentiment': 'neutral'} for text in ctx['tweets'][:5]]}
+    for batch_size in batch_sizes(ctx, len(codes)):
+        batch_codes, batch_scores = codes[:batch_size], scores[:batch_size]
+        rows = len(batch_codes)
+        body = json.dumps({**fields, 'labels': LABELS[batch_codes].tolist()})
+        yield measure(f'json_encode_{rows}', lambda: json.dumps({**fields, 'labels': LABELS[batch_codes].tolist()}),
+                      rows, ctx['repeat'], bytes=len(body))
+        yield measure(f'json_decode_{rows}', lambda: json.loads(body), rows, ctx['repeat'])
+        if not batch_format.arrow_available():
+            continue
+        body = batch_format.encode_arrow(fields, batch_codes, batch_scores, LABELS)
+        yield measure(f'arrow_encode_{rows}', lambda: batch_format.encode_arrow(fields, batch_codes, batch_scores, LABELS),
+                      rows, ctx['repeat'], bytes=len(body))
+        yield measure(f'arrow_decode_{rows}', lambda: batch_format.decode_arrow(body), rows, ctx['repeat'])
+
+BENCHMARKS = {
+    'sentiment': bench_sentiment,
+    'fakenews': bench_fakenews,
+    'words': bench_words,
+    'files': bench_files,
+    'formats': bench_formats,
+}
+
+def load_data(data_dir, sample):
+    """First `sample` tweets and headlines, plus the tweet CSV path and its row count"""
+    csv_path = os.path.join(data_dir, 'tweets.csv')
+    tweets = []
+    rows = 0
+    for chunk in iter_text_chunks(csv_path, 'tweet', CHUNK_SIZE):
+        if len(tweets) < sample:
+            tweets.extend(chunk[:sample - len(tweets)])
+        rows += len(chunk)
+    with open(os.path.join(data_dir, 'news.jsonl'), encoding='utf-8') as f:
+        headlines = [json.loads(line)['text'] for line in itertools.islice(f, sample)]
+    return {'csv': csv_path, 'rows': rows, 'tweets': tweets, 'headlines': headlines}
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the sentiment, fake news and word paths")
+    parser.add_argument('--data', help="Directory written by benchmarks/corpus.py (default: generate one)")
+    parser.add_argument('--rows', type=int, default=100000, help="Tweets to generate when --data is not given")
+    parser.add_argument('--sample', type=int, default=100000, help="Texts used by the in-memory benchmarks")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[100, 5000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help="Run only these benchmark groups")
+    parser.add_argument('--json', help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data
+        if data_dir is None:
+            data_dir = tmp
+            print(f"Generating {args.rows:,} tweets...")
+            corpus.write_tweets(os.path.join(tmp, 'tweets.csv'), args.rows, args.seed)
+            corpus.write_jsonl(
+                os.path.join(tmp, 'news.jsonl'),
+                ({"text": text} for text, _ in corpus.headlines(max(1000, args.rows // 10), args.seed))
+            )
+        ctx = {**load_data(data_dir, args.sample), 'batch_sizes': args.batch_sizes, 'repeat': args.repeat}
+
+        rows = []
+        print(f"{'benchmark':<26} {'items':>10} {'median s':>10} {'items/s':>13}")
+        for group, bench in BENCHMARKS.items():
+            if args.only and group not in args.only:
+                continue
+            for row in bench(ctx):
+                rows.append(row)
+                if 'latency_ms' in row:
+                    latency = row['latency_ms']
+                    print(f"{row['name']:<26} {row['items']:>10,} p50 {latency['p50']} ms, p95 {latency['p95']} ms")
+                else:
+                    print(f"{row['name']:<26} {row['items']:>10,} {row['seconds']:>10.4f} {row['items_per_sec'] or 0:>13,.0f}")
+
+    if args.json:
+        params = {'rows': ctx['rows'], 'sample': args.sample, 'batch_sizes': args.batch_sizes,
+                  'repeat': args.repeat, 'seed': args.seed, 'data': args.data}
+        results.write(args.json, 'micro', params, rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+# Load generator: replays a request log against /sentiment and /fakenews
+# Requests are sent on a fixed schedule whatever the server's response times (open loop), so a
+# slow server builds up a queue the way it would under real traffic. Latency is measured from
+# when each request was due, not from when a free client thread sent it; a closed loop (like
+# load_test.py) would quietly slow down with the server and hide that
+# Two schedules:
+#   --speed N  keep the log's own arrival times ("ts"), N times faster: bursts, lulls and the
+#              mix of endpoints of captured traffic come back as they happened (the default, 1x)
+#   --qps R    ignore the timestamps and send the logged requests evenly at R per second
+# Log format: one JSON object per line with "ts", "endpoint" and "payload" (other fields are
+# ignored, except the captured "latency_ms", reported next to the replayed latency). The
+# backend writes one with API_CAPTURE_PATH, rotated files (.gz too) can be passed together and
+# are merged by time; benchmarks/corpus.py writes a synthetic one
+#
+# Usage:
+#   python benchmarks/replay.py captures/requests.jsonl*                       # as captured
+#   python benchmarks/replay.py captures/requests.jsonl* --speed 4 --no-cache  # 4x the traffic
+#   python benchmarks/replay.py bench_data/request_log.jsonl --qps 200 --loop --duration 60 --json replay.json
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import results
+from load_test import percentile, wait_until_healthy
+from request_log import open_log
+
+ENDPOINTS = ('/sentiment', '/fakenews')
+
+def read_log(paths, endpoints=ENDPOINTS):
+    """Entries of the request logs for the replayed endpoints, in time order when timestamped"""
+    entries = []
+    for path in paths:
+        with open_log(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry.get('endpoint') in endpoints:
+                    entries.append(entry)
+    if all('ts' in entry for entry in entries):
+        entries.sort(key=lambda entry: entry['ts'])
+    return entries
+
+def replay(url, schedule, concurrency=64, no_cache=False, timeout=60):
+    """
+    Send each (due, entry) of schedule at perf_counter time `due`
+    Returns [(endpoint, status, latency, service time, send lag, response bytes, send time)]
+    """
+    headers = {'Cache-Control': 'no-cache'} if no_cache else {}
+    local = threading.local()
+    samples = []
+    lock = threading.Lock()
+
+    def send(entry, due):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        started = time.perf_counter()
+        try:
+            response = session.post(f"{url}{entry['endpoint']}", json=entry['payload'], headers=headers, timeout=timeout)
+            status, size = response.status_code, len(response.content)
+        except requests.exceptions.RequestException:
+            status, size = None, 0
+        finished = time.perf_counter()
+        with lock:
+            samples.append((entry['endpoint'], status, finished - due, finished - started, started - due, size, started))
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='replay') as pool:
+        for due, entry in schedule:
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send, entry, due)
+    return samples
+
+def fixed_rate(entries, qps, duration=None, loop=False):
+    """Schedule entries every 1/qps seconds from now, for at most duration seconds"""
+    started = time.perf_counter() + 0.1
+    for i, entry in enumerate(itertools.cycle(entries) if loop else entries):
+        if duration is not None and i / qps >= duration:
+            return
+        yield started + i / qps, entry
+
+def original_timing(entries, speed=1.0, duration=None, loop=False):
+    """
+    Schedule entries at their logged arrival times, compressed by speed, from now
+    A looped log starts over one average gap after its last entry
+    """
+    first, last = entries[0]['ts'], entries[-1]['ts']
+    period = (last - first) + ((last - first) / (len(entries) - 1) if len(entries) > 1 else 1.0)
+    started = time.perf_counter() + 0.1
+    for lap in itertools.count() if loop else range(1):
+        for entry in entries:
+            offset = (entry['ts'] - first + lap * period) / speed
+            if duration is not None and offset >= duration:
+                return
+            yield started + offset, entry
+
+def captured_latency(entries):
+    """p50/p99 of the latency recorded at capture time, in milliseconds (None if not recorded)"""
+    latencies = [entry['latency_ms'] / 1000 for entry in entries
+                 if entry.get('latency_ms') is not None and entry.get('status') == 200]
+    if not latencies:
+        return None
+    return {f'p{pct}': round(percentile(latencies, pct) * 1000, 2) for pct in (50, 99)}
+
+def summarize(name, samples):
+    """One result row for the samples of an endpoint (or all of them)"""
+    ok = [sample for sample in samples if sample[1] == 200]
+    statuses = [sample[1] for sample in samples]
+    # Rate over the sending window, so waiting for the last responses does not dilute it
+    sent = [sample[6] for sample in samples]
+    rate = (len(sent) - 1) / (max(sent) - min(sent)) if len(sent) > 1 and max(sent) > min(sent) else 0.0
+
+    def milliseconds(values, pcts):
+        return {f'p{pct}': round(percentile(values, pct) * 1000, 2) for pct in pcts}
+
+    return {
+        'name': name,
+        'requests': len(samples),
+        'ok': len(ok),
+        'rejected': statuses.count(429),
+        'unavailable': statuses.count(503),
+        'errors': len(samples) - len(ok) - statuses.count(429) - statuses.count(503),
+        'achieved_qps': round(rate, 2),
+        'ok_qps': round(rate * len(ok) / len(samples), 2) if samples else 0.0,
+        'latency_ms': {**milliseconds([s[2] for s in ok], (50, 90, 99)),
+                       'max': round(max((s[2] for s in ok), default=0.0) * 1000, 2)},
+        'service_ms': milliseconds([s[3] for s in ok], (50, 99)),
+        'send_lag_ms': milliseconds([s[4] for s in samples], (50, 99)),
+        'response_bytes_mean': round(sum(s[5] for s in ok) / len(ok), 1) if ok else 0.0
+    }
+
+def report(samples, entries=()):
+    rows = [summarize('all', samples)]
+    for endpoint in ENDPOINTS:
+        endpoint_samples = [sample for sample in samples if sample[0] == endpoint]
+        if endpoint_samples:
+            rows.append(summarize(endpoint, endpoint_samples))
+    for row in rows:
+        captured = captured_latency([entry for entry in entries if row['name'] in ('all', entry['endpoint'])])
+        if captured is not None:
+            row['captured_latency_ms'] = captured
+
+    print(f"{'endpoint':<11} {'req':>7} {'qps':>8} {'ok':>7} {'429':>5} {'503':>5} {'err':>5} "
+          f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'lag p99':>8}")
+    for row in rows:
+        latency = row['latency_ms']
+        print(f"{row['name']:<11} {row['requests']:>7} {row['achieved_qps']:>8} {row['ok']:>7} {row['rejected']:>5} "
+              f"{row['unavailable']:>5} {row['errors']:>5} {latency['p50']:>8} {latency['p90']:>8} {latency['p99']:>8} "
+              f"{row['send_lag_ms']['p99']:>8}")
+    for row in rows:
+        if 'captured_latency_ms' in row:
+            captured = row['captured_latency_ms']
+            print(f"{row['name']:<11} latency when captured: p50 {captured['p50']} ms, p99 {captured['p99']} ms")
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a request log against the backend")
+    parser.add_argument('logs', nargs='+', help="Request log files (JSON Lines, optionally .gz)")
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    schedule = parser.add_mutually_exclusive_group()
+    schedule.add_argument('--speed', type=float, help="Keep the logged arrival times, this many times faster (default 1)")
+    schedule.add_argument('--qps', type=float, help="Ignore the logged times and send evenly at this rate")
+    parser.add_argument('--duration', type=float, help="Stop after this many seconds (default: end of the log)")
+    parser.add_argument('--loop', action='store_true', help="Start the log over when it runs out (needs --duration)")
+    parser.add_argument('--concurrency', type=int, default=64, help="Client threads, i.e. most requests in flight")
+    parser.add_argument('--no-cache', action='store_true', help="Send 'Cache-Control: no-cache' to bypass the response cache")
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--json', help="Write results to this JSON file")
+    args = parser.parse_args()
+    if args.loop and args.duration is None:
+        parser.error("--loop needs --duration")
+    if args.speed is not None and args.speed <= 0 or args.qps is not None and args.qps <= 0:
+        parser.error("--speed and --qps must be positive")
+
+    entries = read_log(args.logs)
+    if not entries:
+        sys.exit(f"No {' or '.join(ENDPOINTS)} requests in {', '.join(args.logs)}")
+    url = args.url.rstrip('/')
+    if args.qps is None:
+        if not all('ts' in entry for entry in entries):
+            sys.exit("The log has entries without 'ts'; replay it at a fixed rate with --qps")
+        speed = args.speed or 1.0
+        span = entries[-1]['ts'] - entries[0]['ts']
+        print(f"Log: {len(entries):,} requests over {span:,.1f} s ({(len(entries) - 1) / span if span else 0:.1f} req/s)")
+        plan = original_timing(entries, speed, args.duration, args.loop)
+        description = f"at {speed:g}x the logged pace"
+    else:
+        plan = fixed_rate(entries, args.qps, args.duration, args.loop)
+        description = f"at {args.qps:g} req/s"
+    wait_until_healthy(url)
+    print(f"Replaying {len(entries):,} logged requests {description} against {url}")
+
+    # Compare against the captured latency of the requests actually replayed
+    replayed = []
+
+    def tracked(plan):
+        for due, entry in plan:
+            replayed.append(entry)
+            yield due, entry
+
+    samples = replay(url, tracked(plan), args.concurrency, args.no_cache, args.timeout)
+    rows = report(samples, replayed)
+
+    if args.json:
+        params = {'logs': args.logs, 'url': url, 'speed': None if args.qps else args.speed or 1.0, 'qps': args.qps,
+                  'duration': args.duration, 'loop': args.loop, 'concurrency': args.concurrency,
+                  'no_cache': args.no_cache, 'entries': len(entries)}
+        results.write(args.json, 'replay', params, rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# Machine-readable benchmark results, and a diff between two runs
+# Every suite benchmark writes one JSON file:
+#   {"benchmark": name, "environment": {...}, "params": {...}, "results": [{"name": ..., ...}]}
+# environment records what a number depends on (commit, Python, NumPy, CPUs), so results
+# from different releases or machines can be told apart before they are compared
+#
+# Usage:
+#   python benchmarks/results.py old.json new.json             # per-metric change
+#   python benchmarks/results.py old.json new.json --threshold 10   # only changes over 10%
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Metric name parts for which a larger value is worse (times, failures); any other numeric
+# metric counts as better when larger
+LOWER_IS_BETTER_SUFFIXES = ('_ms', '_s', 'seconds')
+LOWER_IS_BETTER_NAMES = {'errors', 'rejected', 'failed', 'late'}
+
+def environment():
+    """What the numbers of a run depend on"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        'time': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': numpy_version,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+def write(path, benchmark, params, results):
+    """Write one run's results; returns the document written"""
+    document = {'benchmark': benchmark, 'environment': environment(), 'params': params, 'results': results}
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+    return document
+
+def flatten(document):
+    """{'result name.metric': value} for every numeric metric of a run"""
+    metrics = {}
+    for result in document.get('results', []):
+        for key, value in result.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                metrics[f"{result.get('name', '?')}.{key}"] = value
+            elif isinstance(value, dict):
+                for inner, inner_value in value.items():
+                    if isinstance(inner_value, (int, float)) and not isinstance(inner_value, bool):
+                        metrics[f"{result.get('name', '?')}.{key}.{inner}"] = inner_value
+    return metrics
+
+def compare(old, new):
+    """[(metric, old, new, change %, 'better'|'worse'|'')] for metrics present in both runs"""
+    old_metrics, new_metrics = flatten(old), flatten(new)
+    rows = []
+    for metric in sorted(old_metrics.keys() & new_metrics.keys()):
+        before, after = old_metrics[metric], new_metrics[metric]
+        change = (after - before) / abs(before) * 100 if before else (0.0 if after == before else float('inf'))
+        parts = metric.split('.')[1:]
+        lower_is_better = any(part.endswith(LOWER_IS_BETTER_SUFFIXES) or part in LOWER_IS_BETTER_NAMES for part in parts)
+        verdict = ''
+        if change:
+            verdict = 'better' if (change < 0) == lower_is_better else 'worse'
+        rows.append((metric, before, after, change, verdict))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=0.0, help="Only show changes of at least this many percent")
+    args = parser.parse_args()
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    if old.get('benchmark') != new.get('benchmark'):
+        sys.exit(f"Different benchmarks: {old.get('benchmark')} vs {new.get('benchmark')}")
+    for label, document in (('old', old), ('new', new)):
+        env = document.get('environment', {})
+        print(f"{label}: {env.get('commit')} {env.get('time')} Python {env.get('python')}, {env.get('cpus')} CPUs")
+
+    rows = [row for row in compare(old, new) if abs(row[3]) >= args.threshold]
+    width = max([len(row[0]) for row in rows] + [6])
+    print(f"{'metric':<{width}} {'old':>12} {'new':>12} {'change':>9}")
+    for metric, before, after, change, verdict in rows:
+        print(f"{metric:<{width}} {before:>12,.6g} {after:>12,.6g} {change:>8.1f}% {verdict}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+# Startup benchmark for the dashboard: time to first paint of the landing page and each tab
+# Every scenario runs app.py in a fresh interpreter with Streamlit's AppTest, so nothing is
+# cached in sys.modules yet, and reports the first script run (everything the browser waits
+# for before the page is complete), a second warm rerun, and which heavy modules got loaded
+# Tabs are reached by seeding session state: the sentiment and fake news tabs get a stored
+# result to draw, the word cloud tab gets a generated CSV picked from CSV_DATA_DIR
+#
+# Usage:
+#   python benchmarks/startup_bench.py
+#   python benchmarks/startup_bench.py --repeat 5 --json startup.json
+#   git worktree add /tmp/base HEAD~1 && python benchmarks/startup_bench.py --app /tmp/base/app.py
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import results
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = ['landing', 'dashboard', 'sentiment', 'fakenews', 'wordcloud']
+
+# Modules whose import dominates startup, reported when a scenario loaded them
+HEAVY_MODULES = ['pandas', 'plotly.express', 'wordcloud', 'matplotlib', 'PIL.Image', 'numpy']
+
+WORDS = "election vote climate economy market news people government report study love hate".split()
+
+SENTIMENT_RESULT = {
+    'title': "'benchmark'",
+    'data': {
+        'total_tweets': 1000, 'positive': 450, 'negative': 300, 'neutral': 250,
+        'positive_pct': 45.0, 'negative_pct': 30.0, 'neutral_pct': 25.0,
+        'duplicates': 0, 'duplicate_ratio': 0.0,
+        'sample_tweets': [{'text': 'Great progress on climate policy today', 'sentiment': 'positive'}]
+    }
+}
+
+FAKENEWS_RESULT = {
+    'prediction': 'fake', 'confidence': 0.82,
+    'analysis': {'credibility': 0.3, 'language_quality': 0.6, 'source_reliability': 0.2}
+}
+
+def write_corpus(path, rows, seed=0):
+    """Write a small synthetic tweet CSV for the word cloud tab"""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('id,tweet\n')
+        for i in range(rows):
+            f.write(f'{i},"{" ".join(rng.choices(WORDS, k=rng.randint(8, 20)))}"\n')
+
+def run_scenario(app_path, scenario, csv_path):
+    """Child process: run one scenario and return its timings and loaded modules"""
+    # Older AppTest versions do not put the script's directory on sys.path
+    sys.path.insert(0, os.path.dirname(app_path))
+    started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    streamlit_import = time.perf_counter() - started
+
+    at = AppTest.from_file(app_path, default_timeout=120)
+    if scenario != 'landing':
+        at.session_state.page = 'dashboard'
+    if scenario == 'sentiment':
+        at.session_state.sentiment_result = SENTIMENT_RESULT
+    elif scenario == 'fakenews':
+        at.session_state.fakenews_result = FAKENEWS_RESULT
+    elif scenario == 'wordcloud':
+        # The child runs with CSV_DATA_DIR set to the CSV's directory (see measure)
+        at.session_state.wordcloud_data_file = os.path.basename(csv_path)
+
+    started = time.perf_counter()
+    at.run()
+    first_run = time.perf_counter() - started
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    started = time.perf_counter()
+    at.run()
+    rerun = time.perf_counter() - started
+
+    return {
+        'scenario': scenario,
+        'streamlit_import_ms': round(streamlit_import * 1000, 1),
+        'first_run_ms': round(first_run * 1000, 1),
+        'rerun_ms': round(rerun * 1000, 1),
+        'modules': loaded,
+        'exceptions': [str(e.value) for e in at.exception]
+    }
+
+def measure(app_path, scenario, csv_path):
+    """Run one scenario in a fresh interpreter"""
+    child = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', scenario, '--app', app_path, '--csv', csv_path],
+        cwd=os.path.dirname(app_path), capture_output=True, text=True,
+        env=dict(os.environ, CSV_DATA_DIR=os.path.dirname(csv_path))
+    )
+    if child.returncode != 0:
+        raise RuntimeError(f"{scenario} failed:\n{child.stderr}")
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard time to first paint, per page and tab")
+    parser.add_argument('--app', default=os.path.join(REPO_ROOT, 'app.py'), help="Dashboard script to measure")
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--repeat', type=int, default=3, help="Fresh processes per scenario (median is reported)")
+    parser.add_argument('--rows', type=int, default=2000, help="Rows in the word cloud CSV")
+    parser.add_argument('--json', help="Write results to this JSON file (see benchmarks/results.py)")
+    parser.add_argument('--csv', help=argparse.SUPPRESS)
+    parser.add_argument('--child', choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    app_path = os.path.abspath(args.app)
+
+    if args.child:
+        print(json.dumps(run_scenario(app_path, args.child, args.csv)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'tweets.csv')
+        write_corpus(csv_path, args.rows)
+
+        rows = []
+        for scenario in args.scenarios:
+            runs = [measure(app_path, scenario, csv_path) for _ in range(args.repeat)]
+            rows.append({
+                'name': scenario,
+                'first_run_ms': statistics.median(run['first_run_ms'] for run in runs),
+                'rerun_ms': statistics.median(run['rerun_ms'] for run in runs),
+                'streamlit_import_ms': statistics.median(run['streamlit_import_ms'] for run in runs),
+                'modules': runs[0]['modules'],
+                'exceptions': runs[0]['exceptions'],
+                'runs': runs
+            })
+
+    print(f"{app_path}, median of {args.repeat} fresh processes")
+    print(f"{'scenario':<10} {'first ms':>9} {'rerun ms':>9}  heavy modules loaded")
+    for row in rows:
+        print(f"{row['name']:<10} {row['first_run_ms']:>9} {row['rerun_ms']:>9}  {', '.join(row['modules']) or '-'}")
+        for error in row['exceptions']:
+            print(f"  exception: {error}")
+
+    if args.json:
+        params = {'app': app_path, 'repeat': args.repeat, 'rows': args.rows, 'scenarios': args.scenarios}
+        results.write(args.json, 'startup', params, rows)
+
+if __name__ == '__main__':
+    main()
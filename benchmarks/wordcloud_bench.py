@@ -0,0 +1,116 @@
+# Benchmark for word cloud generation: single-process counting vs. the process pool
+# Counts words in a CSV (or a generated corpus) once in-process and once per worker count,
+# checks that every run produces the same counts, then times the layout, which runs once
+#
+# Usage:
+#   python benchmarks/wordcloud_bench.py --rows 1000000 --workers 2 4 8
+#   python benchmarks/wordcloud_bench.py --csv tweets.csv --workers 4 --json wordcloud.json
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import results
+from ingest import CHUNK_SIZE, find_text_column, iter_text_chunks, read_columns
+from term_frequency import TermCounter, make_pool
+
+WORDS = (
+    "election vote policy climate change ai technology economy market news people today "
+    "government report study shows new great bad awful love hate progress crisis health "
+    "science research global local community future water energy jobs tax school city"
+).split()
+
+def write_corpus(path, rows, seed=0):
+    """Write a synthetic tweet CSV with `rows` rows"""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('id,tweet\n')
+        for i in range(rows):
+            words = rng.choices(WORDS, k=rng.randint(8, 25))
+            words.append(f"#{rng.choice(WORDS)}{rng.randint(0, 500)}")
+            f.write(f'{i},"{" ".join(words)}"\n')
+
+def count(csv_path, text_column, workers, chunksize):
+    """Count words in csv_path with `workers` processes; returns (counter, seconds)"""
+    pool = make_pool(workers)
+    try:
+        if pool is not None:
+            # Start the workers before timing so process spawn cost is not counted;
+            # the dashboard keeps its pool alive across reruns
+            list(pool.map(abs, range(workers)))
+        started = time.perf_counter()
+        counter = TermCounter()
+        for _ in counter.update_chunks(iter_text_chunks(csv_path, text_column, chunksize), pool):
+            pass
+        return counter, time.perf_counter() - started
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+def layout_seconds(counter, max_words):
+    """Time one word cloud layout from the merged counts"""
+    from wordcloud import WordCloud
+
+    started = time.perf_counter()
+    WordCloud(width=800, height=400, max_words=max_words, background_color='white',
+              relative_scaling=0.5).generate_from_frequencies(counter.frequencies(max_words)).to_array()
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description="Word cloud counting: single process vs. process pool")
+    parser.add_argument('--csv', help="CSV to count (default: a generated corpus)")
+    parser.add_argument('--rows', type=int, default=500000, help="Rows in the generated corpus")
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4])
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--max-words', type=int, default=100)
+    parser.add_argument('--json', help="Write results to this JSON file (see benchmarks/results.py)")
+    args = parser.parse_args()
+
+    tmpdir = None
+    csv_path = args.csv
+    if csv_path is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        csv_path = os.path.join(tmpdir.name, 'corpus.csv')
+        print(f"Generating {args.rows:,} rows...")
+        write_corpus(csv_path, args.rows)
+
+    try:
+        text_column = find_text_column(read_columns(csv_path))
+        if text_column is None:
+            parser.error(f"{csv_path} has no supported text column")
+
+        baseline, baseline_seconds = count(csv_path, text_column, 1, args.chunksize)
+        rows = [{'name': 'count_1_workers', 'workers': 1, 'seconds': round(baseline_seconds, 3), 'speedup': 1.0,
+                    'rows_per_sec': round(baseline.texts_seen / baseline_seconds)}]
+        for workers in args.workers:
+            counter, seconds = count(csv_path, text_column, workers, args.chunksize)
+            if counter.counts != baseline.counts:
+                raise AssertionError(f"{workers} workers produced different counts than the single-process run")
+            rows.append({'name': f'count_{workers}_workers', 'workers': workers, 'seconds': round(seconds, 3),
+                         'speedup': round(baseline_seconds / seconds, 2),
+                         'rows_per_sec': round(counter.texts_seen / seconds)})
+        layout = layout_seconds(baseline, args.max_words)
+    finally:
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+    print(f"{baseline.texts_seen:,} rows, {len(baseline):,} distinct words, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'count s':>9} {'rows/s':>11} {'speedup':>8}")
+    for row in rows:
+        print(f"{row['workers']:>8} {row['seconds']:>9} {row['rows_per_sec']:>11,} {row['speedup']:>8}")
+    print(f"layout (once, {args.max_words} words): {layout:.2f} s")
+
+    if args.json:
+        rows.append({'name': 'layout', 'max_words': args.max_words, 'seconds': round(layout, 3)})
+        params = {'csv': args.csv, 'rows': baseline.texts_seen, 'workers': args.workers,
+                  'chunksize': args.chunksize, 'max_words': args.max_words}
+        results.write(args.json, 'wordcloud', params, rows)
+
+if __name__ == '__main__':
+    main()
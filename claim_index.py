@@ -0,0 +1,296 @@
+# Nearest-neighbour index of past /fakenews verdicts, so reworded versions of a claim that
+# was already checked reuse its verdict instead of going through the classifier again
+#
+# Texts are embedded as signed feature-hashed bags of crudely stemmed content words,
+# L2-normalized so a dot product is their cosine similarity. Random-hyperplane LSH buckets the vectors: each
+# of `tables` tables keys a vector by the signs of `bits` random projections, and a query
+# reranks only the claims that share a bucket with it in some table by exact similarity
+#
+# The index is a directory of flat files that are memory-mapped on open, so startup does not
+# re-embed or re-sort anything:
+#   vectors.f16 / codes.u16          embeddings and LSH keys, one row per claim
+#   verdicts.f64                     is-fake, confidence, the three analysis scores, checked-at
+#   texts.bin / text_offsets.u64     the claim texts
+#   order.npy / sorted_codes.npy     per-table sort of the keys, for binary-search bucket lookup
+#   meta.json                        parameters and claim count, written last on every add
+# Claims added since the last sort are scanned directly until there are enough to re-sort
+#
+# Several processes (gunicorn workers) can share one directory: adds hold an exclusive flock
+# on .lock and start from the claim count in meta.json, not the one this process last saw,
+# and lookups pick up claims other processes added once meta.json changes
+
+import fcntl
+import json
+import os
+import re
+import threading
+import zlib
+from contextlib import contextmanager
+
+import numpy as np
+
+from dedup import normalize
+
+FORMAT_VERSION = 1
+
+ANALYSIS_FIELDS = ['credibility', 'language_quality', 'source_reliability']
+
+# Function words carry no claim; negations are kept because they flip one
+STOPWORDS = frozenset("""
+a an the of in on at to for and or but is are was were be been being has have had do does did
+that this these those it its as by with from than then so such just very which who whom what
+when where why how i you he she we they me him her us them my your our their
+""".split())
+SUFFIX = re.compile(r'(ing|ed|es|s|ly)$')
+
+def terms(text):
+    """Content words of text with common inflections stripped ("discovered" -> "discover")"""
+    words = [word for word in normalize(text).split() if word not in STOPWORDS]
+    return [SUFFIX.sub('', word) if len(word) > 4 else word for word in words]
+
+def embed(texts, dim):
+    """(len(texts), dim) float32 unit vectors; texts without words get a zero row"""
+    rows, hashes = [], []
+    for row, text in enumerate(texts):
+        for term in terms(text):
+            rows.append(row)
+            hashes.append(zlib.crc32(term.encode('utf-8')))
+
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    if hashes:
+        hashes = np.array(hashes, dtype=np.uint64)
+        # Low bits pick the dimension, the top bit the sign, so collisions cancel on average
+        signs = np.where(hashes >> np.uint64(31), -1.0, 1.0).astype(np.float32)
+        np.add.at(vectors, (np.array(rows), (hashes % np.uint64(dim)).astype(np.int64)), signs)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+class ClaimIndex:
+    """
+    Persistent similarity index of checked claims and their verdicts
+    Safe to share between threads; lookups and adds hold one lock, adds also hold a file
+    lock so processes sharing the directory do not overwrite each other's claims
+    """
+
+    def __init__(self, path, dim=512, tables=64, bits=14, max_claims=1000000, seed=1):
+        self.path = path
+        self.max_claims = max_claims
+        os.makedirs(path, exist_ok=True)
+        self._meta_path = os.path.join(path, 'meta.json')
+        self._meta_stamp = None
+        self._lock = threading.Lock()
+        self._lock_file = open(os.path.join(path, '.lock'), 'a')
+        self._lookups = 0
+        self._matches = 0
+        with self._exclusive():
+            self.meta = self._read_meta()
+            if self.meta is None:
+                self.meta = {'version': FORMAT_VERSION, 'dim': dim, 'tables': tables, 'bits': bits,
+                             'seed': seed, 'count': 0, 'capacity': 1024}
+            elif self.meta.get('version') != FORMAT_VERSION:
+                raise ValueError(f"{path} was built by an incompatible version")
+            self.dim, self.tables, self.bits = self.meta['dim'], self.meta['tables'], self.meta['bits']
+            rng = np.random.default_rng(self.meta['seed'])
+            self._planes = rng.standard_normal((self.dim, self.tables * self.bits)).astype(np.float32)
+            self._bit_values = (1 << np.arange(self.bits)).astype(np.uint16)
+
+            self._map_arrays()
+            texts_path = os.path.join(path, 'texts.bin')
+            open(texts_path, 'ab').close()
+            self._texts = open(texts_path, 'r+b')
+            self._load_sorted()
+
+    @contextmanager
+    def _exclusive(self):
+        """Hold the thread lock and the directory's file lock"""
+        with self._lock:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _read_meta(self):
+        """meta.json as written by the last add in any process, or None before the first"""
+        try:
+            stat = os.stat(self._meta_path)
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        self._meta_stamp = (stat.st_mtime_ns, stat.st_ino)
+        return meta
+
+    def _refresh(self, force=False):
+        """Catch up with claims other processes added, remapping the arrays if they grew"""
+        if not force:
+            try:
+                stat = os.stat(self._meta_path)
+            except FileNotFoundError:
+                return
+            if (stat.st_mtime_ns, stat.st_ino) == self._meta_stamp:
+                return
+        meta = self._read_meta()
+        if meta is None:
+            return
+        grew = meta['capacity'] != self.meta['capacity']
+        self.meta.update(count=meta['count'], capacity=meta['capacity'])
+        if grew:
+            self._map_arrays()
+
+    def _map_arrays(self):
+        """Memory-map the per-claim arrays, growing the files to the current capacity"""
+        capacity = self.meta['capacity']
+
+        def mapped(name, dtype, columns):
+            path = os.path.join(self.path, name)
+            size = capacity * columns * np.dtype(dtype).itemsize
+            open(path, 'ab').close()
+            if os.path.getsize(path) < size:
+                os.truncate(path, size)
+            return np.memmap(path, dtype=dtype, mode='r+', shape=(capacity, columns))
+
+        self.vectors = mapped('vectors.f16', np.float16, self.dim)
+        self.codes = mapped('codes.u16', np.uint16, self.tables)
+        self.verdicts = mapped('verdicts.f64', np.float64, 2 + len(ANALYSIS_FIELDS) + 1)
+        self.text_offsets = mapped('text_offsets.u64', np.uint64, 1)[:, 0]
+
+    def _load_sorted(self):
+        try:
+            self.order = np.load(os.path.join(self.path, 'order.npy'), mmap_mode='r')
+            self.sorted_codes = np.load(os.path.join(self.path, 'sorted_codes.npy'), mmap_mode='r')
+            if self.order.shape != self.sorted_codes.shape or self.order.shape[1] > self.meta['count']:
+                raise ValueError("stale sort")
+        except (OSError, ValueError):
+            self._sort()
+
+    def _sort(self):
+        """Re-sort every table's keys so bucket lookups are binary searches again"""
+        count = self.meta['count']
+        order = np.argsort(self.codes[:count], axis=0, kind='stable').T.astype(np.uint32)
+        sorted_codes = np.take_along_axis(np.asarray(self.codes[:count]).T, order.astype(np.int64), axis=1)
+        for name, array in (('order.npy', order), ('sorted_codes.npy', sorted_codes)):
+            tmp = os.path.join(self.path, name + '.tmp')
+            with open(tmp, 'wb') as f:
+                np.save(f, array)
+            os.replace(tmp, os.path.join(self.path, name))
+        self.order, self.sorted_codes = order, sorted_codes
+
+    def _keys(self, vectors):
+        """(n, tables) LSH keys: the sign bits of each table's projections"""
+        bits = (vectors @ self._planes > 0).reshape(len(vectors), self.tables, self.bits)
+        return (bits * self._bit_values).sum(axis=2, dtype=np.uint16)
+
+    def _candidates(self, key):
+        """IDs of the claims sharing a bucket with key in at least one table"""
+        sorted_count = self.order.shape[1]
+        found = [np.flatnonzero((self.codes[sorted_count:self.meta['count']] == key).any(axis=1)) + sorted_count]
+        for table in range(self.tables):
+            row = self.sorted_codes[table]
+            start, end = np.searchsorted(row, key[table], 'left'), np.searchsorted(row, key[table], 'right')
+            found.append(self.order[table, start:end])
+        return np.unique(np.concatenate(found))
+
+    def _text(self, claim_id):
+        start = int(self.text_offsets[claim_id - 1]) if claim_id else 0
+        self._texts.seek(start)
+        return self._texts.read(int(self.text_offsets[claim_id]) - start).decode('utf-8')
+
+    def lookup(self, texts, threshold):
+        """
+        For each text, the stored verdict of its most similar claim if the cosine similarity
+        is at least threshold, else None. A verdict is a /fakenews style dict (without
+        indicators) plus 'matched_claim': {'text', 'similarity', 'checked_at'}
+        """
+        vectors = embed(texts, self.dim)
+        keys = self._keys(vectors)
+        results = []
+        with self._lock:
+            self._refresh()
+            for vector, key in zip(vectors, keys):
+                match = None
+                ids = self._candidates(key) if vector.any() else []
+                if len(ids):
+                    similarities = self.vectors[ids].astype(np.float32) @ vector
+                    best = int(np.argmax(similarities))
+                    if similarities[best] >= threshold:
+                        match = self._verdict(int(ids[best]), float(similarities[best]))
+                results.append(match)
+            self._lookups += len(texts)
+            self._matches += sum(match is not None for match in results)
+        return results
+
+    def _verdict(self, claim_id, similarity):
+        is_fake, confidence, *analysis, checked_at = self.verdicts[claim_id].tolist()
+        return {
+            "prediction": "fake" if is_fake else "real",
+            "confidence": confidence,
+            "analysis": dict(zip(ANALYSIS_FIELDS, analysis)),
+            "matched_claim": {
+                "text": self._text(claim_id),
+                "similarity": round(similarity, 3),
+                "checked_at": checked_at
+            }
+        }
+
+    def add(self, texts, verdicts, checked_at):
+        """Store newly checked claims with their /fakenews verdicts; texts without words are skipped"""
+        vectors = embed(texts, self.dim)
+        keep = [i for i in range(len(texts)) if vectors[i].any()]
+        with self._exclusive():
+            # Another process may have added claims since this one last looked
+            self._refresh(force=True)
+            keep = keep[:max(0, self.max_claims - self.meta['count'])]
+            if not keep:
+                return 0
+            start = self.meta['count']
+            end = start + len(keep)
+            if end > self.meta['capacity']:
+                self.meta['capacity'] = max(end, self.meta['capacity'] * 2)
+                self._map_arrays()
+
+            self.vectors[start:end] = vectors[keep]
+            self.codes[start:end] = self._keys(vectors[keep])
+            for row, i in enumerate(keep, start):
+                verdict = verdicts[i]
+                analysis = verdict.get('analysis', {})
+                self.verdicts[row] = [verdict['prediction'] == 'fake', verdict['confidence'],
+                                      *(analysis.get(field, 0.0) for field in ANALYSIS_FIELDS), checked_at]
+
+            # Texts go after the last committed claim; anything past it is a torn earlier add
+            offset = int(self.text_offsets[start - 1]) if start else 0
+            self._texts.seek(offset)
+            self._texts.truncate()
+            for row, i in enumerate(keep, start):
+                offset += self._texts.write(str(texts[i]).encode('utf-8'))
+                self.text_offsets[row] = offset
+            self._texts.flush()
+            for array in (self.vectors, self.codes, self.verdicts, self.text_offsets):
+                array.flush()
+
+            self.meta['count'] = end
+            tmp = os.path.join(self.path, 'meta.json.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(self.meta, f)
+            os.replace(tmp, self._meta_path)
+            self._meta_stamp = None
+
+            # Scanning unsorted claims is linear, so re-sort once they are 1/8 of the index
+            if end - self.order.shape[1] > max(1024, end // 8):
+                self._sort()
+            return len(keep)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'claims': self.meta['count'],
+                'unsorted': self.meta['count'] - self.order.shape[1],
+                'lookups': self._lookups,
+                'matches': self._matches,
+                'match_rate': round(self._matches / self._lookups, 3) if self._lookups else 0.0
+            }
+
+    def close(self):
+        self._texts.close()
+        self._lock_file.close()
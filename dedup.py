@@ -0,0 +1,149 @@
+# Near-duplicate collapsing for batches of posts
+# Retweets and copy-paste variants are grouped with MinHash signatures and LSH banding so
+# each cluster can be scored once and its label copied to every member
+#
+# Texts are normalized first (case, "RT @user:", mentions, links, punctuation), which makes
+# plain retweets exact duplicates; the remaining distinct texts are fingerprinted with
+# MinHash over word shingles and candidate pairs from shared LSH buckets are kept only if
+# their signatures agree on at least `threshold` of the hash functions
+
+import re
+import threading
+import zlib
+
+import numpy as np
+
+RETWEET_PREFIX = re.compile(r'^\s*rt\s+@\w+:?\s*')
+NOISE = re.compile(r'https?://\S+|www\.\S+|@\w+|[^\w\s]')
+
+# A prime just above 2**32, so (a * x + b) % PRIME stays exact in uint64 for 32-bit x, a, b
+PRIME = (1 << 32) + 15
+
+def normalize(text):
+    """Lowercase text with retweet prefix, mentions, links and punctuation removed"""
+    text = RETWEET_PREFIX.sub('', str(text).lower())
+    return ' '.join(NOISE.sub(' ', text).split())
+
+def shingles(normalized, size=2):
+    """Word n-grams of a normalized text (the whole text if it is shorter than size words)"""
+    words = normalized.split()
+    if len(words) <= size:
+        return [normalized] if normalized else []
+    return [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+class Deduplicator:
+    """
+    Groups near-duplicate texts within a batch
+    num_perm hash functions are split into `bands` LSH bands; with the defaults (64, 16, 0.7)
+    a one-word edit of a 20-word post is grouped with it ~99% of the time, while posts that
+    share half their words are not grouped
+    """
+
+    def __init__(self, num_perm=64, bands=16, threshold=0.7, shingle_size=2, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)[:, None]
+        self._lock = threading.Lock()
+        self._texts = 0
+        self._duplicates = 0
+
+    def signatures(self, texts, block_size=1000):
+        """(len(texts), num_perm) MinHash signatures of already normalized texts"""
+        signatures = np.full((len(texts), self.num_perm), PRIME, dtype=np.uint64)
+        # Blocks keep the (num_perm x shingles) intermediate small on large batches
+        for block_start in range(0, len(texts), block_size):
+            doc_shingles = [shingles(text, self.shingle_size) for text in texts[block_start:block_start + block_size]]
+            counts = np.array([len(s) for s in doc_shingles], dtype=np.int64)
+            if counts.sum() == 0:
+                continue
+            hashes = np.fromiter(
+                (zlib.crc32(s.encode('utf-8')) for doc in doc_shingles for s in doc),
+                dtype=np.uint64, count=int(counts.sum())
+            )
+            # Min over each text's shingles of every hash function (texts without shingles keep PRIME)
+            has_shingles = counts > 0
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[has_shingles]
+            permuted = (self._a * hashes[None, :] + self._b) % np.uint64(PRIME)
+            rows = block_start + np.flatnonzero(has_shingles)
+            signatures[rows] = np.minimum.reduceat(permuted, starts, axis=1).T
+        return signatures
+
+    def group(self, texts):
+        """
+        Cluster representatives: an int array where entry i is the index of the first text in
+        text i's cluster (entry i == i for texts that are scored)
+        """
+        n = len(texts)
+        normalized = [normalize(text) for text in texts]
+
+        # Exact duplicates after normalization (plain retweets) never reach MinHash
+        first_seen = {}
+        exact = np.array([first_seen.setdefault(text, i) for i, text in enumerate(normalized)], dtype=np.int64)
+        distinct = np.flatnonzero(exact == np.arange(n))
+
+        labels = np.arange(distinct.size)
+        if distinct.size > 1:
+            signatures = self.signatures([normalized[i] for i in distinct])
+            rows = self.num_perm // self.bands
+            pairs = []
+            for band in range(self.bands):
+                keys = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+                _, first, inverse = np.unique(
+                    keys.view(np.dtype((np.void, keys.dtype.itemsize * rows))).ravel(),
+                    return_index=True, return_inverse=True
+                )
+                leader = first[inverse.ravel()]
+                candidates = np.flatnonzero(leader != np.arange(distinct.size))
+                if candidates.size:
+                    agreement = (signatures[candidates] == signatures[leader[candidates]]).mean(axis=1)
+                    keep = candidates[agreement >= self.threshold]
+                    pairs.append(np.stack([keep, leader[keep]]))
+
+            if pairs:
+                # Connected components by repeated min-label propagation over the kept pairs
+                left, right = np.concatenate(pairs, axis=1)
+                while True:
+                    merged = np.minimum(labels[left], labels[right])
+                    updated = labels.copy()
+                    np.minimum.at(updated, left, merged)
+                    np.minimum.at(updated, right, merged)
+                    updated = updated[updated]
+                    if np.array_equal(updated, labels):
+                        break
+                    labels = updated
+
+        # Map each text to the first (lowest index) member of its cluster
+        representatives = distinct[labels][np.searchsorted(distinct, exact)]
+        with self._lock:
+            self._texts += n
+            self._duplicates += int(np.count_nonzero(representatives != np.arange(n)))
+        return representatives
+
+    def stats(self):
+        with self._lock:
+            return {
+                'texts': self._texts,
+                'duplicates': self._duplicates,
+                'duplicate_ratio': round(self._duplicates / self._texts, 3) if self._texts else 0.0
+            }
+
+def score_deduplicated(score, texts, deduplicator):
+    """
+    Run score(texts) on one member per near-duplicate cluster and copy the labels to the rest
+    Returns (labels, representatives) for the full list of texts
+    """
+    representatives = deduplicator.group(texts)
+    unique = np.flatnonzero(representatives == np.arange(len(texts)))
+    labels = np.empty(len(texts), dtype=object)
+    if unique.size:
+        unique_labels = np.asarray(score([texts[i] for i in unique]))
+        position = np.empty(len(texts), dtype=np.int64)
+        position[unique] = np.arange(unique.size)
+        labels = unique_labels[position[representatives]]
+    return labels, representatives
@@ -0,0 +1,44 @@
+# Render cache for dashboard figures and images
+# Entries are keyed by a hash of the data behind a figure plus its display options, so a
+# rerun with unchanged inputs reuses the finished Plotly figure or PNG instead of rebuilding it
+
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+
+def fingerprint(*parts):
+    """Stable hash of JSON-like data (dicts, lists, numbers, strings)"""
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+class FigureCache:
+    """Thread-safe LRU of built figures, bounded to max_entries"""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, kind, data, build):
+        """Return the cached figure for (kind, data), calling build() only on a miss"""
+        key = fingerprint(kind, data)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        figure = build()
+        with self._lock:
+            self._entries[key] = figure
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return figure
+
+    def __len__(self):
+        return len(self._entries)
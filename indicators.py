@@ -0,0 +1,116 @@
+# Fake/real news indicator matching for the Flask backend
+# Every indicator phrase is compiled into one Aho-Corasick automaton, so a text is
+# lowercased once and scanned once no matter how many phrases the lexicon holds
+
+from collections import deque
+import json
+import os
+import threading
+
+class IndicatorMatcher:
+    """Aho-Corasick automaton over a {label: [phrases]} lexicon"""
+
+    def __init__(self, lexicon):
+        self.patterns = []  # (phrase, label) per pattern id
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+
+        seen = set()
+        for label, phrases in lexicon.items():
+            for phrase in phrases:
+                phrase = phrase.strip().lower()
+                if phrase and (phrase, label) not in seen:
+                    seen.add((phrase, label))
+                    self._add(phrase, label)
+        self._build_failure_links()
+
+    def _add(self, phrase, label):
+        node = 0
+        for ch in phrase:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            node = nxt
+        self.outputs[node].append(len(self.patterns))
+        self.patterns.append((phrase, label))
+
+    def _build_failure_links(self):
+        # Breadth-first so every node's failure target is finished before the node itself
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(ch, 0)
+                # Inherit matches that end here via the failure chain (e.g. "secret" inside "top secret")
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+
+    def scan(self, text):
+        """
+        Scan text once and return every indicator hit as
+        {"phrase", "label", "start", "end"} with offsets into the lowercased text
+        """
+        goto, fail, outputs, patterns = self.goto, self.fail, self.outputs, self.patterns
+        hits = []
+        node = 0
+        for i, ch in enumerate(text.lower()):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pattern_id in outputs[node]:
+                phrase, label = patterns[pattern_id]
+                hits.append({"phrase": phrase, "label": label, "start": i + 1 - len(phrase), "end": i + 1})
+        return hits
+
+class IndicatorLexicon:
+    """
+    Indicator lexicon loaded from a JSON file of {label: [phrases]}
+    The file is re-read whenever its modification time changes, or on reload()
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._matcher = None
+        self.reload()
+
+    def reload(self):
+        """Recompile the automaton from the lexicon file"""
+        with self._lock:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, encoding='utf-8') as f:
+                lexicon = json.load(f)
+            # Swap in the new automaton only once it is fully built
+            self._matcher = IndicatorMatcher(lexicon)
+            self._mtime = mtime
+        return self.stats()
+
+    @property
+    def matcher(self):
+        """Current automaton, reloading first if the file changed on disk"""
+        try:
+            if os.path.getmtime(self.path) != self._mtime:
+                self.reload()
+        except (OSError, ValueError):
+            # Keep serving the last good lexicon if the file is missing or half-written
+            pass
+        return self._matcher
+
+    def scan(self, text):
+        return self.matcher.scan(text)
+
+    def stats(self):
+        matcher = self._matcher
+        labels = {}
+        for _, label in matcher.patterns:
+            labels[label] = labels.get(label, 0) + 1
+        return {"path": self.path, "phrases": labels, "states": len(matcher.goto)}
@@ -0,0 +1,193 @@
+# Streaming CSV (and JSON Lines) ingestion for the dashboard and the backend
+# Reads only the text column, a chunk at a time, so memory use does not grow with file size
+# pandas is imported on first read, so importing this module (the backend does) stays cheap
+
+import json
+import os
+import tempfile
+
+# Supported text column names for CSV uploads, in order of preference
+TEXT_COLUMNS = ['tweet', 'text', 'content', 'message']
+
+# Number of rows read per chunk (also the size of each /sentiment/batch request)
+CHUNK_SIZE = 5000
+
+# Directory of CSV exports the dashboard may read straight from the server's disk, for files too
+# large to upload through the browser. Empty (the default) offers uploads only
+CSV_DATA_DIR = os.environ.get('CSV_DATA_DIR', '')
+
+def find_text_column(columns):
+    """Return the first supported text column in columns, or None"""
+    for col in TEXT_COLUMNS:
+        if col in columns:
+            return col
+    return None
+
+def resolve_data_file(name, data_dir=CSV_DATA_DIR):
+    """
+    Real path of name inside data_dir; raises ValueError for anything that resolves outside
+    it ('..', absolute paths, symlinks pointing elsewhere)
+    """
+    if not data_dir:
+        raise ValueError("No CSV data directory is configured")
+    root = os.path.realpath(data_dir)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"{name} is outside the CSV data directory")
+    return path
+
+def data_dir_files(data_dir=CSV_DATA_DIR):
+    """CSV files under data_dir as paths relative to it (none when no directory is configured)"""
+    if not data_dir or not os.path.isdir(data_dir):
+        return []
+    names = []
+    for root, dirs, files in os.walk(data_dir):
+        dirs.sort()
+        for name in sorted(files):
+            relative = os.path.relpath(os.path.join(root, name), data_dir)
+            if not name.lower().endswith('.csv'):
+                continue
+            try:
+                resolve_data_file(relative, data_dir)
+            except ValueError:
+                continue
+            names.append(relative)
+    return names
+
+def _rewind(csv_source):
+    """Move an uploaded file back to the start; paths are left untouched"""
+    if hasattr(csv_source, 'seek'):
+        csv_source.seek(0)
+
+def source_fingerprint(csv_source):
+    """Identity of an upload or file path that changes whenever its content may have changed"""
+    if hasattr(csv_source, 'seek'):
+        return ('upload', getattr(csv_source, 'file_id', None), getattr(csv_source, 'name', None),
+                getattr(csv_source, 'size', None))
+    stat = os.stat(csv_source)
+    return ('path', os.path.abspath(csv_source), stat.st_mtime_ns, stat.st_size)
+
+def read_columns(csv_source):
+    """Read just the header row of a CSV file or upload"""
+    import pandas as pd
+    _rewind(csv_source)
+    columns = list(pd.read_csv(csv_source, nrows=0).columns)
+    _rewind(csv_source)
+    return columns
+
+def read_preview(csv_source, text_column, rows=3):
+    """Read the first few rows of the text column"""
+    import pandas as pd
+    _rewind(csv_source)
+    preview = pd.read_csv(csv_source, usecols=[text_column], nrows=rows)
+    _rewind(csv_source)
+    return preview
+
+def iter_text_chunks(csv_source, text_column, chunksize=CHUNK_SIZE):
+    """
+    Yield the text column as lists of strings, chunksize rows at a time
+    Only the text column is parsed, so other columns never reach memory
+    """
+    import pandas as pd
+    _rewind(csv_source)
+    reader = pd.read_csv(
+        csv_source,
+        usecols=[text_column],
+        dtype={text_column: str},
+        chunksize=chunksize
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk[text_column].fillna('').tolist()
+
+def iter_jsonl_chunks(path, chunksize=CHUNK_SIZE):
+    """
+    Yield texts from a JSON Lines file, chunksize at a time
+    Each line is either a JSON string or an object with one of the TEXT_COLUMNS fields
+    """
+    texts = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, dict):
+                column = find_text_column(record)
+                record = record[column] if column else None
+            texts.append(record if isinstance(record, str) else '')
+            if len(texts) >= chunksize:
+                yield texts
+                texts = []
+    if texts:
+        yield texts
+
+def iter_source_chunks(path, chunksize=CHUNK_SIZE):
+    """Yield text chunks from a CSV or .jsonl/.ndjson file, picked by extension"""
+    if path.endswith(('.jsonl', '.ndjson')):
+        yield from iter_jsonl_chunks(path, chunksize)
+        return
+    text_column = find_text_column(read_columns(path))
+    if text_column is None:
+        raise ValueError(f"{path} has no 'tweet', 'text', 'content' or 'message' column")
+    yield from iter_text_chunks(path, text_column, chunksize)
+
+class LabeledCsvWriter:
+    """
+    Texts and their sentiment labels appended to a CSV file on disk a chunk at a time, so a
+    labeled copy of a large file can be offered for download without holding it in memory
+    """
+
+    def __init__(self, text_column, path=None):
+        self.text_column = text_column
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix='sentiment_labels-', suffix='.csv')
+            os.close(fd)
+        self.path = path
+        self.rows = 0
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+
+    def add(self, texts, labels):
+        import pandas as pd
+        frame = pd.DataFrame({self.text_column: texts, 'sentiment': labels})
+        frame.to_csv(self._file, header=self.rows == 0, index=False)
+        self.rows += len(frame)
+
+    def close(self):
+        self._file.close()
+
+class SentimentTally:
+    """Running merge of /sentiment/batch responses into one /sentiment style result"""
+
+    def __init__(self, sample_size=5, labeled_preview_size=100):
+        self.counts = {'positive': 0, 'negative': 0, 'neutral': 0}
+        self.total = 0
+        self.duplicates = 0
+        self.sample_size = sample_size
+        self.sample_tweets = []
+        self.labeled_preview_size = labeled_preview_size
+        self.labeled_preview = []
+
+    def add(self, texts, batch):
+        """Fold one batch response (and the texts it was computed from) into the tally"""
+        self.total += batch.get('total_tweets', 0)
+        self.duplicates += batch.get('duplicates', 0)
+        for field in self.counts:
+            self.counts[field] += batch.get(field, 0)
+
+        missing = self.sample_size - len(self.sample_tweets)
+        if missing > 0:
+            self.sample_tweets.extend(batch.get('sample_tweets', [])[:missing])
+
+        missing = self.labeled_preview_size - len(self.labeled_preview)
+        if missing > 0:
+            self.labeled_preview.extend(zip(texts[:missing], batch.get('labels', [])[:missing]))
+
+    def result(self):
+        """Return the merged counts, percentages and sample tweets"""
+        data = {'total_tweets': self.total, 'sample_tweets': list(self.sample_tweets)}
+        for field, count in self.counts.items():
+            data[field] = count
+            data[f'{field}_pct'] = round(count / self.total * 100, 1) if self.total else 0.0
+        data['duplicates'] = self.duplicates
+        data['duplicate_ratio'] = round(self.duplicates / self.total, 3) if self.total else 0.0
+        return data
@@ -0,0 +1,104 @@
+# Replayable live post source for the streaming sentiment endpoint
+# CsvTail follows a CSV file the way `tail -f` does: every read returns the records
+# appended since the previous read, starting from the first row (replay) or from the
+# current end of the file. Truncated or replaced files (log rotation) are reopened.
+
+import codecs
+import csv
+import io
+import os
+
+from ingest import find_text_column
+
+# Optional column holding each post's time (ISO 8601 or Unix seconds), in order of preference
+TIME_COLUMNS = ['created_at', 'timestamp', 'date', 'time']
+
+def complete_length(data):
+    """Length of the prefix of data made of whole CSV records (newlines inside quotes don't end one)"""
+    end = 0
+    quotes = 0
+    pos = 0
+    while True:
+        newline = data.find('\n', pos)
+        if newline < 0:
+            return end
+        quotes += data.count('"', pos, newline)
+        if quotes % 2 == 0:
+            end = newline + 1
+        pos = newline + 1
+
+class CsvTail:
+    """Incremental reader for the text column of a CSV file that is still being written"""
+
+    def __init__(self, path, replay=True, read_size=1 << 20):
+        self.path = path
+        self.read_size = read_size
+        self._open()
+        if not replay:
+            self._file.seek(0, os.SEEK_END)
+
+    def _open(self):
+        self._file = open(self.path, 'rb')
+        self.inode = os.fstat(self._file.fileno()).st_ino
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._partial = ''
+
+        header = self._file.readline().decode('utf-8', errors='replace')
+        columns = next(csv.reader([header]), [])
+        text_column = find_text_column(columns)
+        if text_column is None:
+            self._file.close()
+            raise ValueError(f"{self.path} has no 'tweet', 'text', 'content' or 'message' column")
+        self.text_index = columns.index(text_column)
+        self.time_index = next((columns.index(c) for c in TIME_COLUMNS if c in columns), None)
+        self._data_start = self._file.tell()
+
+    def _replaced(self):
+        """True when the path now points to a new file or the file shrank under us"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return stat.st_ino != self.inode or stat.st_size < self._file.tell()
+
+    def read(self):
+        """Return the texts of the complete records written since the previous call (at most read_size bytes)"""
+        return [text for text, _ in self.read_records()]
+
+    def read_records(self):
+        """Like read(), but as (text, time) pairs; time is the raw time column value or None"""
+        raw = self._file.read(self.read_size)
+        if not raw:
+            if self._replaced():
+                self._file.close()
+                self._open()
+            return []
+
+        data = self._partial + self._decoder.decode(raw)
+        end = complete_length(data)
+        self._partial = data[end:]
+        records = []
+        for row in csv.reader(io.StringIO(data[:end])):
+            if len(row) > self.text_index:
+                has_time = self.time_index is not None and len(row) > self.time_index
+                records.append((row[self.text_index], row[self.time_index] if has_time else None))
+        return records
+
+    @property
+    def offset(self):
+        """Byte offset just past the last record returned, for resuming with seek()"""
+        undecoded = self._decoder.getstate()[0]
+        return self._file.tell() - len(undecoded) - len(self._partial.encode('utf-8'))
+
+    def seek(self, offset):
+        """Continue reading from a byte offset previously taken from .offset"""
+        self._file.seek(max(offset, self._data_start))
+        self._decoder.reset()
+        self._partial = ''
+
+    def rewind(self):
+        """Start again from the first record (used to loop a finite replay)"""
+        self.seek(self._data_start)
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,165 @@
+# In-process metrics for the Flask backend, rendered in the Prometheus text format
+# Counters and gauges are plain numbers per label set. Summaries keep an all-time _sum and
+# _count plus a sliding window of recent observations from which p50/p95/p99 are reported,
+# so the quantiles follow current behaviour rather than averaging over the whole uptime
+# RequestTimer splits one request into named stages and formats them as a Server-Timing header
+
+from collections import deque
+from contextlib import contextmanager
+import threading
+import time
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+def format_labels(labels):
+    """Prometheus label block for a sorted tuple of (name, value) pairs"""
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+class Summary:
+    """Count, sum and a window of the most recent observations"""
+
+    def __init__(self, window):
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def quantiles(self):
+        """{q: value} over the window (nearest rank); empty when nothing was observed"""
+        ordered = sorted(self.recent)
+        if not ordered:
+            return {}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+class Metrics:
+    """
+    Thread-safe registry of counters, gauges and summaries
+    Metrics must be declared with describe() before they are recorded; label values are
+    free-form, so only pass bounded sets (route rules, status codes, stage names)
+    """
+
+    def __init__(self, window=1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self._kinds = {}
+        self._help = {}
+        self._series = {}
+        self._callbacks = []
+
+    def describe(self, name, kind, help_text):
+        """Declare a 'counter', 'gauge' or 'summary'"""
+        if kind not in ('counter', 'gauge', 'summary'):
+            raise ValueError(f"Unknown metric kind {kind!r}")
+        with self._lock:
+            self._kinds[name] = kind
+            self._help[name] = help_text
+            self._series.setdefault(name, {})
+
+    def gauge_callback(self, name, help_text, read):
+        """Gauge read at scrape time: read() returns [(labels dict, value), ...]"""
+        with self._lock:
+            self._callbacks.append((name, help_text, read))
+
+    def inc(self, name, amount=1, **labels):
+        """Add to a counter or gauge"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series[name]
+            series[key] = series.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._series[name][tuple(sorted(labels.items()))] = value
+
+    def observe(self, name, value, **labels):
+        """Record one observation in a summary"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series[name]
+            if key not in series:
+                series[key] = Summary(self.window)
+            series[key].observe(value)
+
+    @contextmanager
+    def timed(self, name, **labels):
+        """Observe the wall time of a with-block, in seconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def snapshot(self, name):
+        """
+        Current values of one metric as [(labels dict, value)]; for a summary the value is
+        {'count', 'sum', 'p50', 'p95', 'p99'}
+        """
+        with self._lock:
+            kind = self._kinds[name]
+            result = []
+            for key, value in self._series[name].items():
+                if kind == 'summary':
+                    quantiles = value.quantiles()
+                    value = {'count': value.count, 'sum': value.sum,
+                             **{f'p{int(q * 100)}': quantiles.get(q) for q in QUANTILES}}
+                result.append((dict(key), value))
+            return result
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            for name, kind in self._kinds.items():
+                lines.append(f'# HELP {name} {self._help[name]}')
+                lines.append(f'# TYPE {name} {kind}')
+                for key, value in sorted(self._series[name].items()):
+                    if kind != 'summary':
+                        lines.append(f'{name}{format_labels(key)} {value}')
+                        continue
+                    for q, quantile in value.quantiles().items():
+                        lines.append(f'{name}{format_labels(key + (("quantile", q),))} {quantile}')
+                    lines.append(f'{name}_sum{format_labels(key)} {value.sum}')
+                    lines.append(f'{name}_count{format_labels(key)} {value.count}')
+            callbacks = list(self._callbacks)
+
+        # Callback gauges are read outside the lock; they usually take other components' locks
+        for name, help_text, read in callbacks:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            for labels, value in read():
+                lines.append(f'{name}{format_labels(tuple(sorted(labels.items())))} {value}')
+        return '\n'.join(lines) + '\n'
+
+class RequestTimer:
+    """Wall time of the named stages of one request; repeated stages add up"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Server-Timing header value: each stage plus the total, in milliseconds"""
+        entries = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in self.stages.items()]
+        entries.append(f'total;dur={self.elapsed() * 1000:.2f}')
+        return ', '.join(entries)
@@ -0,0 +1,146 @@
+# Startup loading, warm-up and shared model artifacts for the Flask backend
+# ModelRegistry loads every registered model once per process, in registration order, and
+# runs a small warm-up batch through it, so the first real request does not pay for file
+# parsing, first-call allocations or page faults on the weights. Until every model is warm
+# /health answers 503, and code that asks for a model waits for it
+# ArtifactStore keeps large arrays (vocabularies, weight matrices) as .npy files that every
+# process memory-maps read-only. N worker processes then share one copy through the page
+# cache, and each extra worker adds little more than its page tables
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+class ModelUnavailable(Exception):
+    """Raised when a model is still loading or failed to load; retry_after is a hint in seconds"""
+
+    def __init__(self, name, status, retry_after=5):
+        super().__init__(f"Model '{name}' is {status}")
+        self.name = name
+        self.status = status
+        self.retry_after = retry_after
+
+class ArtifactStore:
+    """
+    Directory of read-only array artifacts, one subdirectory per name and version
+    The version is a hash of a JSON-serializable key describing the source (file path,
+    size and mtime, or the data itself), so a changed source gets a fresh artifact
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def load_or_build(self, name, key, build):
+        """
+        Memory-map the arrays of artifact `name`; build() -> {array name: array} only runs
+        when no artifact exists for this key yet
+        """
+        version = hashlib.sha1(json.dumps(key, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+        directory = os.path.join(self.path, f'{name}-{version}')
+        if not os.path.isdir(directory):
+            # Write to a private directory and rename it into place, so a process never maps
+            # a half-written file; when several workers race, the first rename wins
+            staging = tempfile.mkdtemp(prefix=f'.{name}-', dir=self.path)
+            try:
+                for array_name, array in build().items():
+                    np.save(os.path.join(staging, f'{array_name}.npy'), np.asarray(array))
+                os.rename(staging, directory)
+            except OSError:
+                if not os.path.isdir(directory):
+                    raise
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+            self._prune(name, directory)
+
+        return {
+            filename[:-len('.npy')]: np.load(os.path.join(directory, filename), mmap_mode='r')
+            for filename in sorted(os.listdir(directory)) if filename.endswith('.npy')
+        }
+
+    def _prune(self, name, keep):
+        """Remove older versions of an artifact; processes still mapping them keep their copy"""
+        for entry in os.listdir(self.path):
+            path = os.path.join(self.path, entry)
+            if entry.startswith(f'{name}-') and path != keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+class ModelRegistry:
+    """
+    Named models, loaded and warmed up in registration order (a loader may get() a model
+    registered before it). get() waits up to wait_timeout seconds for a model to be ready
+    """
+
+    def __init__(self, wait_timeout=30, retry_after=5):
+        self.wait_timeout = wait_timeout
+        self.retry_after = retry_after
+        self._models = OrderedDict()
+
+    def register(self, name, load, warmup=None):
+        """load() builds the model; warmup(model), if given, runs a representative batch through it"""
+        self._models[name] = {
+            'load': load, 'warmup': warmup, 'model': None, 'status': 'pending', 'error': None,
+            'load_ms': None, 'warmup_ms': None, 'finished': threading.Event()
+        }
+
+    def start(self, background=True):
+        """Load every model, on a 'model-loader' thread unless background is False"""
+        if background:
+            threading.Thread(target=self._load_all, name='model-loader', daemon=True).start()
+        else:
+            self._load_all()
+        return self
+
+    def _load_all(self):
+        for name, entry in self._models.items():
+            try:
+                entry['status'] = 'loading'
+                started = time.perf_counter()
+                model = entry['load']()
+                entry['load_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+                entry['status'] = 'warming_up'
+                started = time.perf_counter()
+                if entry['warmup'] is not None:
+                    entry['warmup'](model)
+                entry['warmup_ms'] = round((time.perf_counter() - started) * 1000, 1)
+                entry['model'] = model
+                entry['status'] = 'ready'
+            except Exception as e:
+                entry['status'] = 'failed'
+                entry['error'] = f"{type(e).__name__}: {e}"
+                print(f"Warning: could not load model '{name}': {entry['error']}")
+            finally:
+                entry['finished'].set()
+
+    def get(self, name):
+        """The ready model, waiting while it loads; raises ModelUnavailable on timeout or failure"""
+        entry = self._models[name]
+        if not entry['finished'].wait(self.wait_timeout) or entry['status'] != 'ready':
+            raise ModelUnavailable(name, entry['status'], self.retry_after)
+        return entry['model']
+
+    def peek(self, name):
+        """The model if it is ready, else None; never waits"""
+        entry = self._models[name]
+        return entry['model'] if entry['status'] == 'ready' else None
+
+    def status(self):
+        """'ready' once every model is warm, 'failed' if any model failed, else 'starting'"""
+        statuses = {entry['status'] for entry in self._models.values()}
+        if 'failed' in statuses:
+            return 'failed'
+        return 'ready' if statuses <= {'ready'} else 'starting'
+
+    def stats(self):
+        return {
+            name: {key: entry[key] for key in ('status', 'load_ms', 'warmup_ms', 'error')}
+            for name, entry in self._models.items()
+        }
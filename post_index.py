@@ -0,0 +1,282 @@
+# On-disk inverted index over ingested posts for keyword sentiment queries
+# Every post is scored once at build time. The index maps each term to the sorted IDs of
+# the posts containing it, with the post's sentiment label stored alongside each posting,
+# so a keyword query intersects postings lists and counts labels without touching the
+# rest of the corpus: its cost grows with the size of the result, not of the corpus
+#
+# Usage:
+#   python post_index.py build post_index sample_data.csv more_posts.jsonl
+#   python post_index.py query post_index "climate change"
+
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from dedup import Deduplicator, score_deduplicated
+from ingest import iter_source_chunks
+
+# Label codes stored per posting (index into this list); DUPLICATE marks a post that is a
+# near-duplicate of an earlier one and took its label from it
+LABELS = ['negative', 'neutral', 'positive']
+LABEL_MASK = 3
+DUPLICATE = 4
+
+# Index terms: lowercased words of up to MAX_TERM_LENGTH characters; longer tokens
+# (URLs, hashes) are skipped whole. \x00 marks the end of a post in a joined chunk
+MAX_TERM_LENGTH = 32
+TOKEN_PATTERN = re.compile(r"(?<!\w)\w{1,%d}(?!\w)|\x00" % MAX_TERM_LENGTH)
+
+FORMAT_VERSION = 2
+
+def tokenize(text):
+    """Distinct index terms of a keyword or post, in first-seen order"""
+    return list(dict.fromkeys(t for t in TOKEN_PATTERN.findall(str(text).lower()) if t != '\x00'))
+
+def source_signature(paths):
+    """Identity of the source files; the index is rebuilt when any of them changes"""
+    signature = []
+    for path in paths:
+        stat = os.stat(path)
+        signature.append([os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+    return signature
+
+def build_index(sources, out_dir, score, deduplicator=None):
+    """
+    Ingest CSV/JSONL sources into an index directory at out_dir
+    score(texts) must return one 'positive'/'negative'/'neutral' label per text
+    With a dedup.Deduplicator, each chunk's near-duplicates are scored once and flagged
+    The index is written to a private temporary directory and moved into place when complete
+    """
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f'.{os.path.basename(out_dir)}-', dir=parent)
+    try:
+        _write_index(sources, staging, score, deduplicator)
+        # Several workers may build at once: move a stale index aside, then rename ours into
+        # place; if another worker's rename got there first, the two indexes are the same
+        if os.path.isdir(out_dir):
+            stale = tempfile.mkdtemp(prefix=f'.{os.path.basename(out_dir)}-stale-', dir=parent)
+            try:
+                os.rename(out_dir, os.path.join(stale, 'index'))
+            except OSError:
+                pass
+            shutil.rmtree(stale, ignore_errors=True)
+        try:
+            os.rename(staging, out_dir)
+        except OSError:
+            if not os.path.isdir(out_dir):
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return PostIndex(out_dir)
+
+def _write_index(sources, tmp, score, deduplicator):
+    """Write the index files for sources into the directory tmp"""
+    label_codes = {label: code for code, label in enumerate(LABELS)}
+    vocabulary = {}
+    term_chunks, post_chunks, label_chunks = [], [], []
+    texts_path = os.path.join(tmp, 'texts.bin')
+
+    text_offsets = [0]
+    posts = 0
+    with open(texts_path, 'wb') as texts_file:
+        for path in sources:
+            for texts in iter_source_chunks(path):
+                if deduplicator is not None:
+                    labels, representatives = score_deduplicated(score, texts, deduplicator)
+                    duplicate = representatives != np.arange(len(texts))
+                else:
+                    labels, duplicate = score(texts), np.zeros(len(texts), dtype=bool)
+                codes = np.array([label_codes[str(label)] for label in labels], dtype=np.uint8)
+                label_chunks.append(codes | np.where(duplicate, DUPLICATE, 0).astype(np.uint8))
+
+                for text in texts:
+                    encoded = text.encode('utf-8')
+                    texts_file.write(encoded)
+                    text_offsets.append(text_offsets[-1] + len(encoded))
+
+                # One regex pass per chunk; \x00 separators mark where each post ends
+                tokens = np.array(TOKEN_PATTERN.findall('\x00'.join(t.replace('\x00', ' ') for t in texts).lower()))
+                if tokens.size:
+                    is_separator = tokens == '\x00'
+                    post_ids = np.cumsum(is_separator)[~is_separator] + posts
+                    tokens = tokens[~is_separator]
+                    chunk_terms, inverse = np.unique(tokens, return_inverse=True)
+                    term_ids = np.array([vocabulary.setdefault(t, len(vocabulary)) for t in chunk_terms.tolist()],
+                                        dtype=np.int64)
+                    term_chunks.append(term_ids[inverse])
+                    post_chunks.append(post_ids.astype(np.int64))
+                posts += len(texts)
+
+    post_labels = np.concatenate(label_chunks) if label_chunks else np.zeros(0, dtype=np.uint8)
+    term_ids = np.concatenate(term_chunks) if term_chunks else np.zeros(0, dtype=np.int64)
+    post_ids = np.concatenate(post_chunks) if post_chunks else np.zeros(0, dtype=np.int64)
+
+    # Renumber terms alphabetically so lookups can binary-search the term array
+    terms = np.array(sorted(vocabulary), dtype=f'<U{MAX_TERM_LENGTH}')
+    rank = np.empty(len(vocabulary), dtype=np.int64)
+    rank[[vocabulary[t] for t in terms.tolist()]] = np.arange(len(vocabulary))
+    term_ids = rank[term_ids]
+
+    # Sort by (term, post) and drop repeats of a term within one post
+    order = np.lexsort((post_ids, term_ids))
+    term_ids, post_ids = term_ids[order], post_ids[order]
+    distinct = np.ones(term_ids.size, dtype=bool)
+    distinct[1:] = (term_ids[1:] != term_ids[:-1]) | (post_ids[1:] != post_ids[:-1])
+    term_ids, post_ids = term_ids[distinct], post_ids[distinct]
+    term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(term_ids, minlength=len(terms)), out=term_offsets[1:])
+
+    np.save(os.path.join(tmp, 'terms.npy'), terms)
+    np.save(os.path.join(tmp, 'term_offsets.npy'), term_offsets)
+    np.save(os.path.join(tmp, 'posting_ids.npy'), post_ids.astype(np.uint32))
+    np.save(os.path.join(tmp, 'posting_labels.npy'), post_labels[post_ids])
+    np.save(os.path.join(tmp, 'post_labels.npy'), post_labels)
+    np.save(os.path.join(tmp, 'text_offsets.npy'), np.array(text_offsets, dtype=np.int64))
+    with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+        json.dump({
+            'version': FORMAT_VERSION,
+            'posts': posts,
+            'terms': len(terms),
+            'postings': int(post_ids.size),
+            'sources': source_signature(sources),
+            'built_at': time.time()
+        }, f)
+
+class PostIndex:
+    """
+    Read-only view of an index directory; arrays are memory-mapped, so opening is cheap and
+    only the postings a query touches are paged in
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"{path} was built by an incompatible version")
+
+        def load(name):
+            return np.load(os.path.join(path, name), mmap_mode='r')
+
+        self.terms = load('terms.npy')
+        self.term_offsets = load('term_offsets.npy')
+        self.posting_ids = load('posting_ids.npy')
+        self.posting_labels = load('posting_labels.npy')
+        self.post_labels = load('post_labels.npy')
+        self.text_offsets = load('text_offsets.npy')
+        self._texts = open(os.path.join(path, 'texts.bin'), 'rb')
+        self._texts_lock = threading.Lock()
+        self._all_counts = np.bincount(self.post_labels & LABEL_MASK, minlength=len(LABELS))
+        self._all_duplicates = int(np.count_nonzero(self.post_labels & DUPLICATE))
+
+    @classmethod
+    def open_or_build(cls, path, sources, score, deduplicator=None):
+        """Open the index at path, (re)building it first if it is missing or its sources changed"""
+        try:
+            index = cls(path)
+            if index.meta['sources'] == source_signature(sources):
+                return index
+            index.close()
+        except (OSError, ValueError, KeyError):
+            pass
+        return build_index(sources, path, score, deduplicator)
+
+    def __len__(self):
+        return self.meta['posts']
+
+    def postings(self, term):
+        """(post IDs, labels) for one term; empty arrays if it is not indexed"""
+        i = int(np.searchsorted(self.terms, term))
+        if i < len(self.terms) and self.terms[i] == term:
+            start, end = self.term_offsets[i], self.term_offsets[i + 1]
+            return self.posting_ids[start:end], self.posting_labels[start:end]
+        return self.posting_ids[:0], self.posting_labels[:0]
+
+    def text(self, post_id):
+        start, end = int(self.text_offsets[post_id]), int(self.text_offsets[post_id + 1])
+        with self._texts_lock:
+            self._texts.seek(start)
+            return self._texts.read(end - start).decode('utf-8')
+
+    def search(self, keyword, sample_size=5):
+        """
+        Posts containing every term of keyword (an empty keyword matches all posts; one with no
+        indexable terms, such as '!!!', matches none)
+        Returns ({'positive': n, 'negative': n, 'neutral': n, 'duplicates': n}, samples), where
+        samples are (text, label) pairs preferring posts that are not near-duplicates
+        Postings are intersected starting from the shortest list, each step a binary search
+        of the current candidates in the next list
+        """
+        terms = tokenize(keyword)
+        if not terms and keyword.strip():
+            counts, duplicates = np.zeros(len(LABELS), dtype=np.int64), 0
+            head_ids = head_labels = np.zeros(0, dtype=np.uint8)
+        elif not terms:
+            counts, duplicates = self._all_counts, self._all_duplicates
+            head_ids = np.arange(min(sample_size * 20, len(self)))
+            head_labels = self.post_labels[:head_ids.size]
+        else:
+            lists = sorted((self.postings(term) for term in terms), key=lambda p: len(p[0]))
+            ids, labels = lists[0]
+            for other_ids, _ in lists[1:]:
+                if ids.size == 0:
+                    break
+                positions = np.searchsorted(other_ids, ids)
+                found = positions < other_ids.size
+                found[found] = other_ids[positions[found]] == ids[found]
+                ids, labels = ids[found], labels[found]
+            counts = np.bincount(labels & LABEL_MASK, minlength=len(LABELS))
+            duplicates = int(np.count_nonzero(labels & DUPLICATE))
+            head_ids, head_labels = ids[:sample_size * 20], labels[:sample_size * 20]
+
+        # Originals first, so five retweets of one post don't fill the samples
+        order = np.argsort(head_labels & DUPLICATE, kind='stable')[:sample_size]
+        samples = [(self.text(int(head_ids[i])), LABELS[head_labels[i] & LABEL_MASK]) for i in order]
+        result = {label: int(counts[code]) for code, label in enumerate(LABELS)}
+        result['duplicates'] = duplicates
+        return result, samples
+
+    def stats(self):
+        return {k: self.meta[k] for k in ('posts', 'terms', 'postings', 'built_at')}
+
+    def close(self):
+        self._texts.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build or query the post index")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="Ingest CSV/JSONL files into an index directory")
+    build.add_argument('index')
+    build.add_argument('sources', nargs='+')
+    dedup = build.add_mutually_exclusive_group()
+    dedup.add_argument('--dedup', action='store_true', help="Score near-duplicates once, whatever the engine")
+    dedup.add_argument('--no-dedup', action='store_true', help="Score every post, even near-duplicates")
+    query = commands.add_parser('query', help="Keyword sentiment from an index")
+    query.add_argument('index')
+    query.add_argument('keyword')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        from sentiment_engine import load_engine
+
+        started = time.perf_counter()
+        engine = load_engine()
+        # By default only engines slower than MinHash fingerprinting collapse duplicates
+        dedup = args.dedup or (engine.dedup_by_default and not args.no_dedup)
+        index = build_index(args.sources, args.index, engine.predict, Deduplicator() if dedup else None)
+        print(f"Indexed {len(index):,} posts, {index.meta['terms']:,} terms in {time.perf_counter() - started:.1f}s")
+    else:
+        index = PostIndex(args.index)
+        started = time.perf_counter()
+        counts, samples = index.search(args.keyword)
+        print(f"{counts} in {(time.perf_counter() - started) * 1000:.2f} ms")
+        for text, label in samples:
+            print(f"  [{label}] {text}")
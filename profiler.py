@@ -0,0 +1,103 @@
+# Sampling profiler for individual backend requests
+# While a request runs, a background thread snapshots the stacks of the request thread and
+# the inference workers every `interval` seconds with sys._current_frames() and counts
+# identical stacks. Nothing is hooked into the interpreter, so code runs at full speed
+# between samples. Profiles use the "collapsed" format (one "frame;frame;frame count" line
+# per distinct stack), which flamegraph.pl and speedscope read directly
+
+from collections import Counter, OrderedDict
+import itertools
+import os
+import sys
+import threading
+import time
+
+class SamplingProfiler:
+    """
+    Samples the stacks of thread_ids, plus any thread whose name starts with one of
+    thread_prefixes (e.g. the inference pool, which serves other requests too)
+    """
+
+    def __init__(self, thread_ids, thread_prefixes=(), interval=0.005):
+        self.thread_ids = set(thread_ids)
+        self.thread_prefixes = tuple(thread_prefixes)
+        self.interval = interval
+        self.samples = 0
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self
+
+    def _targets(self):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        targets = {ident: names.get(ident, str(ident)) for ident in self.thread_ids}
+        if self.thread_prefixes:
+            targets.update({ident: name for ident, name in names.items() if name.startswith(self.thread_prefixes)})
+        return targets
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            targets = self._targets()
+            frames = sys._current_frames()
+            for ident, name in targets.items():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(name)
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        """The profile in collapsed-stack format, most frequent stacks first"""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+class ProfileStore:
+    """The most recent finished profiles, by ID"""
+
+    def __init__(self, max_profiles=20):
+        self.max_profiles = max_profiles
+        self._profiles = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, endpoint, profiler):
+        with self._lock:
+            profile_id = str(next(self._ids))
+            self._profiles[profile_id] = {
+                'id': profile_id,
+                'endpoint': endpoint,
+                'time': time.time(),
+                'duration_ms': round(profiler.duration * 1000, 2),
+                'samples': profiler.samples,
+                'collapsed': profiler.collapsed()
+            }
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+            return profile_id
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self):
+        """Profile summaries, newest first, without the stacks"""
+        with self._lock:
+            return [
+                {k: v for k, v in profile.items() if k != 'collapsed'}
+                for profile in reversed(self._profiles.values())
+            ]
@@ -0,0 +1,144 @@
+# Rotating JSON Lines log of API requests, for replaying real traffic offline
+# The backend appends one entry per captured request (arrival time, endpoint, payload, latency,
+# status, response size). Entries are queued and written by a background thread, so a slow disk
+# never adds to a request's latency; when the queue is full they are dropped and counted.
+# Once the file passes max_bytes it becomes <path>.1 (gzip-compressed to <path>.1.gz with
+# compress=True), older files move up one number and those past `backups` are deleted.
+# benchmarks/replay.py reads the live file and its rotated, compressed siblings alike
+
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+
+class RequestLog:
+    """
+    Append-only request log with size-based rotation
+    A '{pid}' in path is replaced with the process id, so worker processes of one server
+    each write their own file instead of interleaving (and rotating) a shared one
+    """
+
+    def __init__(self, path, max_bytes=100 * 2**20, backups=5, compress=False, max_pending=10000,
+                 flush_interval=1.0):
+        self.path = path.replace('{pid}', str(os.getpid()))
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.compress = compress
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self.last_error = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name='request-log', daemon=True)
+
+    def start(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._thread.start()
+        return self
+
+    def append(self, entry):
+        """Queue one entry (a JSON-serializable dict); never blocks"""
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def close(self, timeout=5.0):
+        """Write out what is queued and stop the writer thread"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            try:
+                entry = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            entries = [entry]
+            # Write whatever else is waiting in the same go, then flush once
+            while len(entries) < 1000:
+                try:
+                    entries.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in entries
+            try:
+                self._write([entry for entry in entries if entry is not None])
+                self.last_error = None
+            except Exception as e:
+                # Full disk, deleted directory...: lose this batch but keep capturing
+                self.last_error = str(e)
+                self._close_file()
+            if stop:
+                self._close_file()
+                return
+
+    def _write(self, entries):
+        if not entries:
+            return
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in entries))
+        self._file.flush()
+        with self._lock:
+            self.written += len(entries)
+        if self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def _rotate(self):
+        self._close_file()
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for number in range(self.backups, 0, -1):
+            for suffix in ('', '.gz'):
+                name = f'{self.path}.{number}{suffix}'
+                if not os.path.exists(name):
+                    continue
+                if number == self.backups:
+                    os.remove(name)
+                else:
+                    os.replace(name, f'{self.path}.{number + 1}{suffix}')
+        os.replace(self.path, f'{self.path}.1')
+        if self.compress:
+            with open(f'{self.path}.1', 'rb') as source, gzip.open(f'{self.path}.1.gz.tmp', 'wb') as target:
+                shutil.copyfileobj(source, target)
+            os.replace(f'{self.path}.1.gz.tmp', f'{self.path}.1.gz')
+            os.remove(f'{self.path}.1')
+        with self._lock:
+            self.rotations += 1
+
+    def stats(self):
+        """Entries written and dropped, rotations and queue depth, for /health"""
+        with self._lock:
+            return {
+                'path': self.path,
+                'written': self.written,
+                'dropped': self.dropped,
+                'pending': self._queue.qsize(),
+                'rotations': self.rotations,
+                'last_error': self.last_error
+            }
+
+def open_log(path):
+    """Text-mode reader for a request log, gzip-compressed or not"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
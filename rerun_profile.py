@@ -0,0 +1,96 @@
+# Stage timing for one Streamlit rerun, shown by the dashboard's performance panel
+# Each timed block becomes a span with a stage (network, parse, compute, figure, render)
+# and a label. Blocks that repeat within a rerun (one request per CSV chunk, say) are
+# merged into one span that records how often it ran and its total busy time. Time that no
+# span covers (imports, widget code, Streamlit's own rerun work) is reported as 'other'
+
+from contextlib import contextmanager, nullcontext
+import threading
+import time
+
+STAGES = ['network', 'parse', 'compute', 'figure', 'render']
+
+class RerunProfile:
+    """Spans of one rerun; thread-safe, so pool workers can record their requests too"""
+
+    def __init__(self, started=None):
+        self.started = time.perf_counter() if started is None else started
+        self._spans = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, stage, label):
+        """Time a block; yields a dict whose 'detail' key may be set to annotate the span"""
+        info = {}
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            self.add(stage, label, start, time.perf_counter(), info.get('detail'))
+
+    def add(self, stage, label, start, end, detail=None):
+        """Record a block that ran from start to end (perf_counter seconds)"""
+        with self._lock:
+            span = self._spans.get((stage, label))
+            if span is None:
+                self._spans[(stage, label)] = {
+                    'stage': stage, 'label': label, 'start': start - self.started, 'end': end - self.started,
+                    'busy': end - start, 'count': 1, 'detail': detail, 'intervals': [(start, end)]
+                }
+            else:
+                span['end'] = max(span['end'], end - self.started)
+                span['busy'] += end - start
+                span['count'] += 1
+                span['detail'] = detail or span['detail']
+                span['intervals'].append((start, end))
+
+    def spans(self):
+        """Spans in start order, without their raw intervals"""
+        with self._lock:
+            spans = [{k: v for k, v in span.items() if k != 'intervals'} for span in self._spans.values()]
+        return sorted(spans, key=lambda span: span['start'])
+
+    def summary(self, ended=None):
+        """
+        Seconds per stage for the rerun so far, plus 'total' and 'other'. Stage totals are busy
+        time, so concurrent requests can add up to more than the wall time they took
+        """
+        ended = time.perf_counter() if ended is None else ended
+        with self._lock:
+            intervals = sorted(interval for span in self._spans.values() for interval in span['intervals'])
+            totals = {stage: 0.0 for stage in STAGES}
+            for span in self._spans.values():
+                totals[span['stage']] = totals.get(span['stage'], 0.0) + span['busy']
+
+        # Wall time covered by at least one span
+        covered = 0.0
+        current_start = current_end = None
+        for start, end in intervals:
+            if current_end is None or start > current_end:
+                if current_end is not None:
+                    covered += current_end - current_start
+                current_start, current_end = start, end
+            else:
+                current_end = max(current_end, end)
+        if current_end is not None:
+            covered += current_end - current_start
+
+        total = ended - self.started
+        return {**totals, 'other': max(0.0, total - covered), 'total': total}
+
+def span(profile, stage, label):
+    """profile.span(stage, label), or a no-op when profiling is off (profile is None)"""
+    if profile is None:
+        return nullcontext({})
+    return profile.span(stage, label)
+
+def timed_iter(profile, stage, label, iterable):
+    """Yield from iterable, timing each step (e.g. reading the next CSV chunk) as one span"""
+    iterator = iter(iterable)
+    while True:
+        with span(profile, stage, label):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
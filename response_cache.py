@@ -0,0 +1,138 @@
+# Response cache for the Flask backend
+# Keys are built from normalized request payloads, entries expire after a TTL,
+# the in-memory store is a size-bounded LRU, and an optional SQLite file keeps
+# entries across restarts
+
+from collections import OrderedDict
+import json
+import sqlite3
+import threading
+import time
+
+def normalize_text(text):
+    """Case-fold and collapse whitespace so trivially different inputs share a key"""
+    return ' '.join(str(text).casefold().split())
+
+def _normalize(value):
+    if isinstance(value, str):
+        return normalize_text(value)
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    return value
+
+def make_key(endpoint, payload):
+    """Cache key for an endpoint and its JSON payload (text fields plus any options)"""
+    return endpoint + ':' + json.dumps(_normalize(payload), sort_keys=True, separators=(',', ':'))
+
+class ResponseCache:
+    """
+    TTL + LRU cache of JSON-serializable responses
+    max_entries=0 disables caching; path enables the on-disk SQLite backend
+    """
+
+    def __init__(self, max_entries=1024, ttl=300, path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'disk_hits': 0, 'evictions': 0, 'expired': 0}
+        self._db = None
+
+        if path and max_entries > 0:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM response_cache WHERE expires_at <= ?", (time.time(),))
+            # Warm the in-memory LRU from the previous run, oldest first so the newest survive
+            rows = self._db.execute(
+                "SELECT key, value, expires_at FROM response_cache ORDER BY expires_at"
+            ).fetchall()
+            for key, value, expires_at in rows:
+                self._store(key, expires_at, json.loads(value))
+            self._db.commit()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._counters['hits'] += 1
+                    return value
+                del self._entries[key]
+                self._counters['expired'] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    value = json.loads(row[0])
+                    self._store(key, row[1], value)
+                    self._counters['hits'] += 1
+                    self._counters['disk_hits'] += 1
+                    return value
+
+            self._counters['misses'] += 1
+            return None
+
+    def set(self, key, value):
+        """Store a JSON-serializable value under key for ttl seconds"""
+        if not self.enabled:
+            return
+
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, expires_at, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at)
+                )
+                self._db.commit()
+
+    def _store(self, key, expires_at, value):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._counters['evictions'] += 1
+            if self._db is not None:
+                # Keep the disk backend bounded the same way as memory
+                self._db.execute("DELETE FROM response_cache WHERE key = ?", (evicted,))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM response_cache")
+                self._db.commit()
+
+    def stats(self):
+        """Hit/miss counters and current size, for /health"""
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'backend': 'sqlite' if self._db is not None else 'memory',
+                'hit_rate': round(self._counters['hits'] / lookups, 3) if lookups else 0.0,
+                **self._counters
+            }
@@ -0,0 +1,265 @@
+# Offline, CPU-only sentiment engines for the Flask backend
+# Every engine scores a whole list of texts in one call; the default lexicon engine does
+# it with a single regex pass and NumPy array operations instead of a loop per text
+#
+# Usage (quick throughput check):
+#   python sentiment_engine.py --engine lexicon --texts 100000
+
+from collections import defaultdict
+import argparse
+import itertools
+import json
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+LABELS = np.array(['negative', 'neutral', 'positive'])
+
+# Default lexicon: word -> polarity weight
+DEFAULT_LEXICON = {
+    # positive
+    'good': 1.0, 'great': 1.5, 'love': 2.0, 'loved': 2.0, 'loving': 1.5, 'amazing': 2.0, 'awesome': 2.0,
+    'excellent': 2.0, 'happy': 1.5, 'glad': 1.0, 'exciting': 1.5, 'excited': 1.5, 'progress': 1.0,
+    'best': 1.5, 'better': 1.0, 'wonderful': 2.0, 'perfect': 1.5, 'positive': 1.0, 'win': 1.0,
+    'wins': 1.0, 'winning': 1.0, 'success': 1.5, 'successful': 1.5, 'beautiful': 1.5, 'nice': 1.0,
+    'fantastic': 2.0, 'brilliant': 2.0, 'incredible': 1.5, 'hope': 0.5, 'hopeful': 1.0, 'proud': 1.5,
+    'thanks': 1.0, 'thank': 1.0, 'enjoy': 1.0, 'enjoyed': 1.0, 'fun': 1.0, 'helpful': 1.0,
+    'improve': 1.0, 'improved': 1.0, 'improving': 1.0, 'support': 0.5, 'safe': 0.5, 'strong': 0.5,
+    'breakthrough': 1.5, 'celebrate': 1.5, 'delighted': 2.0, 'impressive': 1.5, 'innovative': 1.0,
+    # negative
+    'bad': -1.0, 'terrible': -2.0, 'hate': -2.0, 'hated': -2.0, 'awful': -2.0, 'worse': -1.5,
+    'worst': -2.0, 'sad': -1.5, 'concerning': -1.0, 'concerned': -1.0, 'angry': -1.5, 'negative': -1.0,
+    'fail': -1.5, 'failed': -1.5, 'failure': -1.5, 'crisis': -1.5, 'problem': -1.0, 'problems': -1.0,
+    'disappointing': -1.5, 'disappointed': -1.5, 'wrong': -1.0, 'scary': -1.5, 'horrible': -2.0,
+    'disaster': -2.0, 'danger': -1.5, 'dangerous': -1.5, 'fear': -1.5, 'afraid': -1.5, 'worried': -1.0,
+    'worry': -1.0, 'poor': -1.0, 'lose': -1.0, 'losing': -1.0, 'lost': -1.0, 'broken': -1.0,
+    'corrupt': -2.0, 'corruption': -2.0, 'scandal': -1.5, 'fake': -1.0, 'lies': -1.5, 'lie': -1.0,
+    'frustrating': -1.5, 'frustrated': -1.5, 'unfair': -1.5, 'useless': -1.5, 'annoying': -1.0,
+    'kill': -2.0, 'killed': -2.0, 'death': -1.5, 'attack': -1.5, 'war': -1.5, 'pollution': -1.0,
+}
+
+# A negator flips the polarity of the word that follows it ("not good")
+NEGATORS = ['not', 'no', 'never', "don't", "doesn't", "didn't", "isn't", "wasn't", "aren't",
+            "can't", "won't", 'cannot', 'nothing', 'nobody', 'hardly', 'without']
+
+def read_lexicon(path):
+    """Read a {word: weight} JSON lexicon"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def lexicon_arrays(lexicon, negators=NEGATORS):
+    """
+    The lexicon as aligned arrays: sorted 'words', their float32 'weights' and boolean
+    'negators' flags (negators the lexicon does not weight get weight 0)
+    """
+    negators = set(negators)
+    words = sorted(set(lexicon) | negators)
+    return {
+        'words': np.array(words, dtype=str),
+        'weights': np.array([lexicon.get(word, 0.0) for word in words], dtype=np.float32),
+        'negators': np.array([word in negators for word in words], dtype=bool)
+    }
+
+class SentimentEngine:
+    """
+    Base interface: subclasses implement score(texts) returning one polarity per text
+    predict() turns polarities into labels and keeps throughput counters
+    """
+
+    name = 'base'
+    # |polarity| at or below this is neutral
+    neutral_threshold = 0.0
+    # Whether near-duplicates are collapsed before scoring by default: only worth it when
+    # scoring a text costs more than fingerprinting it (see dedup.py)
+    dedup_by_default = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._texts = 0
+        self._seconds = 0.0
+        self._last_rate = 0.0
+
+    def score(self, texts):
+        """Return a float array of polarities, one per text (> 0 positive, < 0 negative)"""
+        raise NotImplementedError
+
+    def classify(self, texts):
+        """
+        Return (codes, scores): int8 indexes into LABELS and float32 polarities, one per text
+        The compact form of predict(), for callers that pack results into arrays
+        """
+        started = time.perf_counter()
+        scores = np.asarray(self.score(texts), dtype=np.float64)
+        codes = (scores > self.neutral_threshold).astype(np.int8) - (scores < -self.neutral_threshold) + 1
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._texts += len(scores)
+            self._seconds += elapsed
+            if elapsed > 0:
+                self._last_rate = len(scores) / elapsed
+        return codes.astype(np.int8), scores.astype(np.float32)
+
+    def predict(self, texts):
+        """Return a numpy array with one 'positive'/'negative'/'neutral' label per text"""
+        return LABELS[self.classify(texts)[0]]
+
+    def stats(self):
+        """Engine name and throughput in texts/sec"""
+        with self._lock:
+            return {
+                'engine': self.name,
+                'texts_scored': self._texts,
+                'texts_per_sec': round(self._texts / self._seconds, 1) if self._seconds else 0.0,
+                'last_batch_texts_per_sec': round(self._last_rate, 1)
+            }
+
+class LexiconEngine(SentimentEngine):
+    """
+    Weighted lexicon scorer with negation handling
+    Tokens of all texts form one sparse (texts x vocabulary) matrix in coordinate form,
+    which is multiplied by the weight vector with np.bincount
+    """
+
+    name = 'lexicon'
+    token_pattern = re.compile(r"[a-z']+|\x00")
+
+    def __init__(self, lexicon=None, negators=NEGATORS, arrays=None):
+        super().__init__()
+        if arrays is None:
+            arrays = lexicon_arrays(lexicon if lexicon is not None else DEFAULT_LEXICON, negators)
+        # Aligned arrays (possibly memory-mapped): sorted words, their weights, negator flags
+        self.words = arrays['words']
+        self.weights = arrays['weights']
+        self.is_negator = arrays['negators']
+        # Characters in the longest lexicon word (width of the fixed-width words array)
+        self.longest_word = self.words.dtype.itemsize // 4 if self.words.dtype.kind == 'U' else 0
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a {word: weight} JSON lexicon"""
+        return cls(read_lexicon(path))
+
+    def stats(self):
+        return {
+            **super().stats(),
+            'vocabulary': int(self.words.size),
+            'memory_mapped': isinstance(self.words, np.memmap)
+        }
+
+    def score(self, texts):
+        n = len(texts)
+        if n == 0:
+            return np.zeros(0)
+
+        # One regex pass over all texts; \x00 separators mark where each text ends
+        joined = '\x00'.join(str(text).replace('\x00', ' ') for text in texts).lower()
+        matches = self.token_pattern.findall(joined)
+        if not matches:
+            return np.zeros(n)
+
+        # Number distinct tokens in order of appearance (separator first, id 0) and keep ids
+        # per occurrence; only the distinct tokens become a string array, so a huge "word"
+        # costs its own length once rather than widening every element of a fixed-width array
+        ids = defaultdict(itertools.count().__next__)
+        ids['\x00']
+        token_ids = np.fromiter(map(ids.__getitem__, matches), dtype=np.int64, count=len(matches))
+        is_separator = token_ids == 0
+        row_ids = np.cumsum(is_separator)[~is_separator]
+        columns = token_ids[~is_separator]
+        if columns.size == 0 or self.words.size == 0:
+            return np.zeros(n)
+
+        # Look up each distinct token once rather than every occurrence, by binary search
+        # in the sorted lexicon words; tokens longer than any lexicon word cannot match
+        vocabulary = np.array([token if len(token) <= self.longest_word else '' for token in ids])
+        positions = np.minimum(np.searchsorted(self.words, vocabulary), self.words.size - 1)
+        found = self.words[positions] == vocabulary
+        vocab_weights = np.where(found, self.weights[positions], 0).astype(np.float32)
+        vocab_negators = found & self.is_negator[positions]
+        weights = vocab_weights[columns]
+
+        # Flip the weight of a token that directly follows a negator in the same text
+        negated = np.zeros(columns.size, dtype=bool)
+        negated[1:] = vocab_negators[columns[:-1]] & (row_ids[1:] == row_ids[:-1])
+        weights[negated] *= -1
+
+        return np.bincount(row_ids, weights=weights, minlength=n)
+
+class TransformerEngine(SentimentEngine):
+    """
+    Optional heavier engine: a Hugging Face sentiment model on CPU
+    Requires `pip install transformers torch` and the model weights available locally
+    """
+
+    name = 'transformer'
+    neutral_threshold = 0.6
+    dedup_by_default = True
+
+    def __init__(self, model=None, batch_size=64):
+        super().__init__()
+        try:
+            from transformers import pipeline
+        except ImportError as e:
+            raise ImportError("The 'transformer' engine needs: pip install transformers torch") from e
+        self.pipeline = pipeline(
+            'sentiment-analysis',
+            model=model or os.environ.get('SENTIMENT_MODEL', 'distilbert-base-uncased-finetuned-sst-2-english'),
+            device=-1
+        )
+        self.batch_size = batch_size
+
+    def score(self, texts):
+        results = self.pipeline([str(text) for text in texts], batch_size=self.batch_size, truncation=True)
+        return np.array([
+            r['score'] if r['label'].upper().startswith('POS') else -r['score']
+            for r in results
+        ])
+
+ENGINES = {
+    'lexicon': LexiconEngine,
+    'transformer': TransformerEngine,
+}
+
+def load_engine(name=None, artifacts=None):
+    """
+    Build the engine named by `name` or SENTIMENT_ENGINE (default: lexicon)
+    Given an ArtifactStore (model_registry.py), the lexicon engine memory-maps its arrays
+    from it, so every process using the same store shares one copy
+    """
+    name = name or os.environ.get('SENTIMENT_ENGINE', 'lexicon')
+    if name not in ENGINES:
+        raise ValueError(f"Unknown sentiment engine '{name}', choose from {sorted(ENGINES)}")
+    if name != 'lexicon':
+        return ENGINES[name]()
+
+    path = os.environ.get('SENTIMENT_LEXICON_PATH')
+    if artifacts is None:
+        return LexiconEngine.from_file(path) if path else LexiconEngine()
+    if path:
+        # Identified by file metadata, so only the process that builds the artifact parses the JSON
+        stat = os.stat(path)
+        key = ['file', os.path.abspath(path), stat.st_mtime_ns, stat.st_size, NEGATORS]
+        arrays = artifacts.load_or_build('sentiment-lexicon', key, lambda: lexicon_arrays(read_lexicon(path)))
+    else:
+        key = ['default', sorted(DEFAULT_LEXICON.items()), NEGATORS]
+        arrays = artifacts.load_or_build('sentiment-lexicon', key, lambda: lexicon_arrays(DEFAULT_LEXICON))
+    return LexiconEngine(arrays=arrays)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure sentiment engine throughput")
+    parser.add_argument('--engine', default=None, help="lexicon (default) or transformer")
+    parser.add_argument('--texts', type=int, default=100000, help="Number of synthetic texts to score")
+    args = parser.parse_args()
+
+    engine = load_engine(args.engine)
+    words = list(DEFAULT_LEXICON) + ['the', 'a', 'news', 'today', 'people', 'not', 'really', 'about']
+    rng = np.random.default_rng(0)
+    texts = [' '.join(rng.choice(words, size=15)) for _ in range(args.texts)]
+
+    labels = engine.predict(texts)
+    counts = {str(label): int((labels == label).sum()) for label in LABELS}
+    print(f"{engine.name}: {engine.stats()['texts_per_sec']:,.0f} texts/sec over {len(texts):,} texts {counts}")
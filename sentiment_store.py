@@ -0,0 +1,344 @@
+# Time-bucketed sentiment aggregation store for the Flask backend
+# Per-keyword positive/negative/neutral counts are kept in SQLite at minute, hour and day
+# granularity. Every write updates all three rollups, so a window such as "the last 7 days"
+# is answered from a handful of indexed range lookups instead of a rescan of the posts.
+
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from live_source import CsvTail
+from post_index import tokenize
+
+# Bucket sizes in seconds
+GRANULARITIES = {'minute': 60, 'hour': 3600, 'day': 86400}
+
+# How long each granularity is kept (None = forever); older windows use coarser buckets
+RETENTION = {'minute': 2 * 86400, 'hour': 90 * 86400, 'day': None}
+
+# series() picks the finest granularity that stays within this many buckets
+MAX_SERIES_BUCKETS = 400
+
+# Keyword under which every post is counted
+ALL_POSTS = '*'
+
+SENTIMENTS = ['positive', 'negative', 'neutral']
+
+def normalize_keyword(keyword):
+    return ' '.join(str(keyword).lower().split()) or ALL_POSTS
+
+def counts_summary(positive, negative, neutral):
+    """/sentiment style totals and percentages for a set of counts"""
+    total = positive + negative + neutral
+    return {
+        "total_tweets": total,
+        "positive": positive,
+        "negative": negative,
+        "neutral": neutral,
+        "positive_pct": round((positive / total) * 100, 1) if total else 0.0,
+        "negative_pct": round((negative / total) * 100, 1) if total else 0.0,
+        "neutral_pct": round((neutral / total) * 100, 1) if total else 0.0
+    }
+
+def parse_times(values, default):
+    """Unix seconds for raw time column values (Unix seconds or ISO 8601); others become default"""
+    # Imported here so importing the backend does not load pandas (see ingest.py)
+    import pandas as pd
+    values = pd.Series(values, dtype=object)
+    seconds = pd.to_numeric(values, errors='coerce')
+    missing = seconds.isna()
+    if missing.any():
+        parsed = pd.to_datetime(values[missing], utc=True, errors='coerce', format='ISO8601')
+        seconds[missing] = (parsed - pd.Timestamp(0, tz='UTC')).dt.total_seconds()
+    return seconds.fillna(default).to_numpy(dtype=np.float64)
+
+def _floor(ts, size):
+    return int(ts // size * size)
+
+def _ceil(ts, size):
+    return -_floor(-ts, size)
+
+def _tile(start, end, sizes):
+    """Cover [start, end) with aligned buckets: largest size in the middle, smaller at the edges"""
+    if start >= end or not sizes:
+        return []
+    size, finer = sizes[0], sizes[1:]
+    lo, hi = _ceil(start, size), _floor(end, size)
+    if lo >= hi:
+        return _tile(start, end, finer)
+    return _tile(start, lo, finer) + [(size, lo, hi)] + _tile(hi, end, finer)
+
+class SentimentStore:
+    """
+    SQLite-backed per-keyword sentiment counts with minute/hour/day rollups
+    Rows are keyed (keyword, granularity, bucket start), which is also the table's
+    clustered primary key, so window queries are range scans on that index
+    """
+
+    def __init__(self, path, retention=RETENTION, max_keywords=200):
+        self.path = path
+        self.retention = retention
+        self.max_keywords = max_keywords
+        self._lock = threading.Lock()
+        # Autocommit mode; writes use explicit BEGIN IMMEDIATE transactions
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sentiment_rollups ("
+            "keyword TEXT NOT NULL, granularity INTEGER NOT NULL, bucket INTEGER NOT NULL, "
+            "positive INTEGER NOT NULL, negative INTEGER NOT NULL, neutral INTEGER NOT NULL, "
+            "PRIMARY KEY (keyword, granularity, bucket)) WITHOUT ROWID"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tracked_keywords (keyword TEXT PRIMARY KEY, since REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS ingest_offsets "
+            "(source TEXT PRIMARY KEY, inode INTEGER NOT NULL, offset INTEGER NOT NULL)"
+        )
+        self._tracked = {}
+        self.track(ALL_POSTS)
+
+    def tracked(self):
+        """{keyword: time tracking started}, re-read so keywords added by other processes appear"""
+        with self._lock:
+            self._tracked = dict(self._db.execute("SELECT keyword, since FROM tracked_keywords"))
+            return dict(self._tracked)
+
+    def track(self, keyword):
+        """Start counting posts that mention keyword; returns False once max_keywords are tracked"""
+        keyword = normalize_keyword(keyword)
+        with self._lock:
+            if keyword in self._tracked:
+                return True
+            self._tracked = dict(self._db.execute("SELECT keyword, since FROM tracked_keywords"))
+            if keyword in self._tracked:
+                return True
+            if len(self._tracked) >= self.max_keywords:
+                return False
+            self._db.execute(
+                "INSERT OR IGNORE INTO tracked_keywords (keyword, since) VALUES (?, ?)", (keyword, time.time())
+            )
+            self._tracked[keyword] = time.time()
+            return True
+
+    def ingest_offset(self, source):
+        """(inode, byte offset) recorded for a source by the last successful record(), or None"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT inode, offset FROM ingest_offsets WHERE source = ?", (source,)
+            ).fetchone()
+
+    def record(self, rows, source=None, inode=None, start_offset=None, end_offset=None):
+        """
+        Add (keyword, unix_time, sentiment) rows to every rollup in one transaction
+        With source given, the rows are the records between start_offset and end_offset of that
+        file; they are only written if the stored offset still equals start_offset, so two
+        readers of the same file can never count a record twice. Returns False if skipped.
+        """
+        deltas = {}
+        for keyword, ts, sentiment in rows:
+            column = SENTIMENTS.index(sentiment)
+            for size in GRANULARITIES.values():
+                counts = deltas.setdefault((keyword, size, _floor(ts, size)), [0, 0, 0])
+                counts[column] += 1
+
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if source is not None:
+                    stored = self._db.execute(
+                        "SELECT inode, offset FROM ingest_offsets WHERE source = ?", (source,)
+                    ).fetchone()
+                    if stored is not None and stored[0] == inode and stored[1] != start_offset:
+                        self._db.execute("ROLLBACK")
+                        return False
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO ingest_offsets (source, inode, offset) VALUES (?, ?, ?)",
+                        (source, inode, end_offset)
+                    )
+                self._db.executemany(
+                    "INSERT INTO sentiment_rollups VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (keyword, granularity, bucket) DO UPDATE SET "
+                    "positive = positive + excluded.positive, negative = negative + excluded.negative, "
+                    "neutral = neutral + excluded.neutral",
+                    [(k, size, bucket, *counts) for (k, size, bucket), counts in deltas.items()]
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return True
+
+    def _finest(self, since, now):
+        """Smallest bucket size whose retention still reaches back to since"""
+        for name, size in GRANULARITIES.items():
+            keep = self.retention.get(name)
+            if keep is None or since >= now - keep:
+                return size
+        return max(GRANULARITIES.values())
+
+    def summary(self, keyword, since, until=None):
+        """
+        Counts for keyword in [since, until), at the finest resolution still retained
+        The window is tiled with day buckets in the middle and hour/minute buckets at the
+        edges, so any window costs at most five indexed range sums
+        """
+        now = time.time()
+        until = now if until is None else until
+        finest = self._finest(since, now)
+        sizes = sorted((s for s in GRANULARITIES.values() if s >= finest), reverse=True)
+        totals = [0, 0, 0]
+        with self._lock:
+            for size, lo, hi in _tile(_floor(since, finest), _ceil(until, finest), sizes):
+                row = self._db.execute(
+                    "SELECT COALESCE(SUM(positive), 0), COALESCE(SUM(negative), 0), COALESCE(SUM(neutral), 0) "
+                    "FROM sentiment_rollups WHERE keyword = ? AND granularity = ? AND bucket >= ? AND bucket < ?",
+                    (normalize_keyword(keyword), size, lo, hi)
+                ).fetchone()
+                totals = [t + c for t, c in zip(totals, row)]
+        return counts_summary(*totals)
+
+    def series(self, keyword, since, until=None, granularity=None):
+        """
+        Per-bucket counts for keyword in [since, until) as (granularity name, buckets)
+        Buckets are {"start", "positive", "negative", "neutral"}, with empty buckets zero-filled.
+        granularity defaults to the finest one giving at most MAX_SERIES_BUCKETS buckets
+        """
+        now = time.time()
+        until = now if until is None else until
+        if granularity is None:
+            granularity = next(
+                (name for name, size in GRANULARITIES.items() if (until - since) / size <= MAX_SERIES_BUCKETS),
+                'day'
+            )
+        size = max(GRANULARITIES[granularity], self._finest(since, now))
+        granularity = next(name for name, s in GRANULARITIES.items() if s == size)
+
+        first, end = _floor(since, size), _ceil(until, size)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT bucket, positive, negative, neutral FROM sentiment_rollups "
+                "WHERE keyword = ? AND granularity = ? AND bucket >= ? AND bucket < ? ORDER BY bucket",
+                (normalize_keyword(keyword), size, first, end)
+            ).fetchall()
+        found = {bucket: counts for bucket, *counts in rows}
+        return granularity, [
+            {"start": bucket, **dict(zip(SENTIMENTS, found.get(bucket, (0, 0, 0))))}
+            for bucket in range(first, end, size)
+        ]
+
+    def prune(self, now=None):
+        """Drop buckets older than their granularity's retention"""
+        now = time.time() if now is None else now
+        with self._lock:
+            for name, size in GRANULARITIES.items():
+                keep = self.retention.get(name)
+                if keep is not None:
+                    self._db.execute(
+                        "DELETE FROM sentiment_rollups WHERE granularity = ? AND bucket < ?", (size, now - keep)
+                    )
+
+    def stats(self):
+        """Row counts per granularity and the number of tracked keywords, for /health"""
+        with self._lock:
+            rows = dict(self._db.execute(
+                "SELECT granularity, COUNT(*) FROM sentiment_rollups GROUP BY granularity"
+            ))
+            return {
+                'path': self.path,
+                'tracked_keywords': len(self._tracked),
+                'buckets': {name: rows.get(size, 0) for name, size in GRANULARITIES.items()}
+            }
+
+class SentimentTracker:
+    """
+    Background ingestion of a post source into a SentimentStore
+    Tails the CSV at path, scores new posts with score(texts), and records each post under
+    ALL_POSTS and every tracked keyword whose words it all contains, matched on whole words
+    like the post index behind /sentiment. The file offset is committed together
+    with the counts, so a restart resumes where it stopped and posts are never counted twice.
+    Posts are bucketed by the source's time column when it has one, otherwise by arrival time.
+    """
+
+    def __init__(self, store, path, score, interval=1.0, prune_every=3600):
+        self.store = store
+        self.path = path
+        self.score = score
+        self.interval = interval
+        self.prune_every = prune_every
+        self.posts = 0
+        self.last_error = None
+        self._tail = None
+        self._last_prune = 0.0
+        self._thread = threading.Thread(target=self._run, name='sentiment-tracker', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            try:
+                if not self.poll():
+                    time.sleep(self.interval)
+                self.last_error = None
+            except Exception as e:
+                # Missing source, full queue, locked database...: keep the thread alive and retry
+                self.last_error = str(e)
+                time.sleep(self.interval)
+
+    def _open(self):
+        tail = CsvTail(self.path, replay=True)
+        stored = self.store.ingest_offset(self.path)
+        if stored is not None and stored[0] == tail.inode:
+            tail.seek(stored[1])
+        return tail
+
+    def poll(self):
+        """Ingest the records written since the last poll; returns how many were read"""
+        if self._tail is None:
+            self._tail = self._open()
+        if time.time() - self._last_prune >= self.prune_every:
+            self.store.prune()
+            self._last_prune = time.time()
+
+        tail = self._tail
+        start = tail.offset
+        records = tail.read_records()
+        if not records:
+            return 0
+        try:
+            texts = [text for text, _ in records]
+            labels = self.score(texts)
+        except BaseException:
+            # Re-read these records on the next poll
+            tail.seek(start)
+            raise
+        times = parse_times([raw for _, raw in records], default=time.time())
+
+        rows = [(ALL_POSTS, ts, str(label)) for ts, label in zip(times, labels)]
+        post_terms = None
+        for keyword in self.store.tracked():
+            terms = set(tokenize(keyword))
+            # A keyword without indexable words ('!!!') matches no post, as in PostIndex.search
+            if keyword == ALL_POSTS or not terms:
+                continue
+            if post_terms is None:
+                post_terms = [set(tokenize(text)) for text in texts]
+            rows.extend(
+                (keyword, ts, str(label))
+                for words, ts, label in zip(post_terms, times, labels) if terms <= words
+            )
+
+        if self.store.record(rows, self.path, tail.inode, start, tail.offset):
+            self.posts += len(records)
+        else:
+            # Another process already counted these records; continue from its offset
+            tail.seek(self.store.ingest_offset(self.path)[1])
+        return len(records)
+
+    def stats(self):
+        return {'source': self.path, 'posts_ingested': self.posts, 'last_error': self.last_error}
@@ -0,0 +1,67 @@
+# Bounded inference executor for the Flask backend
+# Model calls run on a fixed pool of worker threads; once every worker is busy and the
+# wait queue is full, new work is rejected straight away so the API can answer 429
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import threading
+
+class Overloaded(Exception):
+    """Raised when the inference queue is full; retry_after is a hint in seconds"""
+
+    def __init__(self, retry_after=1):
+        super().__init__("Inference queue is full")
+        self.retry_after = retry_after
+
+class InferenceExecutor:
+    """
+    Thread pool with a hard cap of max_workers running plus max_queue waiting tasks
+    submit() never blocks: it either schedules the task or raises Overloaded
+    """
+
+    def __init__(self, max_workers=4, max_queue=16, retry_after=1, timeout=None):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='inference')
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule fn(*args, **kwargs) and return its Future, or raise Overloaded"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise Overloaded(self.retry_after)
+
+        with self._lock:
+            self._pending += 1
+        future = self._pool.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+        self._slots.release()
+
+    def run(self, fn, *args, **kwargs):
+        """Run fn on the pool and wait for its result, at most timeout seconds (None = no limit)"""
+        try:
+            return self.submit(fn, *args, **kwargs).result(self.timeout)
+        except FutureTimeout:
+            raise TimeoutError(f"No result from the inference pool within {self.timeout:g}s") from None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'in_flight': self._pending,
+                'completed': self._completed,
+                'rejected': self._rejected
+            }
@@ -0,0 +1,110 @@
+# Streaming term-frequency engine for the Word Cloud tab
+# Texts are tokenized chunk by chunk in a single regex pass and folded into one running
+# counter, so the counts can be kept between reruns and extended as new chunks arrive
+# With a process pool, chunks are tokenized and counted in worker processes and only the
+# per-chunk counters are merged in the calling process
+
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import multiprocessing
+import os
+import re
+
+TOKEN_PATTERN = re.compile(r"\w[\w']+")
+
+# Worker processes used for counting (WORDCLOUD_WORKERS=1 keeps everything in-process)
+DEFAULT_WORKERS = int(os.environ.get('WORDCLOUD_WORKERS', os.cpu_count() or 1))
+
+def default_stopwords():
+    """wordcloud's stopword list, imported on first use (wordcloud pulls in matplotlib)"""
+    try:
+        from wordcloud import STOPWORDS
+    except ImportError:
+        return set()
+    return STOPWORDS
+
+def count_terms(texts, stopwords):
+    """Tokenize one chunk of texts and return its filtered word counts"""
+    # One regex pass and one C-level count for the whole chunk; filtering then
+    # happens per distinct word instead of per occurrence
+    counts = Counter()
+    for word, count in Counter(TOKEN_PATTERN.findall(' '.join(texts).lower())).items():
+        if word.endswith("'s"):
+            word = word[:-2]
+        if len(word) < 2 or word in stopwords or word.isdigit():
+            continue
+        counts[word] += count
+    return counts
+
+def make_pool(workers=DEFAULT_WORKERS):
+    """
+    Process pool for TermCounter.update_chunks, or None when workers <= 1
+    Workers are spawned rather than forked so they never inherit the caller's threads
+    """
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+class TermCounter:
+    """
+    Running word counts with a stopword filter
+    max_terms bounds memory on huge vocabularies: once the counter holds more than twice
+    that many words, only the max_terms most frequent are kept (approximate for the tail)
+    """
+
+    def __init__(self, stopwords=None, max_terms=None):
+        if stopwords is None:
+            stopwords = default_stopwords()
+        self.stopwords = {word.lower() for word in stopwords}
+        self.max_terms = max_terms
+        self.counts = Counter()
+        self.texts_seen = 0
+
+    def update(self, texts):
+        """Tokenize one chunk of texts and add its counts"""
+        texts = list(texts)
+        return self.merge(count_terms(texts, self.stopwords), len(texts))
+
+    def merge(self, counts, texts_seen=0):
+        """Add counts already produced by count_terms (e.g. in a worker process)"""
+        self.counts.update(counts)
+        self.texts_seen += texts_seen
+        if self.max_terms and len(self.counts) > 2 * self.max_terms:
+            self.counts = Counter(dict(self.counts.most_common(self.max_terms)))
+        return self
+
+    def update_chunks(self, chunks, pool=None, max_in_flight=None):
+        """
+        Count an iterable of text chunks, yielding after each chunk has been merged
+        Given a pool from make_pool(), chunks are counted in parallel; at most max_in_flight
+        (default: twice the pool size) are outstanding, so a huge file is never queued whole
+        """
+        if pool is None:
+            for texts in chunks:
+                yield self.update(texts)
+            return
+
+        max_in_flight = max_in_flight or 2 * pool._max_workers
+        stopwords = frozenset(self.stopwords)
+        pending = {}
+        for texts in chunks:
+            texts = list(texts)
+            pending[pool.submit(count_terms, texts, stopwords)] = len(texts)
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield self.merge(future.result(), pending.pop(future))
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield self.merge(future.result(), pending.pop(future))
+
+    def most_common(self, n=None):
+        return self.counts.most_common(n)
+
+    def frequencies(self, max_words=None):
+        """Top words as a {word: count} dict, ready for WordCloud.generate_from_frequencies"""
+        return dict(self.counts.most_common(max_words))
+
+    def __len__(self):
+        return len(self.counts)